@@ -1,3 +1,4 @@
+import asyncio
 import os
 from pathlib import Path
 from typing import Optional
@@ -12,6 +13,8 @@ from app.param_options import PARAM_OPTIONS
 from src.minimalgotronifylicious.api import router
 from src.minimalgotronifylicious.api.routes import router as api_router
 from src.minimalgotronifylicious.routers.trading import router as trading_router
+from src.minimalgotronifylicious.utils.metrics import MetricsMiddleware
+from src.minimalgotronifylicious.streaming.tick_hub import get_tick_hub
 # ──────────────────────────────────────────────────────────────────────────────
 # Config (single source of truth)
 #   • FRONTEND_ORIGINS: comma-separated list of allowed UI origins
@@ -63,6 +66,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 1b) Request latency by route template (served at /metrics)
+app.add_middleware(MetricsMiddleware)
+
+
+# 1c) Feed loop: lets sync code (the paper account) follow ticks from worker threads
+@app.on_event("startup")
+async def bind_tick_hub():
+    get_tick_hub().bind(asyncio.get_running_loop())
+
 
 # 2) CSP (env-driven; one place to allow HTTP + WS connect targets)
 def build_csp() -> str:
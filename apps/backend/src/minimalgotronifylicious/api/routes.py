@@ -1,4 +1,7 @@
+import asyncio
+
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, HTTPException
+from fastapi.responses import PlainTextResponse
 
 from typing import Optional
 from pydantic import BaseModel
@@ -7,8 +10,12 @@ from src.minimalgotronifylicious.sessions.angelone_session import AngelOneSessio
 from src.minimalgotronifylicious.config_loader.broker_config_loader import BrokerConfigLoader
 from src.minimalgotronifylicious.utils.order_builder import OrderBuilder
 
-from src.minimalgotronifylicious.web_socket_manager import WebSocketManager
-from src.minimalgotronifylicious.brokers.websocket_client_factory import WebSocketClientFactory
+from src.minimalgotronifylicious.streaming.tick_hub import get_tick_hub
+from src.minimalgotronifylicious.streaming.feed_health import get_feed_health
+from src.minimalgotronifylicious.candles.store import get_candle_store, rows as candle_rows
+from src.minimalgotronifylicious.utils.metrics import CONTENT_TYPE, get_metrics
+from src.minimalgotronifylicious.utils.tracing import get_tracer
+from src.minimalgotronifylicious.sessions.session_registry import get_session_registry
 from src.minimalgotronifylicious.api.brokers import router as brokers_router
 from src.minimalgotronifylicious.routers import angel_one
 from src.minimalgotronifylicious.routers.angel_one import router as angel_router
@@ -63,39 +70,23 @@ def get_candles(
     from_ts: Optional[int] = Query(None, alias="from", description="Unix timestamp (milliseconds) for start"),
     to_ts:   Optional[int] = Query(None, alias="to",   description="Unix timestamp (milliseconds) for end"),
     limit:   Optional[int] = Query(None, description="Max number of bars to return"),
-    **extra_params  # will capture any other query params you tack on
+    exchange: str = Query("NSE", description="Exchange when symbol has no prefix"),
     ):
     """
-    Fetch historical candlestick data from AngelOne.
+    Historical candles from the local store; only the part of the range the
+    store has never seen is fetched from AngelOne (and then kept).
     """
-    # --- initialize session ---
-    config_loader = BrokerConfigLoader()
-    creds = config_loader.load_credentials()
-    session = AngelOneSession(creds)
-
-    # --- prepare upstream params ---
-    params = {
-        "symboltoken": symbol,
-        "interval": interval,
-    }
-    if from_ts is not None:
-        params["from"] = from_ts
-    if to_ts is not None:
-        params["to"] = to_ts
-    if limit is not None:
-        params["limit"] = limit
-    # include any additional filters
-    params.update(extra_params)
-
     try:
-        # SmartConnect’s method for fetching candles is typically named `getCandleData`
-        resp = session.api.getCandleData(**params)
+        bars, fetched = get_candle_store().get(symbol, interval, from_ts, to_ts, limit, exchange=exchange)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         # Bubble up a 502 if AngelOne is unhappy
         raise HTTPException(status_code=502, detail=f"Upstream error: {e}")
 
-    # `resp` should already be JSON-serializable (list of [time, open, high, low, close, volume] arrays)
-    return resp
+    # [ts_ms, open, high, low, close, volume] per bar
+    return {"status": True, "symbol": symbol, "interval": interval.upper(),
+            "fetched": fetched, "data": candle_rows(bars)}
 
 
 @router.get("/health")
@@ -113,20 +104,31 @@ async def ws_stream_info():
     return {"info": "This endpoint only speaks WebSocket — use a WS client."}
 
 
+@router.get("/feed/health")
+def feed_health():
+    # sockets: connected + ping RTT; symbols: age vs learned tick interval, stale flag
+    return {"status": "ok", **get_feed_health().snapshot(), "hub": get_tick_hub().stats()}
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    # async on purpose: queue-depth gauges read hub state owned by the event loop
+    return PlainTextResponse(get_metrics().render(), media_type=CONTENT_TYPE)
+
+
+@router.get("/traces")
+def traces(limit: int = Query(50, ge=0, le=1000)):
+    # tick-to-order: per-stage percentiles over the ring buffer, newest traces first
+    tracer = get_tracer()
+    return {**tracer.summary(), "recent": tracer.recent(limit)}
+
+
 @router.websocket("/ws/stream")
 async def stream_data(websocket: WebSocket, broker: str = "angel_one"):
     await websocket.accept()
 
-    config_loader = BrokerConfigLoader()
-    credentials = config_loader.load_credentials()
-    session = AngelOneSession(credentials)  # in future, use broker condition
-
-    ws_config = config_loader.load_websocket_config()
-    ws_config["session"] = session
-
-    client = WebSocketClientFactory.create(broker, ws_config)
-    ws_manager = WebSocketManager(client)
-    ws_manager.start()
+    # one shared upstream per broker; this connection is just another viewer
+    hub = get_tick_hub()
 
     try:
         while True:
@@ -134,9 +136,40 @@ async def stream_data(websocket: WebSocket, broker: str = "angel_one"):
             action = data.get("action")
             symbol = data.get("symbol")
 
-            if action == "subscribe":
-                ws_manager.register(symbol, websocket)
-            elif action == "unsubscribe":
-                ws_manager.unregister(symbol, websocket)
+            try:
+                if action == "subscribe":
+                    await hub.subscribe(websocket, symbol, broker, policy=data.get("policy"))
+                elif action == "unsubscribe":
+                    await hub.unsubscribe(websocket, symbol, broker)
+            except Exception as e:
+                await websocket.send_json({"status": "error", "reason": str(e)})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await hub.unsubscribe_all(websocket)
+
+
+@router.websocket("/ws/positions")
+async def stream_positions(websocket: WebSocket, broker: str = "paper_trade"):
+    # snapshot on connect, then only the positions that changed (see brokers/portfolio.py)
+    await websocket.accept()
+    try:
+        client = await asyncio.to_thread(get_session_registry().client, broker)
+    except Exception as e:
+        await websocket.send_json({"status": "error", "reason": str(e)})
+        await websocket.close()
+        return
+    portfolio = getattr(client, "portfolio", None)
+    if portfolio is None:
+        await websocket.send_json({"status": "error", "reason": f"{broker} does not stream positions"})
+        await websocket.close()
+        return
+
+    try:
+        await portfolio.watch(websocket)
+        while True:
+            await websocket.receive_text()  # nothing to say; keeps the disconnect visible
     except WebSocketDisconnect:
-        ws_manager.unregister_all(websocket)
+        pass
+    finally:
+        portfolio.unwatch(websocket)
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+In-process load benchmark for the hot HTTP and WebSocket endpoints.
+
+Drives the FastAPI app from main.py over ASGI (no sockets, no server)
+against the simulator broker, at each concurrency level, and reports
+throughput and p50/p95/p99 latency per route:
+
+    python -m src.minimalgotronifylicious.bin.bench_api
+    python -m src.minimalgotronifylicious.bin.bench_api -c 1,8,32 -n 300 --routes ltp,order
+    python -m src.minimalgotronifylicious.bin.bench_api --baseline data/bench/api-20261017-120000.json
+
+Every run is written as JSON (data/bench/api-<UTC stamp>.json by default).
+With --baseline, the run fails (exit 1) when any route × concurrency level
+present in both runs is slower than the baseline by more than
+--max-regression (throughput down, or the checked percentile up).
+
+/ws/stream latency is tick age on arrival: viewer receive time minus the
+tick's exchange_ts, i.e. simulator → manager → hub → viewer queue → send.
+"""
+import argparse, asyncio, itertools, json, math, os, platform, subprocess, sys, time, uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+ROUTES = ("ltp", "order", "symbols", "options_chain", "ws_stream")
+HEADERS = {"x_broker": "simulator"}  # the trading routes read the header under this exact name
+
+
+def percentile(sorted_ms: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_ms:
+        return 0.0
+    k = max(0, min(len(sorted_ms), math.ceil(q / 100 * len(sorted_ms))) - 1)
+    return sorted_ms[k]
+
+
+def summarize(latencies_ms: List[float], errors: int, wall_s: float, count: Optional[int] = None) -> Dict[str, Any]:
+    lat = sorted(latencies_ms)
+    n = len(lat) if count is None else count
+    return {
+        "requests": n,
+        "errors": errors,
+        "rps": round(n / wall_s, 1) if wall_s else 0.0,
+        "p50_ms": round(percentile(lat, 50), 3),
+        "p95_ms": round(percentile(lat, 95), 3),
+        "p99_ms": round(percentile(lat, 99), 3),
+        "max_ms": round(lat[-1], 3) if lat else 0.0,
+    }
+
+
+# ---------- HTTP ----------
+async def run_http(send: Callable[[int], Awaitable[bool]], concurrency: int, total: int) -> Dict[str, Any]:
+    """`total` calls of send(i) spread over `concurrency` workers; send returns success."""
+    counter = itertools.count()
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while True:
+            i = next(counter)
+            if i >= total:
+                return
+            t0 = time.perf_counter()
+            ok = await send(i)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            errors += not ok
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - t0)
+
+
+def http_scenarios(client, tokens: List[str]) -> Dict[str, Callable[[int], Awaitable[bool]]]:
+    async def ltp(i):
+        r = await client.get("/api/ltp", params={"symbol": f"NSE:{tokens[i % len(tokens)]}"}, headers=HEADERS)
+        return r.status_code == 200
+
+    async def order(i):
+        body = {"symbol": f"NSE:{tokens[i % len(tokens)]}", "qty": 1, "side": "BUY" if i % 2 else "SELL"}
+        r = await client.post("/api/order", json=body, headers={**HEADERS, "X-Request-Id": uuid.uuid4().hex})
+        return r.status_code == 200
+
+    async def symbols(i):
+        r = await client.get("/api/symbols", headers=HEADERS)
+        return r.status_code == 200
+
+    async def options_chain(i):
+        r = await client.get("/api/options/chain", params={"underlying": "NIFTY", "expirySel": "current_week"})
+        return r.status_code == 200
+
+    return {"ltp": ltp, "order": order, "symbols": symbols, "options_chain": options_chain}
+
+
+# ---------- WebSocket ----------
+class AsgiWebSocket:
+    """Just enough of an ASGI WebSocket client to drive an endpoint in process."""
+
+    def __init__(self, app, path: str, query: str = ""):
+        self.app = app
+        self.scope = {
+            "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "http_version": "1.1",
+            "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+            "headers": [], "client": ("bench", 0), "server": ("bench", 80), "subprotocols": [],
+        }
+        self._to_app: asyncio.Queue = asyncio.Queue()
+        self._from_app: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def connect(self) -> None:
+        self._task = asyncio.ensure_future(self.app(self.scope, self._to_app.get, self._from_app.put))
+        await self._to_app.put({"type": "websocket.connect"})
+        msg = await self._from_app.get()
+        if msg["type"] != "websocket.accept":
+            raise ConnectionError(f"WebSocket rejected: {msg}")
+
+    async def send_json(self, data: Any) -> None:
+        await self._to_app.put({"type": "websocket.receive", "text": json.dumps(data)})
+
+    async def receive_json(self, timeout: float) -> Any:
+        msg = await asyncio.wait_for(self._from_app.get(), timeout)
+        if msg["type"] == "websocket.close":
+            raise ConnectionError(f"WebSocket closed: {msg.get('code')}")
+        return json.loads(msg.get("text") or msg.get("bytes"))
+
+    async def close(self) -> None:
+        await self._to_app.put({"type": "websocket.disconnect", "code": 1000})
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, 5)
+            except Exception:
+                pass
+
+
+async def run_ws(app, concurrency: int, seconds: float, tokens: List[str]) -> Dict[str, Any]:
+    """`concurrency` viewers, one symbol each, streaming for `seconds`."""
+    latencies: List[float] = []
+    errors = 0
+    received = 0
+
+    async def viewer(i: int):
+        nonlocal errors, received
+        ws = AsgiWebSocket(app, "/ws/stream", "broker=simulator")
+        await ws.connect()
+        await ws.send_json({"action": "subscribe", "symbol": f"NSE:{tokens[i % len(tokens)]}"})
+        deadline = time.monotonic() + seconds
+        try:
+            while (left := deadline - time.monotonic()) > 0:
+                try:
+                    msg = await ws.receive_json(left)
+                except asyncio.TimeoutError:
+                    break
+                if "exchange_ts" not in msg:
+                    errors += 1
+                    continue
+                received += 1
+                latencies.append(max(0.0, time.time() * 1000 - msg["exchange_ts"]))
+        finally:
+            await ws.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(viewer(i) for i in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - t0, count=received)
+
+
+# ---------- comparison ----------
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float,
+            metric: str = "p95_ms") -> List[str]:
+    """Human-readable regressions of current vs baseline; empty when within bounds."""
+    out = []
+    for route, levels in current.get("results", {}).items():
+        for level, now in levels.items():
+            was = baseline.get("results", {}).get(route, {}).get(level)
+            if not was:
+                continue
+            if was["rps"] and now["rps"] < was["rps"] * (1 - max_regression):
+                out.append(f"{route} @ c={level}: rps {was['rps']} → {now['rps']}")
+            if was[metric] and now[metric] > was[metric] * (1 + max_regression):
+                out.append(f"{route} @ c={level}: {metric} {was[metric]} → {now[metric]}")
+            if now["errors"] > was["errors"]:
+                out.append(f"{route} @ c={level}: errors {was['errors']} → {now['errors']}")
+    return out
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+async def bench(app, routes: List[str], levels: List[int], total: int, ws_seconds: float,
+                tokens: List[str]) -> Dict[str, Dict[str, Any]]:
+    import httpx
+
+    results: Dict[str, Dict[str, Any]] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        scenarios = http_scenarios(client, tokens)
+        for route in routes:
+            results[route] = {}
+            for c in levels:
+                if route == "ws_stream":
+                    stats = await run_ws(app, c, ws_seconds, tokens)
+                else:
+                    await run_http(scenarios[route], c, min(total, 4 * c))  # warm-up
+                    stats = await run_http(scenarios[route], c, total)
+                results[route][str(c)] = stats
+                print(f"{route:<14}c={c:<5}{stats['rps']:>10.1f}/s  p50 {stats['p50_ms']:>8.2f}  "
+                      f"p95 {stats['p95_ms']:>8.2f}  p99 {stats['p99_ms']:>8.2f} ms  errors {stats['errors']}")
+    if "ws_stream" in routes:
+        from src.minimalgotronifylicious.streaming.tick_hub import get_tick_hub
+        get_tick_hub().shutdown()  # the feed thread would otherwise hold asyncio.run() open
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-c", "--concurrency", default="1,4,16,64", help="comma-separated concurrency levels")
+    ap.add_argument("-n", "--requests", type=int, default=500, help="requests per route per level")
+    ap.add_argument("--routes", default=",".join(ROUTES), help=f"subset of {','.join(ROUTES)}")
+    ap.add_argument("--ws-seconds", type=float, default=2.0, help="streaming time per level")
+    ap.add_argument("--out", default=None, help="result JSON (default data/bench/api-<UTC stamp>.json)")
+    ap.add_argument("--baseline", default=None, help="earlier result JSON to compare against")
+    ap.add_argument("--max-regression", type=float, default=0.25, help="allowed fractional slowdown")
+    ap.add_argument("--metric", default="p95_ms", choices=("p50_ms", "p95_ms", "p99_ms"),
+                    help="latency percentile checked against the baseline")
+    args = ap.parse_args(argv)
+
+    routes = [r for r in args.routes.split(",") if r]
+    unknown = set(routes) - set(ROUTES)
+    if unknown:
+        ap.error(f"unknown routes: {', '.join(sorted(unknown))}")
+    levels = [int(c) for c in args.concurrency.split(",") if c]
+
+    # the simulator serves every route; set before main.py reads its env
+    os.environ.setdefault("BROKER", "simulator")
+    os.environ.setdefault("SIM_SYMBOLS", "500")
+    import logzero, logging
+    logzero.loglevel(logging.INFO)  # the per-tick debug line would dominate /ws/stream
+    from main import app
+    from src.minimalgotronifylicious.brokers.sim_market import get_market
+
+    market = get_market()
+    tokens = market.tokens[:market.n_under]
+
+    started = time.time()
+    results = asyncio.run(bench(app, routes, levels, args.requests, args.ws_seconds, tokens))
+    run = {
+        "meta": {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(started)),
+            "git": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    out = args.out or os.path.join("data", "bench", time.strftime("api-%Y%m%d-%H%M%S.json", time.gmtime(started)))
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+    print(f"wrote {out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(run, json.load(f), args.max_regression, args.metric)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"within {args.max_regression:.0%} of {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
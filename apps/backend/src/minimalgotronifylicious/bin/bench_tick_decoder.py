@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: SmartWebSocketV2._parse_binary_data vs angelone_tick_decoder.
+
+    python -m src.minimalgotronifylicious.bin.bench_tick_decoder -n 50000
+"""
+import argparse, struct, sys, timeit
+
+from SmartApi.smartWebSocketV2 import SmartWebSocketV2
+
+from src.minimalgotronifylicious.brokers.angelone_tick_decoder import (
+    LTP_MODE, QUOTE, SNAP_QUOTE, decode, decode_many, decode_ticks,
+)
+
+
+def make_packet(mode: int, token: str = "3045", ltp: int = 82050) -> bytes:
+    pkt = struct.pack("<BB25sqqq", mode, 1, token.encode(), 7, 1_700_000_000_000, ltp)
+    if mode >= QUOTE:
+        pkt += struct.pack("<qqqddqqqq", 10, ltp - 5, 123456, 1000.0, 2000.0, ltp - 100, ltp + 100, ltp - 200, ltp - 50)
+    if mode == SNAP_QUOTE:
+        pkt += struct.pack("<qqq", 1_700_000_000_000, 5000, 3)
+        pkt += b"".join(struct.pack("<HqqH", i // 5, 10 + i, ltp + i, 1) for i in range(10))
+        pkt += struct.pack("<qqqq", ltp * 2, ltp // 2, ltp + 900, ltp - 900)
+    return pkt
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", "--number", type=int, default=20000, help="packets per measurement")
+    ap.add_argument("--batch", type=int, default=8, help="packets per frame for the batch run")
+    args = ap.parse_args()
+
+    sdk = SmartWebSocketV2.__new__(SmartWebSocketV2)  # parser only, no connection
+    print(f"{'mode':<11}{'sdk µs':>10}{'fast µs':>10}{'speedup':>10}{'tick µs':>10}")
+    for mode, name in ((LTP_MODE, "LTP"), (QUOTE, "QUOTE"), (SNAP_QUOTE, "SNAP_QUOTE")):
+        pkt = make_packet(mode)
+        t_sdk = timeit.timeit(lambda: sdk._parse_binary_data(pkt), number=args.number) / args.number * 1e6
+        t_fast = timeit.timeit(lambda: decode(pkt), number=args.number) / args.number * 1e6
+        t_tick = timeit.timeit(lambda: decode_ticks(pkt), number=args.number) / args.number * 1e6
+        print(f"{name:<11}{t_sdk:>10.2f}{t_fast:>10.2f}{t_sdk / t_fast:>9.1f}x{t_tick:>10.2f}")
+
+    frame = make_packet(QUOTE) * args.batch
+    rounds = max(args.number // args.batch, 1)
+    t_batch = timeit.timeit(lambda: decode_many(frame), number=rounds) / (rounds * args.batch) * 1e6
+    t_ticks = timeit.timeit(lambda: decode_ticks(frame), number=rounds) / (rounds * args.batch) * 1e6
+    print(f"QUOTE x{args.batch} frame: {t_batch:.2f} µs/packet (FeedTick), {t_ticks:.2f} µs/packet (Tick)")
+
+if __name__ == "__main__":
+    sys.exit(main())
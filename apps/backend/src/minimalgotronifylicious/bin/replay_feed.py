@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Replay recorded feed segments through WebSocketManager and its observers,
+with no broker login, and report end-to-end throughput.
+
+    FEED_RECORD_DIR=data/feed   # recorded by a live session
+    python -m src.minimalgotronifylicious.bin.replay_feed data/feed --speed 0
+    python -m src.minimalgotronifylicious.bin.replay_feed data/feed/20261016 --speed 10
+"""
+import argparse, time
+
+from src.minimalgotronifylicious.brokers.angelone_tick_decoder import decode_ticks
+from src.minimalgotronifylicious.brokers.angelone_websocket_event_handler import AngelOneWebSocketEventHandler
+from src.minimalgotronifylicious.brokers.replay_websocket_client import ReplayWebSocketClient, recorded_frames
+from src.minimalgotronifylicious.streaming.demand import EXCHANGE_TYPES
+from src.minimalgotronifylicious.web_socket_manager import WebSocketManager
+
+
+class Counter:
+    def __init__(self):
+        self.n = 0
+
+    def update(self, data):
+        self.n += 1
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("source", help="segment file or directory of segments")
+    ap.add_argument("--speed", type=float, default=0.0, help="1 = recorded pacing, N = N× faster, 0 = flat out")
+    args = ap.parse_args()
+
+    # every symbol in the recording gets one observer, as if someone were watching it
+    symbols = set()
+    for _, frame in recorded_frames(args.source):
+        symbols.update(f"{t.exchange}:{t.token}" for t in decode_ticks(frame))
+
+    client = ReplayWebSocketClient(args.source, speed=args.speed)
+    manager = WebSocketManager(client)
+    handler = AngelOneWebSocketEventHandler(ws_manager=manager)
+    client.set_callbacks(handler.on_data, handler.on_open, handler.on_close, handler.on_error,
+                         handler.on_control_message)
+    counter = Counter()
+    by_ex = {}
+    for sym in symbols:
+        ex, token = sym.split(":", 1)
+        manager.register(sym, counter)
+        by_ex.setdefault(EXCHANGE_TYPES[ex], []).append(token)
+    manager.subscribe([{"exchangeType": code, "tokens": toks} for code, toks in by_ex.items()])
+
+    t0 = time.perf_counter()
+    manager.start()
+    client.done.wait()
+    wall = time.perf_counter() - t0
+    manager.stop()
+
+    stats = client.stats()
+    print(f"symbols    {len(symbols)}")
+    print(f"frames     {stats['frames']}")
+    print(f"ticks      {stats['ticks']}  ({stats['ticks_per_s']:.0f}/s during playback)")
+    print(f"delivered  {counter.n}  in {wall:.3f}s  ({counter.n / wall if wall else 0:.0f}/s end to end)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Drive the synthetic market through WebSocketManager and its observers,
+with no broker login, and report end-to-end throughput.
+
+    python -m src.minimalgotronifylicious.bin.sim_feed --symbols 5000 --rate 20000 --seconds 5
+    python -m src.minimalgotronifylicious.bin.sim_feed --rate 0 --ticks 500000     # flat out
+"""
+import argparse, logging, time
+
+import logzero
+
+from src.minimalgotronifylicious.brokers.angelone_websocket_event_handler import AngelOneWebSocketEventHandler
+from src.minimalgotronifylicious.brokers.sim_market import MarketSimulator
+from src.minimalgotronifylicious.brokers.sim_websocket_client import SimWebSocketClient
+from src.minimalgotronifylicious.web_socket_manager import WebSocketManager
+
+
+class Counter:
+    def __init__(self):
+        self.n = 0
+
+    def update(self, data):
+        self.n += 1
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--symbols", type=int, default=2000, help="simulated equities (plus indices and options)")
+    ap.add_argument("--corr", type=float, default=0.3, help="pairwise return correlation")
+    ap.add_argument("--rate", type=float, default=10000, help="target ticks/s, 0 = flat out")
+    ap.add_argument("--seconds", type=float, default=5.0, help="run length when --ticks is not given")
+    ap.add_argument("--ticks", type=int, default=None, help="stop after this many ticks")
+    args = ap.parse_args()
+    logzero.loglevel(logging.INFO)  # the per-tick debug line would dominate the measurement
+
+    market = MarketSimulator(symbols=args.symbols, corr=args.corr)
+    client = SimWebSocketClient(market, ticks_per_s=args.rate, max_ticks=args.ticks)
+    manager = WebSocketManager(client)
+    handler = AngelOneWebSocketEventHandler(ws_manager=manager)
+    client.set_callbacks(handler.on_data, handler.on_open, handler.on_close, handler.on_error,
+                         handler.on_control_message)
+
+    # every instrument gets one observer, as if someone were watching it
+    counter = Counter()
+    by_ex = {}
+    for i in range(len(market.names)):
+        key = market.key(i)
+        manager.register(key, counter)
+        by_ex.setdefault(1 if key.startswith("NSE:") else 2, []).append(market.tokens[i])
+    manager.subscribe([{"exchangeType": code, "tokens": toks} for code, toks in by_ex.items()])
+
+    t0 = time.perf_counter()
+    manager.start()
+    client.done.wait(None if args.ticks else args.seconds)
+    wall = time.perf_counter() - t0
+    manager.stop()
+
+    stats = client.stats()
+    print(f"instruments {len(market.names)}  ({market.n_under} underlyings, {len(market.opt_under)} options)")
+    print(f"frames      {stats['frames']}")
+    print(f"ticks       {client.ticks}")
+    print(f"delivered   {counter.n}  in {wall:.3f}s  ({counter.n / wall if wall else 0:.0f}/s end to end)")
+
+
+if __name__ == "__main__":
+    main()
@@ -38,5 +38,8 @@ class AbstractWebSocketClient(BaseWebSocketClient):
     def subscribe(self, correlation_id: str, mode: str, token_list: list):
         raise NotImplementedError(f"{self.__class__.__name__}.subscribe() must be implemented by subclass")
 
+    def unsubscribe(self, correlation_id: str, mode: str, token_list: list):
+        raise NotImplementedError(f"{self.__class__.__name__}.unsubscribe() must be implemented by subclass")
+
     def run_forever(self):
         raise NotImplementedError(f"{self.__class__.__name__}.run_forever() must be implemented by subclass")
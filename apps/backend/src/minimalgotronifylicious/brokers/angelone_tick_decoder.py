@@ -0,0 +1,170 @@
+# brokers/angelone_tick_decoder.py
+"""
+Fast decoder for SmartWebSocketV2 binary packets.
+
+The SDK unpacks every field with its own struct.unpack call on a sliced copy
+of the frame and builds a dict per tick. Here each layout is one
+precompiled little-endian Struct read straight out of a memoryview:
+
+    offset  0   mode(B) exchange_type(B) token(25s) seq(q) exch_ts(q) ltp(q)   → LTP        (51 bytes)
+    offset 51   ltq avg_price volume(q) buy_qty sell_qty(d) open high low close(q) → QUOTE  (123 bytes)
+    offset 123  last_traded_ts oi oi_change_pct(q)
+    offset 147  best-5 ladder, 10 × flag(H) qty(q) price(q) orders(H)
+    offset 347  upper_circuit lower_circuit 52w_high 52w_low(q)               → SNAP_QUOTE (379 bytes)
+
+Prices stay in paise, exactly as the exchange sends them. decode_ticks is
+the streaming path: it reads only what a Tick needs. decode/decode_many
+keep every field for consumers that want the full quote.
+"""
+from __future__ import annotations
+
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.minimalgotronifylicious.streaming.tick import EXCHANGES, Tick
+
+LTP_MODE = 1
+QUOTE = 2
+SNAP_QUOTE = 3
+
+_HEADER = struct.Struct("<BB25sqqq")
+_QUOTE = struct.Struct("<qqqddqqqq")
+_SNAP_OI = struct.Struct("<qqq")
+_LEVEL = struct.Struct("<HqqH")
+_SNAP_LIMITS = struct.Struct("<qqqq")
+_VOLUME = struct.Struct("<q")  # volume_trade_for_the_day @ 67
+
+PACKET_SIZE = {LTP_MODE: 51, QUOTE: 123, SNAP_QUOTE: 379}
+_MODE_NAMES = {LTP_MODE: "LTP", QUOTE: "QUOTE", SNAP_QUOTE: "SNAP_QUOTE"}
+
+# tokens repeat every tick; decode each padded 25-byte field once
+_TOKENS: Dict[bytes, str] = {}
+
+
+def _token(raw: bytes) -> str:
+    tok = _TOKENS.get(raw)
+    if tok is None:
+        tok = _TOKENS[raw] = raw.split(b"\0", 1)[0].decode("ascii")
+    return tok
+
+
+class FeedTick:
+    """One decoded packet. Quote/snap-quote fields are None in lighter modes."""
+    __slots__ = (
+        "mode", "exchange_type", "token", "sequence_number", "exchange_timestamp", "last_traded_price",
+        "last_traded_quantity", "average_traded_price", "volume_trade_for_the_day",
+        "total_buy_quantity", "total_sell_quantity",
+        "open_price_of_the_day", "high_price_of_the_day", "low_price_of_the_day", "closed_price",
+        "last_traded_timestamp", "open_interest", "open_interest_change_percentage",
+        "best_five", "upper_circuit_limit", "lower_circuit_limit", "week_52_high_price", "week_52_low_price",
+    )
+
+    def __init__(self, mode, exchange_type, token, sequence_number, exchange_timestamp, last_traded_price,
+                 quote: Optional[Tuple] = None, snap: Optional[Tuple] = None):
+        self.mode = mode
+        self.exchange_type = exchange_type
+        self.token = token
+        self.sequence_number = sequence_number
+        self.exchange_timestamp = exchange_timestamp
+        self.last_traded_price = last_traded_price
+        (self.last_traded_quantity, self.average_traded_price, self.volume_trade_for_the_day,
+         self.total_buy_quantity, self.total_sell_quantity,
+         self.open_price_of_the_day, self.high_price_of_the_day, self.low_price_of_the_day,
+         self.closed_price) = quote or (None,) * 9
+        (self.last_traded_timestamp, self.open_interest, self.open_interest_change_percentage,
+         self.best_five, self.upper_circuit_limit, self.lower_circuit_limit,
+         self.week_52_high_price, self.week_52_low_price) = snap or (None,) * 8
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Same keys as SmartWebSocketV2's parser, for JSON consumers."""
+        d = {
+            "subscription_mode": self.mode,
+            "exchange_type": self.exchange_type,
+            "token": self.token,
+            "sequence_number": self.sequence_number,
+            "exchange_timestamp": self.exchange_timestamp,
+            "last_traded_price": self.last_traded_price,
+            "subscription_mode_val": _MODE_NAMES.get(self.mode),
+        }
+        if self.mode >= QUOTE:
+            for name in FeedTick.__slots__[6:15]:
+                d[name] = getattr(self, name)
+        if self.mode == SNAP_QUOTE:
+            d["last_traded_timestamp"] = self.last_traded_timestamp
+            d["open_interest"] = self.open_interest
+            d["open_interest_change_percentage"] = self.open_interest_change_percentage
+            d["best_5_data"] = [
+                {"flag": f, "quantity": q, "price": p, "no of orders": n} for f, q, p, n in self.best_five
+            ]
+            d["upper_circuit_limit"] = self.upper_circuit_limit
+            d["lower_circuit_limit"] = self.lower_circuit_limit
+            d["52_week_high_price"] = self.week_52_high_price
+            d["52_week_low_price"] = self.week_52_low_price
+        return d
+
+    def to_tick(self) -> Tick:
+        return Tick(self.token, EXCHANGES.get(self.exchange_type, "NSE"), self.last_traded_price,
+                    self.volume_trade_for_the_day or 0, self.exchange_timestamp)
+
+    def __repr__(self) -> str:
+        return f"FeedTick(token={self.token!r}, mode={self.mode}, ltp={self.last_traded_price})"
+
+
+def decode_at(buf: memoryview, offset: int = 0) -> Tuple[FeedTick, int]:
+    """Decode the packet starting at offset; returns (tick, offset of the next packet)."""
+    if len(buf) - offset < _HEADER.size:  # struct.error would escape the callers' ValueError handling
+        raise ValueError(f"Truncated header: need {_HEADER.size} bytes, have {len(buf) - offset}")
+    mode, exch, raw_token, seq, exch_ts, ltp = _HEADER.unpack_from(buf, offset)
+    size = PACKET_SIZE.get(mode)
+    if size is None:
+        raise ValueError(f"Unsupported subscription mode {mode}")
+    if offset + size > len(buf):
+        raise ValueError(f"Truncated mode-{mode} packet: need {size} bytes, have {len(buf) - offset}")
+
+    quote = snap = None
+    if mode >= QUOTE:
+        quote = _QUOTE.unpack_from(buf, offset + 51)
+    if mode == SNAP_QUOTE:
+        ladder = tuple(_LEVEL.iter_unpack(buf[offset + 147:offset + 347]))
+        snap = _SNAP_OI.unpack_from(buf, offset + 123) + (ladder,) + _SNAP_LIMITS.unpack_from(buf, offset + 347)
+    return FeedTick(mode, exch, _token(raw_token), seq, exch_ts, ltp, quote, snap), offset + size
+
+
+def decode(data) -> FeedTick:
+    return decode_at(memoryview(data))[0]
+
+
+def decode_many(data) -> List[FeedTick]:
+    """
+    Decode every packet in a frame. Packets are self-describing (mode byte
+    first), so back-to-back packets are walked without copying the frame.
+    """
+    buf = memoryview(data)
+    n = len(buf)
+    offset = 0
+    ticks = []
+    while offset < n:
+        tick, offset = decode_at(buf, offset)
+        ticks.append(tick)
+    return ticks
+
+
+def decode_ticks(data) -> List[Tick]:
+    """Streaming fast path: every packet in the frame as a compact Tick."""
+    buf = memoryview(data)
+    n = len(buf)
+    offset = 0
+    ticks = []
+    while offset < n:
+        if n - offset < _HEADER.size:
+            raise ValueError(f"Truncated header: need {_HEADER.size} bytes, have {n - offset}")
+        mode, exch, raw_token, _seq, exch_ts, ltp = _HEADER.unpack_from(buf, offset)
+        size = PACKET_SIZE.get(mode)
+        if size is None:
+            raise ValueError(f"Unsupported subscription mode {mode}")
+        if offset + size > n:
+            raise ValueError(f"Truncated mode-{mode} packet: need {size} bytes, have {n - offset}")
+        volume = _VOLUME.unpack_from(buf, offset + 67)[0] if mode >= QUOTE else 0
+        ticks.append(Tick(_token(raw_token), EXCHANGES.get(exch, "NSE"), ltp, volume, exch_ts))
+        offset += size
+    return ticks
@@ -1,6 +1,8 @@
 import time
 import threading
 
+from logzero import logger
+
 from src.minimalgotronifylicious.brokers.abstract_websocket_client import AbstractWebSocketClient
 from src.minimalgotronifylicious.brokers.mixins.observer_mixin import ObserverMixin
 from src.minimalgotronifylicious.brokers.custom_angel_one_web_socket import CustomAngelOneWebSocketV2
@@ -58,13 +60,10 @@ class AngelOneWebSocketV2Client(AbstractWebSocketClient, ObserverMixin):
         #     self.add_observer(on_data)  # or pass event_handler if needed
         # Observer registration is handled via WebSocketManager.register()
 
-        # NEW: Start heartbeat if supported
-        # if hasattr(self.sws, "start_heartbeat"):
-        #     self.sws.start_heartbeat()
+        # Liveness: WebSocketManager pings through ping() and times the pong
 
-        # if not getattr(self, "_heartbeat_started", False):
-        #     self.sws.start_heartbeat()
-        #     self._heartbeat_started = True
+    def set_pong_callback(self, on_pong):
+        self.sws.on_pong = lambda wsapp, data: on_pong(data)
 
     def connect(self):
         self.sws.connect()
@@ -80,10 +79,21 @@ class AngelOneWebSocketV2Client(AbstractWebSocketClient, ObserverMixin):
             token_list=self.token_list
         )
 
+    def unsubscribe(self, correlation_id: str, mode: str, token_list: list):
+        logger.debug(f"unsubscribe from: {token_list}")
+        self.sws.unsubscribe(
+            correlation_id=correlation_id,
+            mode=mode,
+            token_list=token_list
+        )
+
     def run_forever(self):
         if self.sws and self.sws._ws:
             self.sws._ws.run_forever()
 
+    def ping(self, payload: str = ""):
+        self.sws.ping(payload)
+
     def is_connected(self) -> bool:
         return self.sws.is_connected()
 
@@ -1,6 +1,7 @@
 # brokers/smart_event_handler.py
 from logzero import logger
-import json
+
+from src.minimalgotronifylicious.streaming.tick import Tick
 
 class AngelOneWebSocketEventHandler:
     def __init__(self, strategy_executor=None, correlation_id=None, mode=None, token_list=None, sws=None, ws_manager=None):
@@ -12,13 +13,15 @@ class AngelOneWebSocketEventHandler:
         self.ws_manager = ws_manager  # 👈
 
     def on_data(self, ws, message):
-        logger.info("Ticks: {}".format(message))
+        # hot path: one call per tick, so no per-tick INFO logging
+        logger.debug("Ticks: {}".format(message))
 
         try:
-            parsed = json.loads(message)
-            symbol = parsed.get("symbol")  # or parsed.get("instrument") depending on structure
-            if symbol and self.ws_manager:
-                self.ws_manager.stream_tick(symbol, parsed)
+            # parsed exactly once here (a no-op for Ticks from the binary decoder)
+            tick = Tick.coerce(message)
+            if tick.token and self.ws_manager:
+                # published as EXCHANGE:TOKEN, the key viewers and indicators register under
+                self.ws_manager.stream_tick(f"{tick.exchange}:{tick.token}", tick)
         except Exception as e:
             logger.error(f"Failed to parse and stream tick: {e}")
 
@@ -26,6 +29,11 @@ class AngelOneWebSocketEventHandler:
         from logzero import logger
         logger.info("✅ WebSocket Opened")
 
+        if self.ws_manager:
+            # the manager replays its whole subscription set on every (re)connect
+            self.ws_manager.connection_opened()
+            return
+
         some_error_condition = False
         if some_error_condition:
             error_message = "Simulated error"
@@ -41,8 +49,16 @@ class AngelOneWebSocketEventHandler:
 
             logger.info(f"📡 Subscribed: {self.token_list}")
 
-    def on_close(self, ws): logger.info("❌ WebSocket Closed")
-    def on_error(self, ws, error): print("⚠️ WebSocket Error:", error)
+    def on_close(self, ws):
+        logger.info("❌ WebSocket Closed")
+        if self.ws_manager:
+            self.ws_manager.connection_lost()
+
+    def on_error(self, ws, error):
+        print("⚠️ WebSocket Error:", error)
+        if self.ws_manager:
+            self.ws_manager.connection_lost(error)
+
     def on_control_message(self, ws, message): print(f"⚠️ Control Message: {message}")
 
     def close_connection(self):
@@ -14,6 +14,9 @@ class BaseWebSocketClient(ABC):
     @abstractmethod
     def subscribe(self, correlation_id: str, mode: str, token_list: list): pass
 
+    @abstractmethod
+    def unsubscribe(self, correlation_id: str, mode: str, token_list: list): pass
+
     @abstractmethod
     def set_callbacks(self, on_data, on_open, on_close, on_error, on_control_message): pass
 
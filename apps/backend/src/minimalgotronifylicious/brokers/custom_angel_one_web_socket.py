@@ -1,5 +1,16 @@
+import json
+import ssl
+import time
+
+import websocket
+from logzero import logger
 from SmartApi.smartWebSocketV2 import SmartWebSocketV2
 
+from src.minimalgotronifylicious.brokers.angelone_tick_decoder import decode_ticks
+from src.minimalgotronifylicious.streaming.recorder import get_recorder
+from src.minimalgotronifylicious.utils.metrics import get_metrics
+from src.minimalgotronifylicious.utils.tracing import get_tracer
+
 
 class CustomAngelOneWebSocketV2(SmartWebSocketV2):
     def __init__(
@@ -16,9 +27,9 @@ class CustomAngelOneWebSocketV2(SmartWebSocketV2):
     ):
         super().__init__(auth_token, api_key, client_id, feed_token)
         self._connected = False
-        self.on_open = self._on_open
-        self.on_close = self._on_close_wrapper
-        self.on_error = self._on_error
+        self.recorder = get_recorder()  # None unless FEED_RECORD_DIR is set
+        self.metrics = get_metrics()
+        self.tracer = get_tracer()
         # Your custom retry params or additional setup
         self.max_retry_attempt = max_retry_attempt
         self.retry_strategy = retry_strategy
@@ -26,23 +37,97 @@ class CustomAngelOneWebSocketV2(SmartWebSocketV2):
         self.retry_multiplier = retry_multiplier
         self.retry_duration = retry_duration
 
+    def _on_data(self, wsapp, data, data_type, continue_flag):
+        # binary frames → compact Ticks; the SDK's per-field parser is the fallback
+        if data_type != 2:
+            return
+        if self.recorder is not None:
+            self.recorder.record(data)
+        t0 = time.perf_counter()
+        try:
+            ticks = decode_ticks(data)
+        except (ValueError, TypeError) as e:
+            logger.debug(f"Fast decoder declined frame ({e}); using SDK parser")
+            self.tracer.frame(t0)  # parsed per tick inside the SDK: no parse stamp
+            super()._on_data(wsapp, data, data_type, continue_flag)
+            return
+        t1 = time.perf_counter()
+        self.tracer.frame(t0, t1)
+        self.metrics.decode.observe(t1 - t0, "angel_one")
+        self.metrics.frames.inc("angel_one")
+        for tick in ticks:
+            self.on_data(wsapp, tick)
+
+    # Reconnects and resubscription belong to WebSocketManager: these only
+    # record state and forward the event (the SDK's own _on_error sleeps and
+    # reconnects inside the feed thread, and its resubscribe replays a dict
+    # shared by every instance).
     def _on_open(self, wsapp):
         self._connected = True
-        print("WebSocket connected")
+        logger.info("WebSocket connected")
+        self.on_open(wsapp)
 
-    def _on_close_wrapper(self, ws, close_status_code, close_msg):
-        # Call the class-defined 2-param method
-        print(f"WebSocket closed with code {close_status_code}, message: {close_msg}")
-        self._on_close(ws)
-
-    def _on_close(self, wsapp):
-        # Optional: Handle or log closure
+    def _on_close(self, wsapp, close_status_code=None, close_msg=None):
         self._connected = False
-        print("WebSocket closed")
+        logger.info(f"WebSocket closed with code {close_status_code}, message: {close_msg}")
+        self.on_close(wsapp)
 
     def _on_error(self, wsapp, error):
         self._connected = False
-        print(f"WebSocket error: {error}")
+        logger.warning(f"WebSocket error: {error}")
+        self.on_error(wsapp, error)
+        if self.wsapp:
+            self.wsapp.close()  # let connect() return so the manager can reconnect
+
+    def on_error(self, wsapp, error):
+        pass
+
+    # ---------- subscriptions ----------
+    # Sent as-is. The SDK's subscribe() also extends the class-level
+    # input_request_dict (shared by every shard) on each call, and its
+    # unsubscribe() writes the request into it; WebSocketManager owns the
+    # subscription set and replays it, so nothing here needs that dict.
+    def subscribe(self, correlation_id, mode, token_list):
+        if mode == self.DEPTH:
+            if any(t.get("exchangeType") != 1 for t in token_list):
+                raise ValueError("Depth mode supports exchangeType 1 only")
+            if sum(len(t["tokens"]) for t in token_list) > 50:
+                raise ValueError("Depth mode allows at most 50 tokens")
+        self._send_request(self.SUBSCRIBE_ACTION, correlation_id, mode, token_list)
+
+    def unsubscribe(self, correlation_id, mode, token_list):
+        self._send_request(self.UNSUBSCRIBE_ACTION, correlation_id, mode, token_list)
+
+    def _send_request(self, action, correlation_id, mode, token_list):
+        self.wsapp.send(json.dumps({
+            "correlationID": correlation_id,
+            "action": action,
+            "params": {"mode": mode, "tokenList": token_list},
+        }))
+
+    # ---------- liveness ----------
+    def connect(self):
+        """The SDK's connect() minus its fixed ping_interval: WebSocketManager sends timed pings itself."""
+        headers = {
+            "Authorization": self.auth_token,
+            "x-api-key": self.api_key,
+            "x-client-code": self.client_code,
+            "x-feed-token": self.feed_token,
+        }
+        self.wsapp = websocket.WebSocketApp(
+            self.ROOT_URI, header=headers, on_open=self._on_open, on_error=self._on_error,
+            on_close=self._on_close, on_data=self._on_data, on_pong=self._on_pong,
+        )
+        self.wsapp.run_forever(sslopt={"cert_reqs": ssl.CERT_NONE})
+
+    def ping(self, payload: str = ""):
+        self.wsapp.sock.ping(payload)
+
+    def _on_pong(self, wsapp, data):
+        self.on_pong(wsapp, data)
+
+    def on_pong(self, wsapp, data):
+        pass
 
     def is_connected(self):
-        return self._connected
\ No newline at end of file
+        return self._connected
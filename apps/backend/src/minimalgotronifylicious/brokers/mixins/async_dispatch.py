@@ -0,0 +1,189 @@
+# brokers/mixins/async_dispatch.py
+"""
+Hands ticks from the broker's callback thread to the asyncio loop.
+
+Each subscriber gets its own bounded SubscriberQueue drained by one task, so
+a slow browser tab only ever hurts itself. When a queue is full its overflow
+policy decides what happens:
+
+    drop_oldest  - evict the oldest pending tick, keep the new one
+    conflate     - keep only the latest tick per symbol (queue holds ≤ maxsize symbols)
+    disconnect   - close the queue and tell the owner to drop the subscriber
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from src.minimalgotronifylicious.utils.metrics import get_metrics
+
+log = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop_oldest"
+CONFLATE = "conflate"
+DISCONNECT = "disconnect"
+POLICIES = (DROP_OLDEST, CONFLATE, DISCONNECT)
+
+
+async def deliver(observer, data) -> None:
+    """FastAPI WebSockets get send_json; observers get update() (sync or async)."""
+    send_json = getattr(observer, "send_json", None)
+    if send_json is not None:
+        await send_json(data)
+        return
+    result = observer.update(data)
+    if inspect.isawaitable(result):
+        await result
+
+
+class SubscriberQueue:
+    """Bounded mailbox for one subscriber. Only touched from the loop thread."""
+
+    def __init__(self, observer, maxsize: int = 256, policy: str = DROP_OLDEST,
+                 on_overflow: Optional[Callable[[Any], None]] = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.observer = observer
+        self.maxsize = maxsize
+        self.policy = policy
+        self.on_overflow = on_overflow
+        self.dropped = 0
+        self.closed = False
+        self._items = OrderedDict() if policy == CONFLATE else deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._pump())
+
+    def offer(self, symbol, data) -> bool:
+        if self.closed:
+            return False
+        items = self._items
+        if self.policy == CONFLATE:
+            if symbol in items:
+                items[symbol] = data  # latest wins, keeps its place in line
+            else:
+                if len(items) >= self.maxsize:
+                    items.popitem(last=False)
+                    self.dropped += 1
+                items[symbol] = data
+        elif len(items) >= self.maxsize:
+            if self.policy == DISCONNECT:
+                self._overflow()
+                return False
+            items.popleft()
+            self.dropped += 1
+            items.append(data)
+        else:
+            items.append(data)
+        self._wakeup.set()
+        return True
+
+    def _next(self):
+        if self.policy == CONFLATE:
+            return self._items.popitem(last=False)[1]
+        return self._items.popleft()
+
+    async def _pump(self) -> None:
+        deliver_time = get_metrics().deliver
+        while not self.closed:
+            if not self._items:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            try:
+                t0 = time.perf_counter()
+                await deliver(self.observer, self._next())
+                deliver_time.observe(time.perf_counter() - t0)
+            except Exception as e:
+                log.info("Dispatch to %r failed, dropping subscriber: %s", self.observer, e)
+                self._overflow()
+
+    def _overflow(self) -> None:
+        self.close()
+        if self.on_overflow is not None:
+            self.on_overflow(self.observer)
+
+    def close(self) -> None:
+        self.closed = True
+        self._items.clear()
+        self._wakeup.set()
+        task, self._task = self._task, None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+
+class AsyncDispatcher:
+    """
+    Thread-safe front door: dispatch() may be called from any thread and costs
+    one call_soon_threadsafe per tick, however many subscribers there are.
+    """
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None,
+                 maxsize: Optional[int] = None, policy: Optional[str] = None,
+                 on_overflow: Optional[Callable[[Any], None]] = None):
+        self.loop = loop
+        self.maxsize = maxsize or int(os.getenv("TICK_QUEUE_MAXSIZE", "256"))
+        self.policy = policy or os.getenv("TICK_QUEUE_POLICY", DROP_OLDEST)
+        self.on_overflow = on_overflow
+        self._queues: Dict[Any, SubscriberQueue] = {}
+        self._overrides: Dict[Any, Dict[str, Any]] = {}
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+
+    def configure(self, observer, *, policy: Optional[str] = None, maxsize: Optional[int] = None) -> None:
+        """Per-subscriber overrides; applied when its queue is (re)created."""
+        if policy is not None and policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        opts = {k: v for k, v in (("policy", policy), ("maxsize", maxsize)) if v is not None}
+        if opts and opts != self._overrides.get(observer):  # same settings: keep the running queue
+            self._overrides[observer] = opts
+            q = self._queues.pop(observer, None)
+            if q is not None:
+                q.close()
+
+    def dispatch(self, symbol, data, observers: Iterable) -> None:
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._fan, symbol, data, tuple(observers))
+
+    def _fan(self, symbol, data, observers) -> None:
+        for obs in observers:
+            q = self._queues.get(obs)
+            if q is None:
+                opts = self._overrides.get(obs, {})
+                q = SubscriberQueue(
+                    obs,
+                    maxsize=opts.get("maxsize", self.maxsize),
+                    policy=opts.get("policy", self.policy),
+                    on_overflow=self._overflowed,
+                )
+                self._queues[obs] = q
+                q.start()
+            q.offer(symbol, data)
+
+    def _overflowed(self, observer) -> None:
+        self._queues.pop(observer, None)
+        if self.on_overflow is not None:
+            self.on_overflow(observer)
+
+    def discard(self, observer) -> None:
+        self._overrides.pop(observer, None)
+        q = self._queues.pop(observer, None)
+        if q is not None:
+            q.close()
+
+    def depths(self) -> Dict[Any, int]:
+        return {obs: len(q) for obs, q in self._queues.items()}
@@ -1,9 +1,19 @@
 # brokers/mixins/observer_mixin.py
+import time
+
+from src.minimalgotronifylicious.utils.metrics import get_metrics
+
 
 class ObserverMixin:
     def __init__(self):
         # { symbol: [observer1, observer2, ...] }
         self.observers = {}
+        # Optional AsyncDispatcher; when set, delivery happens on the event loop
+        self.dispatcher = None
+        self._dispatch_time = get_metrics().dispatch
+
+    def attach_dispatcher(self, dispatcher):
+        self.dispatcher = dispatcher
 
     def add_observer(self, symbol, observer):
         if symbol not in self.observers:
@@ -15,14 +25,27 @@ class ObserverMixin:
             self.observers[symbol] = [obs for obs in self.observers[symbol] if obs != observer]
             if not self.observers[symbol]:
                 del self.observers[symbol]
+        if self.dispatcher is not None and not any(observer in obs for obs in self.observers.values()):
+            self.dispatcher.discard(observer)
 
     def remove_all_for_observer(self, observer):
         for symbol in list(self.observers.keys()):
             self.observers[symbol] = [obs for obs in self.observers[symbol] if obs != observer]
             if not self.observers[symbol]:
                 del self.observers[symbol]
+        if self.dispatcher is not None:
+            self.dispatcher.discard(observer)
 
     def notify_observers(self, symbol, data):
-        if symbol in self.observers:
-            for obs in self.observers[symbol]:
-                obs.update(data)
+        observers = self.observers.get(symbol)
+        if not observers:
+            return
+        t0 = time.perf_counter()
+        if self.dispatcher is not None:
+            # never block the feed thread: one hand-off, queues do the rest
+            self.dispatcher.dispatch(symbol, data, observers)
+            self._dispatch_time.observe(time.perf_counter() - t0, "async")
+            return
+        for obs in observers:
+            obs.update(data)
+        self._dispatch_time.observe(time.perf_counter() - t0, "sync")
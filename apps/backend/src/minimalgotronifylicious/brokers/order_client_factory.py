@@ -37,7 +37,7 @@ def resolve_broker_name(broker: Optional[str], market_open: Optional[bool]) -> s
     wanted = _alias(broker) or _alias(os.getenv("BROKER", "auto"))
 
     # CI/dev paper guard
-    if paper_env_enabled() and wanted not in ("angel_one", "binance", "paper_trade", "auto"):
+    if paper_env_enabled() and wanted not in ("angel_one", "binance", "paper_trade", "simulator", "auto"):
         wanted = "paper_trade"
 
     if wanted == "auto":
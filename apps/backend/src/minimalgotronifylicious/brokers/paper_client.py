@@ -1,39 +1,178 @@
 from __future__ import annotations
-import uuid, time
+import logging
+import os
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Union
+
+from src.minimalgotronifylicious.brokers.paper_fills import FillSimulator
+from src.minimalgotronifylicious.brokers.paper_matching import (
+    CANCELLED, OPEN, REJECTED, TRIGGER_PENDING, Fill, MatchingEngine,
+)
+from src.minimalgotronifylicious.brokers.portfolio import Portfolio, Position
+from src.minimalgotronifylicious.streaming.tick import iter_ticks
+from src.minimalgotronifylicious.streaming.tick_store import feed_broker, get_tick_store
+from src.minimalgotronifylicious.utils.symbols import SymbolMap, get_symbol_map
+
+log = logging.getLogger(__name__)
+
+
+_FLAT = Position("")
+
+
+def _paise(rupees: Optional[float]) -> Optional[int]:
+    return int(round(float(rupees) * 100)) if rupees is not None else None
+
 
 class PaperClient:
-    def __init__(self, seed_cash: float = 100_000.0):
-        self.cash = seed_cash
-        self.positions = {}  # {symbol: {"qty": int, "avg": float}}
-        self.orders = []
+    """
+    Paper account. PAPER_FILLS picks how orders execute:
+
+      book   (default) price-time-priority MatchingEngine, brokers/paper_matching.py;
+             marketable orders fill against the price quoted at arrival
+      ticks  FillSimulator, brokers/paper_fills.py; orders fill only on later
+             ticks, after latency, with slippage and fees
+
+    Either way positions and cash move only on fills, and are kept marked to
+    market by the Portfolio (brokers/portfolio.py).
+
+    Books, orders and positions are keyed by trading symbol (NSE:SBIN-EQ);
+    ticks arrive keyed EXCHANGE:TOKEN and are mapped back through the symbol
+    map of PAPER_FEED_BROKER. While a symbol has open orders or a position,
+    the client follows it on the TickHub (one shared upstream with the
+    /ws/stream viewers) and unfollows once it is flat with nothing open:
+
+        place_order ──► hub.follow(client, "NSE:3045") ──► ticks ──► update() ──► fills, marks
+
+    update() also takes ticks from anything else, e.g. a replaying
+    WebSocketManager: manager.register("NSE:3045", paper_client).
+
+    Prices come from the stream when it is fresh (tick store), else from the
+    engine's last trade, else a fixed synthetic price per symbol.
+    """
+
+    def __init__(self, seed_cash: float = 100_000.0, engine: Union[MatchingEngine, FillSimulator, None] = None,
+                 feed: Any = None, symbols: Optional[SymbolMap] = None):
+        self.portfolio = Portfolio(seed_cash)
+        if engine is None:
+            engine = FillSimulator() if os.getenv("PAPER_FILLS", "book").lower() == "ticks" else MatchingEngine()
+        self.engine = engine
+        self.engine.on_fill(self.portfolio.apply_fill)
+        self.engine.on_fill(self._settle)
+        self.feed_broker = feed_broker("paper_trade")
+        self.symbols = symbols if symbols is not None else get_symbol_map(self.feed_broker)
+        self._feed = feed  # TickHub; the process-wide hub when None
+        self._followed: set = set()
+        self._wanted: Dict[str, int] = {}  # bumped on every follow; an unfollow checks it did not move
+        self._follow_lock = threading.Lock()  # orders on request threads, fills on the loop
+
+    @property
+    def cash(self) -> float:
+        return self.portfolio.cash / 100.0
+
+    @property
+    def positions(self) -> Dict[str, Dict[str, Any]]:
+        """{symbol: {"qty": int, "avg": float}} for every symbol traded."""
+        return {s: {"qty": p.qty, "avg": p.avg / 100.0} for s, p in list(self.portfolio.positions.items())}
 
     # brokers/paper_client.py
     def ltp(self, symbol: str) -> float:
-        px = 100.0 + (hash(symbol) % 500) / 10
+        key = self.symbols.name(symbol)
+        hit = get_tick_store().get(self.symbols.feed(key), broker=self.feed_broker)
+        if hit is not None:
+            return hit[0]
+        last = self.engine.last(key)
+        if last is not None:
+            return last / 100.0
+        # same price in every worker (hash() is salted per process)
+        px = 100.0 + (zlib.crc32(key.encode()) % 500) / 10
         return round(px, 2)
 
+    def on_tick(self, symbol: str, ltp: float, volume: int = 0, ts: Optional[int] = None) -> List[Fill]:
+        """Trade print for a symbol: fires stops, fills resting orders it crossed, marks the position."""
+        return self._on_tick(self.symbols.name(symbol), _paise(ltp), volume, ts)
+
+    def update(self, message) -> None:
+        """Observer entry point: Tick, TickBatch or feed dict."""
+        for tick in iter_ticks(message):
+            name = self.symbols.name(f"{tick.exchange}:{tick.token}")
+            self._on_tick(name, tick.ltp, tick.volume, tick.exchange_ts or None)
+
+    def _on_tick(self, key: str, ltp: int, volume: int = 0, ts: Optional[int] = None) -> List[Fill]:
+        fills = self.engine.on_tick(key, ltp, volume, ts)
+        self.portfolio.mark(key, ltp)
+        return fills
+
+    def place_order(self, symbol: str, qty: int, side: str, type: str = "MARKET",
+                    price: Optional[float] = None, trigger_price: Optional[float] = None, **_):
+        key = self.symbols.name(symbol)
+        ref = _paise(self.ltp(key))
+        if isinstance(self.engine, MatchingEngine) and self.engine.last(key) != ref:
+            self.engine.on_tick(key, ref)  # the book trades against the price we quote
+        self.portfolio.mark(key, ref)
+        order = self.engine.submit(key, side, int(qty), type, _paise(price), _paise(trigger_price))
+        if order.status in (OPEN, TRIGGER_PENDING) or self.portfolio.positions.get(key, _FLAT).qty:
+            self._follow(key)
+        out = order.as_dict()
+        out["order_status"] = out.pop("status")  # OPEN / FILLED / TRIGGER_PENDING ...
+        out["status"] = "REJECTED" if order.status in (REJECTED, CANCELLED) else "ACCEPTED"
+        out["price"] = order.avg_price if order.filled else (order.price or ref) / 100.0
+        return out
+
+    def cancel_order(self, order_id: str) -> Dict[str, Any]:
+        order = self.engine.cancel(order_id)
+        if order is None:
+            return {"status": "error", "error": f"Unknown order {order_id}"}
+        self._unfollow_if_idle(order.symbol)
+        out = order.as_dict()
+        out["order_status"] = out.pop("status")
+        out["status"] = "success" if order.status == CANCELLED else "error"
+        return out
+
+    def order_book(self) -> List[Dict[str, Any]]:
+        return [o.as_dict() for o in list(self.engine.orders.values())]
+
+    def depth(self, symbol: str, levels: int = 5) -> Dict[str, Any]:
+        key = self.symbols.name(symbol)
+        return {"symbol": key, **self.engine.depth(key, levels)}
+
+    # ---------- feed ----------
+    def _hub(self):
+        if self._feed is None:
+            from src.minimalgotronifylicious.streaming.tick_hub import get_tick_hub
+            self._feed = get_tick_hub()
+        return self._feed
+
+    def _follow(self, key: str) -> None:
+        with self._follow_lock:
+            self._wanted[key] = self._wanted.get(key, 0) + 1
+            if key in self._followed:
+                return
+            try:
+                if self._hub().follow(self, self.symbols.feed(key), self.feed_broker):
+                    self._followed.add(key)
+            except ValueError as e:  # no feed for this exchange
+                log.info("Paper: not following %s: %s", key, e)
+
+    def _unfollow_if_idle(self, key: str) -> None:
+        with self._follow_lock:
+            if key not in self._followed:
+                return
+            wanted = self._wanted.get(key)
+        # engine lock taken outside ours: fills arrive holding the engine lock and then want ours
+        if self.portfolio.positions.get(key, _FLAT).qty or self.engine.open_orders(key):
+            return
+        with self._follow_lock:
+            if key not in self._followed or self._wanted.get(key) != wanted:
+                return  # an order came in meanwhile
+            self._followed.discard(key)
+            self._hub().unfollow(self, self.symbols.feed(key), self.feed_broker)
 
-    def place_order(self, symbol: str, qty: int, side: str, **_):
-        price = self.ltp(symbol)["ltp"]
-        oid = str(uuid.uuid4())
-        ts = int(time.time() * 1000)
-        self.orders.append({"order_id": oid, "symbol": symbol, "side": side, "price": price, "qty": qty, "ts": ts})
-        # Very simple portfolio math
-        p = self.positions.get(symbol, {"qty": 0, "avg": 0.0})
-        if side.upper() == "BUY":
-            new_qty = p["qty"] + qty
-            p["avg"] = (p["avg"] * p["qty"] + price * qty) / max(new_qty, 1)
-            p["qty"] = new_qty
-            self.cash -= price * qty
-        else:
-            p["qty"] -= qty
-            self.cash += price * qty
-            if p["qty"] == 0: p["avg"] = 0.0
-        self.positions[symbol] = p
-        return {"status": "ACCEPTED", "order_id": oid, "symbol": symbol, "side": side, "price": price, "qty": qty, "ts": ts}
+    def _settle(self, fill: Fill) -> None:
+        if not self.portfolio.positions.get(fill.symbol, _FLAT).qty:
+            self._unfollow_if_idle(fill.symbol)
 
     # convenience for portfolio endpoints
     def snapshot(self):
-        m2m = sum(self.ltp(s)["ltp"] * p["qty"] for s, p in self.positions.items())
-        return {"cash": round(self.cash, 2), "positions": [{"symbol": s, **p} for s, p in self.positions.items()],
-                "market_value": round(m2m, 2), "equity": round(self.cash + m2m, 2)}
+        """Positions and P&L as kept by the portfolio; O(positions), no price lookups."""
+        return self.portfolio.snapshot()
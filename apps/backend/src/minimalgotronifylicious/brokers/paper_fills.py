@@ -0,0 +1,265 @@
+# brokers/paper_fills.py
+"""
+Tick-driven fills for paper orders, with latency, slippage and fees.
+
+An order placed here is not filled on arrival. It becomes live at the
+exchange after PAPER_LATENCY_MS of market time, then fills on the first
+later tick that trades through it. Open orders are kept as columns, one
+block of NumPy arrays per symbol, so a tick costs one vectorized check
+over that symbol's orders, and Python only touches the orders that
+actually fill:
+
+    submit ──► block[symbol] row: side, kind, limit, trigger, remaining, active_at
+                                                  (= market clock + latency)
+    tick(ltp, volume, ts) ──► ready   = remaining > 0 & active_at <= ts
+                          ──► stops   : trigger reached → LIMIT / MARKET
+                          ──► crossed = MARKET | buy limit >= ltp | sell limit <= ltp
+                          ──► qty     = remaining, shared out in arrival order over
+                                        volume traded since the last tick × participation
+                          ──► price   = resting LIMIT (live before the previous tick): its limit
+                                        otherwise ltp ± slippage, never past the limit
+                          ──► fee     = turnover × fee_bps (+ flat fee on an order's first fill)
+
+Market time is the exchange timestamp of the ticks, so recorded sessions
+replay with the same latency as live ones. Prices are integer paise, and
+the orders themselves are paper_matching.PaperOrder so PaperClient reports
+them the same way in either fill mode.
+"""
+from __future__ import annotations
+
+import itertools
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.minimalgotronifylicious.brokers.paper_matching import (
+    BUY, CANCELLED, FILLED, LIMIT, MARKET, OPEN, REJECTED, SL, SLM, TRIGGER_PENDING, Fill, PaperOrder, order_error,
+)
+
+K_MARKET, K_LIMIT, K_SL, K_SLM = 0, 1, 2, 3
+KINDS = {MARKET: K_MARKET, LIMIT: K_LIMIT, SL: K_SL, SLM: K_SLM}
+
+
+def _now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+class _Block:
+    """Open orders of one symbol as columns; rows are in arrival order."""
+
+    def __init__(self, capacity: int = 16):
+        self.n = 0
+        self.side = np.zeros(capacity, np.int8)        # +1 buy, -1 sell
+        self.kind = np.zeros(capacity, np.int8)
+        self.limit = np.zeros(capacity, np.int64)      # paise; unused for MARKET
+        self.trigger = np.zeros(capacity, np.int64)
+        self.remaining = np.zeros(capacity, np.int64)  # 0 once filled or cancelled
+        self.active_at = np.zeros(capacity, np.int64)  # market ms
+        self.orders: List[PaperOrder] = []
+        self.rows: Dict[str, int] = {}
+        self.last: Optional[int] = None
+        self.last_ts: Optional[int] = None
+        self.volume = 0
+
+    _COLUMNS = ("side", "kind", "limit", "trigger", "remaining", "active_at")
+
+    def append(self, order: PaperOrder, side: int, kind: int, limit: int, trigger: int, active_at: int) -> None:
+        if self.n == len(self.side):
+            for name in self._COLUMNS:
+                col = getattr(self, name)
+                grown = np.zeros(2 * len(col), col.dtype)
+                grown[:self.n] = col[:self.n]
+                setattr(self, name, grown)
+        i = self.n
+        self.side[i], self.kind[i], self.limit[i] = side, kind, limit
+        self.trigger[i], self.remaining[i], self.active_at[i] = trigger, order.qty, active_at
+        self.orders.append(order)
+        self.rows[order.id] = i
+        self.n += 1
+
+    def compact(self) -> None:
+        keep = np.flatnonzero(self.remaining[:self.n] > 0)
+        for name in self._COLUMNS:
+            col = getattr(self, name)
+            col[:len(keep)] = col[keep]
+        self.orders = [self.orders[i] for i in keep]
+        self.rows = {o.id: i for i, o in enumerate(self.orders)}
+        self.n = len(keep)
+
+
+class FillSimulator:
+    def __init__(self, latency_ms: Optional[float] = None, slippage_bps: Optional[float] = None,
+                 fee_bps: Optional[float] = None, fee_per_order: Optional[float] = None,
+                 participation: Optional[float] = None):
+        env = os.getenv
+        self.latency_ms = latency_ms if latency_ms is not None else float(env("PAPER_LATENCY_MS", "50"))
+        self.slippage_bps = slippage_bps if slippage_bps is not None else float(env("PAPER_SLIPPAGE_BPS", "2"))
+        self.fee_bps = fee_bps if fee_bps is not None else float(env("PAPER_FEE_BPS", "3"))
+        # rupees, charged once per order (flat brokerage)
+        self.fee_per_order = fee_per_order if fee_per_order is not None else float(env("PAPER_FEE_FLAT", "20"))
+        # share of the volume traded since the previous tick that paper orders may take
+        self.participation = participation if participation is not None else float(env("PAPER_PARTICIPATION", "1"))
+        self.blocks: Dict[str, _Block] = {}
+        self.orders: Dict[str, PaperOrder] = {}
+        self._listeners: List[Callable[[Fill], None]] = []
+        self._seq = itertools.count()
+        self._ids = itertools.count(1)
+        self._prefix = uuid.uuid4().hex[:8]
+        self._clock: Optional[int] = None  # latest exchange ts seen on any symbol
+        self._lock = threading.Lock()
+
+    def on_fill(self, listener: Callable[[Fill], None]) -> None:
+        self._listeners.append(listener)
+
+    def _block(self, symbol: str) -> _Block:
+        b = self.blocks.get(symbol)
+        if b is None:
+            b = self.blocks[symbol] = _Block()
+        return b
+
+    def now(self) -> int:
+        """Market clock: the newest tick time seen, wall clock before any tick."""
+        return self._clock if self._clock is not None else _now_ms()
+
+    # ---------- orders ----------
+    def submit(self, symbol: str, side: str, qty: int, order_type: str = MARKET,
+               price: Optional[int] = None, trigger: Optional[int] = None) -> PaperOrder:
+        side, order_type = side.upper(), order_type.upper()
+        order = PaperOrder(f"S{self._prefix}-{next(self._ids)}", symbol, side, order_type, int(qty),
+                           price, trigger, next(self._seq))
+        error = order_error(order)
+        with self._lock:
+            self.orders[order.id] = order
+            if error:
+                order.status, order.message = REJECTED, error
+                return order
+            kind = KINDS[order_type]
+            if kind in (K_SL, K_SLM):
+                order.status = TRIGGER_PENDING
+            self._block(symbol).append(order, 1 if side == BUY else -1, kind, price or 0, trigger or 0,
+                                       self.now() + int(self.latency_ms))
+        return order
+
+    def cancel(self, order_id: str) -> Optional[PaperOrder]:
+        with self._lock:
+            order = self.orders.get(order_id)
+            if order is None:
+                return order
+            if order.status in (OPEN, TRIGGER_PENDING):
+                b = self.blocks[order.symbol]
+                b.remaining[b.rows[order.id]] = 0
+                order.status = CANCELLED
+            return order
+
+    # ---------- market data ----------
+    def on_tick(self, symbol: str, ltp: int, volume: int = 0, ts: Optional[int] = None) -> List[Fill]:
+        """A trade at `ltp` paise; `volume` is the day's cumulative volume (0 = unknown)."""
+        ts = ts or _now_ms()
+        with self._lock:
+            if self._clock is None or ts > self._clock:
+                self._clock = ts
+            b = self._block(symbol)
+            traded = volume - b.volume if volume and b.volume else None
+            if volume:
+                b.volume = volume
+            prev_ts, b.last, b.last_ts = b.last_ts, ltp, ts
+            if not b.n:
+                return []
+            fills = self._match(b, symbol, ltp, traded, ts, prev_ts)
+            if b.n > 64 and np.count_nonzero(b.remaining[:b.n]) < b.n // 2:
+                b.compact()
+        for fill in fills:
+            for listener in self._listeners:
+                listener(fill)
+        return fills
+
+    def _match(self, b: _Block, symbol: str, ltp: int, traded: Optional[int], ts: int,
+               prev_ts: Optional[int]) -> List[Fill]:
+        n = b.n
+        remaining, kind, side, limit = b.remaining[:n], b.kind[:n], b.side[:n], b.limit[:n]
+        ready = (remaining > 0) & (b.active_at[:n] <= ts)
+        if not ready.any():
+            return []
+        buy = side > 0
+
+        stops = ready & (kind >= K_SL)
+        if stops.any():
+            trig = b.trigger[:n]
+            hit = stops & np.where(buy, ltp >= trig, ltp <= trig)
+            kind[hit & (kind == K_SL)] = K_LIMIT
+            kind[hit & (kind == K_SLM)] = K_MARKET
+            ready &= ~(stops & ~hit)
+            for i in np.flatnonzero(hit):
+                b.orders[i].status = OPEN
+
+        crossed = ready & ((kind == K_MARKET) | np.where(buy, limit >= ltp, limit <= ltp))
+        idx = np.flatnonzero(crossed)
+        if not idx.size:
+            return []
+
+        want = remaining[idx]
+        if traded is not None:
+            cap = int(max(traded, 0) * self.participation)
+            before = np.cumsum(want) - want  # earlier arrivals are served first
+            qty = np.clip(cap - before, 0, want)
+        else:
+            qty = want
+        take = qty > 0
+        idx, qty = idx[take], qty[take]
+        if not idx.size:
+            return []
+
+        is_buy = buy[idx]
+        lim = limit[idx]
+        is_limit = kind[idx] == K_LIMIT
+        slip = self.slippage_bps / 10_000
+        taker = np.where(is_buy, ltp * (1 + slip), ltp * (1 - slip))
+        taker = np.where(is_limit, np.where(is_buy, np.minimum(taker, lim), np.maximum(taker, lim)), taker)
+        resting = is_limit & (b.active_at[idx] <= prev_ts) if prev_ts is not None else np.zeros(idx.size, bool)
+        price = np.rint(np.where(resting, lim, taker)).astype(np.int64)
+        filled_before = np.fromiter((b.orders[i].filled for i in idx), np.int64, idx.size)
+        fee = np.rint(qty * price * (self.fee_bps / 10_000) + (filled_before == 0) * self.fee_per_order * 100)
+
+        remaining[idx] -= qty
+        fills = []
+        for i, q, p, f, maker in zip(idx.tolist(), qty.tolist(), price.tolist(), fee.astype(np.int64).tolist(),
+                                     resting.tolist()):
+            order = b.orders[i]
+            order.filled += q
+            order.value += q * p
+            if order.filled == order.qty:
+                order.status = FILLED
+            fills.append(Fill(order.id, symbol, order.side, q, p, ts, maker, f))
+        return fills
+
+    # ---------- queries ----------
+    def last(self, symbol: str) -> Optional[int]:
+        b = self.blocks.get(symbol)
+        return b.last if b is not None else None
+
+    def depth(self, symbol: str, n: int = 5) -> Dict[str, List[Dict[str, float]]]:
+        """Open paper LIMIT orders aggregated by price."""
+        out: Dict[str, List[Dict[str, float]]] = {"bids": [], "asks": []}
+        with self._lock:
+            b = self.blocks.get(symbol)
+            if b is None or not b.n:
+                return out
+            live = (b.remaining[:b.n] > 0) & (b.kind[:b.n] == K_LIMIT)
+            for name, sign in (("bids", 1), ("asks", -1)):
+                mask = live & (b.side[:b.n] == sign)
+                prices, inverse = np.unique(b.limit[:b.n][mask], return_inverse=True)
+                qty = np.bincount(inverse, weights=b.remaining[:b.n][mask], minlength=len(prices))
+                orders = np.bincount(inverse, minlength=len(prices))
+                order = np.argsort(-sign * prices)[:n]
+                out[name] = [{"price": prices[i] / 100.0, "qty": int(qty[i]), "orders": int(orders[i])}
+                             for i in order]
+        return out
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[PaperOrder]:
+        with self._lock:
+            return [o for o in self.orders.values()
+                    if o.status in (OPEN, TRIGGER_PENDING) and (symbol is None or o.symbol == symbol)]
@@ -0,0 +1,356 @@
+# brokers/paper_matching.py
+"""
+Price-time-priority matching for paper trading.
+
+One OrderBook per symbol. Each side is a heap of price levels (integer
+paise) with a FIFO queue per level, arranged so the best level is always
+the heap's root: reading it is O(1), and adding a level or dropping a
+consumed one is O(log levels). Orders joining an existing level are O(1).
+Stop orders wait in the same structure keyed by trigger price.
+
+    submit(order) ──► SL/SL-M? ── trigger not reached ──► stops (by trigger)
+                          │
+                          ▼
+            cross resting opposite orders, best level first, FIFO within it
+                          │ remainder
+                          ▼
+            marketable vs last trade? ── yes ──► fill at last trade price
+                          │ no                   (MARKET always is)
+                          ▼
+                  rest on its side (LIMIT) / cancel (MARKET with no price)
+
+    on_tick(ltp, volume) ──► fire stops the trade crossed ──► match as above
+                        ──► fill resting orders the trade crossed, best level
+                            first, at their own limit, sharing the volume
+                            traded since the previous tick (all of it
+                            when the feed sends no volume)
+
+Cancels are O(1): the order is marked and skipped when its queue reaches
+it. Prices are integer paise throughout, like streaming.tick.Tick.
+"""
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+import uuid
+from heapq import heappop, heappush
+from collections import deque
+from typing import Callable, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+BUY, SELL = "BUY", "SELL"
+MARKET, LIMIT, SL, SLM = "MARKET", "LIMIT", "SL", "SL-M"
+
+# order status
+OPEN, TRIGGER_PENDING, FILLED, CANCELLED, REJECTED = "OPEN", "TRIGGER_PENDING", "FILLED", "CANCELLED", "REJECTED"
+DONE = (FILLED, CANCELLED, REJECTED)
+
+
+def _now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+class Fill(NamedTuple):
+    order_id: str
+    symbol: str
+    side: str
+    qty: int
+    price: int    # paise
+    ts: int       # ms since epoch
+    maker: bool   # True when the order was resting
+    fee: int = 0  # paise
+
+
+class PaperOrder:
+    __slots__ = ("id", "symbol", "side", "type", "qty", "filled", "price", "trigger", "status",
+                 "seq", "ts", "value", "message")
+
+    def __init__(self, oid: str, symbol: str, side: str, order_type: str, qty: int,
+                 price: Optional[int], trigger: Optional[int], seq: int):
+        self.id = oid
+        self.symbol = symbol
+        self.side = side
+        self.type = order_type
+        self.qty = qty
+        self.filled = 0
+        self.price = price        # limit, paise (None for MARKET / SL-M)
+        self.trigger = trigger    # paise, SL / SL-M only
+        self.status = OPEN
+        self.seq = seq            # time priority
+        self.ts = _now_ms()
+        self.value = 0            # Σ fill qty × price, paise
+        self.message: Optional[str] = None
+
+    @property
+    def remaining(self) -> int:
+        return self.qty - self.filled
+
+    @property
+    def avg_price(self) -> float:
+        return self.value / self.filled / 100.0 if self.filled else 0.0
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "order_id": self.id, "symbol": self.symbol, "side": self.side, "type": self.type,
+            "qty": self.qty, "filled": self.filled, "remaining": self.remaining,
+            "price": self.price / 100.0 if self.price is not None else None,
+            "trigger_price": self.trigger / 100.0 if self.trigger is not None else None,
+            "avg_price": round(self.avg_price, 2), "status": self.status, "ts": self.ts,
+            "message": self.message,
+        }
+
+
+def order_error(order: PaperOrder) -> Optional[str]:
+    """Why the order cannot be accepted, or None."""
+    if order.side not in (BUY, SELL):
+        return f"Bad side {order.side}"
+    if order.qty <= 0:
+        return "qty must be positive"
+    if order.type not in (MARKET, LIMIT, SL, SLM):
+        return f"Bad order type {order.type}"
+    if order.type in (LIMIT, SL) and not (order.price and order.price > 0):
+        return f"{order.type} order needs a price"
+    if order.type in (SL, SLM) and not (order.trigger and order.trigger > 0):
+        return f"{order.type} order needs a trigger price"
+    return None
+
+
+class PriceLevels:
+    """price → FIFO of orders; keys in a min-heap of -sign·price, so the best level is keys[0]."""
+
+    __slots__ = ("_sign", "_keys", "_queues")
+
+    def __init__(self, best_is_highest: bool):
+        self._sign = -1 if best_is_highest else 1
+        self._keys: List[int] = []
+        self._queues: Dict[int, Deque[PaperOrder]] = {}
+
+    def add(self, price: int, order: PaperOrder) -> None:
+        k = self._sign * price
+        q = self._queues.get(k)
+        if q is None:
+            q = self._queues[k] = deque()
+            heappush(self._keys, k)
+        q.append(order)
+
+    def best(self) -> Optional[int]:
+        """Best price that still has a live order; drops exhausted levels on the way."""
+        keys, queues = self._keys, self._queues
+        while keys:
+            q = queues[keys[0]]
+            while q and q[0].status in DONE:
+                q.popleft()
+            if q:
+                return self._sign * keys[0]
+            del queues[heappop(keys)]
+        return None
+
+    def head(self, price: int) -> PaperOrder:
+        return self._queues[self._sign * price][0]
+
+    def pop_head(self, price: int) -> None:
+        self._queues[self._sign * price].popleft()
+
+    def better_or_equal(self, price: int, than: int) -> bool:
+        """price is at least as good as `than` from this side's point of view."""
+        return self._sign * price <= self._sign * than
+
+    def levels(self) -> Iterator[Tuple[int, Deque[PaperOrder]]]:
+        """Best first; pops a copy of the heap, so reading k levels costs O(k log levels)."""
+        keys = list(self._keys)
+        while keys:
+            k = heappop(keys)
+            yield self._sign * k, self._queues[k]
+
+
+class OrderBook:
+    __slots__ = ("symbol", "bids", "asks", "buy_stops", "sell_stops", "last", "volume")
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids = PriceLevels(best_is_highest=True)
+        self.asks = PriceLevels(best_is_highest=False)
+        self.buy_stops = PriceLevels(best_is_highest=False)   # fire when ltp >= trigger, lowest first
+        self.sell_stops = PriceLevels(best_is_highest=True)   # fire when ltp <= trigger, highest first
+        self.last: Optional[int] = None
+        self.volume = 0
+
+    def side(self, side: str) -> PriceLevels:
+        return self.bids if side == BUY else self.asks
+
+    def opposite(self, side: str) -> PriceLevels:
+        return self.asks if side == BUY else self.bids
+
+    def depth(self, n: int = 5) -> Dict[str, List[Dict[str, float]]]:
+        out: Dict[str, List[Dict[str, float]]] = {}
+        for name, levels in (("bids", self.bids), ("asks", self.asks)):
+            rows = []
+            for price, q in levels.levels():
+                qty = sum(o.remaining for o in q if o.status == OPEN)
+                if qty:
+                    rows.append({"price": price / 100.0, "qty": qty, "orders": sum(o.status == OPEN for o in q)})
+                    if len(rows) == n:
+                        break
+            out[name] = rows
+        return out
+
+
+class MatchingEngine:
+    """
+    Books for every symbol plus the order index. One lock: orders arrive on
+    request threads and ticks on the feed thread. Fills go to every listener
+    (the paper account's position keeping) as they happen.
+    """
+
+    def __init__(self):
+        self.books: Dict[str, OrderBook] = {}
+        self.orders: Dict[str, PaperOrder] = {}
+        self._listeners: List[Callable[[Fill], None]] = []
+        self._seq = itertools.count()
+        self._ids = itertools.count(1)
+        self._prefix = uuid.uuid4().hex[:8]  # ids stay unique across restarts
+        self._lock = threading.RLock()
+
+    def on_fill(self, listener: Callable[[Fill], None]) -> None:
+        self._listeners.append(listener)
+
+    def book(self, symbol: str) -> OrderBook:
+        b = self.books.get(symbol)
+        if b is None:
+            b = self.books[symbol] = OrderBook(symbol)
+        return b
+
+    # ---------- orders ----------
+    def submit(self, symbol: str, side: str, qty: int, order_type: str = MARKET,
+               price: Optional[int] = None, trigger: Optional[int] = None) -> PaperOrder:
+        side, order_type = side.upper(), order_type.upper()
+        order = PaperOrder(f"P{self._prefix}-{next(self._ids)}", symbol, side, order_type, int(qty),
+                           price, trigger, next(self._seq))
+        error = order_error(order)
+        with self._lock:
+            self.orders[order.id] = order
+            if error:
+                order.status, order.message = REJECTED, error
+                return order
+            book = self.book(symbol)
+            if order_type in (SL, SLM):
+                if book.last is None or not self._stop_reached(order, book.last):
+                    order.status = TRIGGER_PENDING
+                    (book.buy_stops if side == BUY else book.sell_stops).add(trigger, order)
+                    return order
+                order.type = LIMIT if order_type == SL else MARKET  # already through the trigger
+            self._match(book, order)
+        return order
+
+    def cancel(self, order_id: str) -> Optional[PaperOrder]:
+        with self._lock:
+            order = self.orders.get(order_id)
+            if order is None:
+                return None
+            if order.status in (OPEN, TRIGGER_PENDING):
+                order.status = CANCELLED  # its queue skips it from now on
+            return order
+
+    # ---------- market data ----------
+    def on_tick(self, symbol: str, ltp: int, volume: int = 0, ts: Optional[int] = None) -> List[Fill]:
+        """
+        A trade at `ltp` (paise). `volume` is the day's cumulative volume; the
+        increase since the previous tick is what resting orders at the traded
+        price can share. 0 means unknown: crossed orders fill in full. `ts` is
+        accepted for parity with FillSimulator; the book has no latency model.
+        """
+        fills: List[Fill] = []
+        with self._lock:
+            book = self.book(symbol)
+            traded = volume - book.volume if volume and book.volume else None
+            if volume:
+                book.volume = volume
+            book.last = ltp
+            self._fire_stops(book, ltp, fills)
+            self._fill_resting(book, ltp, traded, fills)
+        return fills
+
+    # ---------- internals (lock held) ----------
+    @staticmethod
+    def _stop_reached(order: PaperOrder, ltp: int) -> bool:
+        return ltp >= order.trigger if order.side == BUY else ltp <= order.trigger
+
+    def _fire_stops(self, book: OrderBook, ltp: int, fills: List[Fill]) -> None:
+        for stops, reached in ((book.buy_stops, lambda t: ltp >= t), (book.sell_stops, lambda t: ltp <= t)):
+            while True:
+                trigger = stops.best()
+                if trigger is None or not reached(trigger):
+                    break
+                order = stops.head(trigger)
+                stops.pop_head(trigger)
+                order.status = OPEN
+                order.type = LIMIT if order.type == SL else MARKET
+                fills.extend(self._match(book, order))
+
+    def _fill(self, order: PaperOrder, qty: int, price: int, maker: bool, fills: List[Fill]) -> None:
+        order.filled += qty
+        order.value += qty * price
+        if order.filled == order.qty:
+            order.status = FILLED
+        fill = Fill(order.id, order.symbol, order.side, qty, price, _now_ms(), maker)
+        fills.append(fill)
+        for listener in self._listeners:
+            listener(fill)
+
+    def _match(self, book: OrderBook, order: PaperOrder) -> List[Fill]:
+        fills: List[Fill] = []
+        against = book.opposite(order.side)
+        own = book.side(order.side)
+        # 1) resting opposite orders, price then time priority
+        while order.remaining:
+            best = against.best()
+            if best is None or (order.type == LIMIT and not own.better_or_equal(order.price, best)):
+                break
+            maker = against.head(best)
+            qty = min(order.remaining, maker.remaining)
+            self._fill(maker, qty, best, True, fills)
+            self._fill(order, qty, best, False, fills)
+            if maker.status == FILLED:
+                against.pop_head(best)
+        if not order.remaining:
+            return fills
+        # 2) the market: marketable against the last trade
+        last = book.last
+        if last is not None and (order.type == MARKET or own.better_or_equal(order.price, last)):
+            self._fill(order, order.remaining, last, False, fills)
+        elif order.type == MARKET:
+            order.status, order.message = CANCELLED, "No market price to fill against"
+        else:
+            own.add(order.price, order)  # 3) rest
+        return fills
+
+    def _fill_resting(self, book: OrderBook, ltp: int, traded: Optional[int], fills: List[Fill]) -> None:
+        # a trade at ltp went through every bid >= ltp and every ask <= ltp
+        for levels in (book.bids, book.asks):
+            left = traded
+            while left is None or left > 0:
+                best = levels.best()
+                if best is None or not levels.better_or_equal(best, ltp):
+                    break
+                order = levels.head(best)
+                qty = order.remaining if left is None else min(order.remaining, left)
+                self._fill(order, qty, best, True, fills)
+                if left is not None:
+                    left -= qty
+                if order.status == FILLED:
+                    levels.pop_head(best)
+
+    # ---------- queries ----------
+    def last(self, symbol: str) -> Optional[int]:
+        book = self.books.get(symbol)
+        return book.last if book is not None else None
+
+    def depth(self, symbol: str, n: int = 5) -> Dict[str, List[Dict[str, float]]]:
+        with self._lock:
+            book = self.books.get(symbol)
+            return book.depth(n) if book is not None else {"bids": [], "asks": []}
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[PaperOrder]:
+        with self._lock:
+            return [o for o in self.orders.values()
+                    if o.status in (OPEN, TRIGGER_PENDING) and (symbol is None or o.symbol == symbol)]
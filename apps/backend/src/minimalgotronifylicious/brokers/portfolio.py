@@ -0,0 +1,173 @@
+# brokers/portfolio.py
+"""
+Mark-to-market portfolio, kept up to date incrementally.
+
+Positions change on fills and get revalued on ticks. Both only touch the one
+position involved, and the portfolio totals are running sums, adjusted by
+the difference the change made. So a tick costs O(1), a symbol nobody
+holds costs a dict miss, and nothing is ever recomputed across the book:
+
+    fill(symbol, side, qty, price, fee) ──► position: qty, avg, realized ──┐
+    tick(symbol, ltp) ── held? ── no ──► nothing                           ├─► revalue this position
+                           └── yes ──► position.last = ltp ───────────────┘        │
+                                                        totals += new - old (unrealized, value)
+                                                                                   ▼
+                                                   delta {position, totals, seq} ──► watchers
+
+Watchers are WebSockets (/ws/positions) or anything with update(). They get a
+snapshot on connect and afterwards only the positions that changed. Deltas
+carry the full state of their position, never increments. That lets each
+viewer queue conflate them per symbol: a slow viewer gets the latest state
+of each changed position, not a backlog. Every change takes the next `seq`,
+and snapshot rows and totals carry the seq of their last change. A client
+keeps, per symbol and for totals, whichever version has the highest seq,
+which also covers deltas that overtake the snapshot.
+
+Prices, fees and cash are integer paise like the paper engines; output is
+in rupees.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import threading
+from typing import Any, Dict, List, Optional
+
+from src.minimalgotronifylicious.brokers.mixins.async_dispatch import AsyncDispatcher, CONFLATE
+from src.minimalgotronifylicious.brokers.mixins.observer_mixin import ObserverMixin
+from src.minimalgotronifylicious.brokers.paper_matching import BUY, Fill
+
+ALL = "*"  # observer key: every watcher sees every position
+
+
+def _rupees(paise: float) -> float:
+    return round(paise / 100.0, 2)
+
+
+class Position:
+    __slots__ = ("symbol", "qty", "avg", "last", "realized", "unrealized", "value", "fees", "seq")
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.qty = 0
+        self.avg = 0.0         # paise
+        self.last: Optional[int] = None
+        self.realized = 0.0    # paise, gross of fees
+        self.unrealized = 0.0
+        self.value = 0
+        self.fees = 0
+        self.seq = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"symbol": self.symbol, "qty": self.qty, "avg": round(self.avg / 100.0, 4),
+                "last": self.last / 100.0 if self.last is not None else None,
+                "realized": _rupees(self.realized), "unrealized": _rupees(self.unrealized),
+                "value": _rupees(self.value), "fees": _rupees(self.fees), "seq": self.seq}
+
+
+class Portfolio(ObserverMixin):
+    def __init__(self, cash: float = 0.0):
+        super().__init__()
+        self.positions: Dict[str, Position] = {}
+        self.cash = int(round(cash * 100))  # paise
+        self.realized = 0.0
+        self.unrealized = 0.0
+        self.market_value = 0
+        self.fees = 0
+        self.seq = 0  # seq of the last change to the totals
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # ---------- updates ----------
+    def apply_fill(self, fill: Fill) -> Dict[str, Any]:
+        signed = fill.qty if fill.side == BUY else -fill.qty
+        with self._lock:
+            pos = self.positions.get(fill.symbol)
+            if pos is None:
+                pos = self.positions[fill.symbol] = Position(fill.symbol)
+            old = pos.qty
+            new = old + signed
+            if old and (old > 0) != (signed > 0):  # reduces, closes or flips
+                closed = min(abs(old), fill.qty)
+                pnl = closed * (fill.price - pos.avg) * (1 if old > 0 else -1)
+                pos.realized += pnl
+                self.realized += pnl
+            if old == 0 or (old > 0) == (signed > 0):
+                pos.avg = (pos.avg * abs(old) + fill.price * fill.qty) / abs(new)
+            elif new and (new > 0) != (old > 0):
+                pos.avg = float(fill.price)  # flipped through flat
+            pos.qty = new
+            if not new:
+                pos.avg = 0.0
+            if pos.last is None:
+                pos.last = fill.price
+            pos.fees += fill.fee
+            self.fees += fill.fee
+            self.cash -= signed * fill.price + fill.fee
+            delta = self._revalue(pos)
+        self._publish(delta)
+        return delta
+
+    def mark(self, symbol: str, ltp: int) -> Optional[Dict[str, Any]]:
+        """Revalue one position at `ltp` paise; None if it is not held or the price is unchanged."""
+        pos = self.positions.get(symbol)
+        if pos is None or pos.last == ltp:
+            return None
+        with self._lock:
+            pos.last = ltp
+            if not pos.qty:  # flat: remember the price, nothing to revalue or send
+                return None
+            delta = self._revalue(pos)
+        self._publish(delta)
+        return delta
+
+    def _revalue(self, pos: Position) -> Dict[str, Any]:
+        """Under the lock: refresh one position and move the totals by its difference."""
+        unrealized = (pos.last - pos.avg) * pos.qty
+        value = pos.last * pos.qty
+        self.unrealized += unrealized - pos.unrealized
+        self.market_value += value - pos.value
+        pos.unrealized, pos.value = unrealized, value
+        pos.seq = self.seq = next(self._seq)
+        return {"type": "delta", "position": pos.as_dict(), "totals": self._totals()}
+
+    # ---------- reads ----------
+    def _totals(self) -> Dict[str, Any]:
+        return {"cash": _rupees(self.cash), "realized": _rupees(self.realized),
+                "unrealized": _rupees(self.unrealized), "market_value": _rupees(self.market_value),
+                "fees": _rupees(self.fees), "equity": _rupees(self.cash + self.market_value), "seq": self.seq}
+
+    def totals(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._totals()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Every position plus totals, as kept; no prices are looked up."""
+        with self._lock:
+            rows: List[Dict[str, Any]] = [p.as_dict() for p in self.positions.values()]
+            totals = self._totals()
+        seq = totals.pop("seq")
+        return {**totals, "positions": rows, "seq": seq}
+
+    # ---------- watchers ----------
+    def _publish(self, delta: Dict[str, Any]) -> None:
+        observers = self.observers.get(ALL)
+        if not observers:
+            return
+        if self.dispatcher is not None:
+            # conflated per symbol, so the position's symbol is the queue key
+            self.dispatcher.dispatch(delta["position"]["symbol"], delta, observers)
+            return
+        for obs in observers:
+            obs.update(delta)
+
+    async def watch(self, websocket) -> None:
+        """Start streaming to a WebSocket: the snapshot now, then deltas as positions change."""
+        if self.dispatcher is None:
+            self.attach_dispatcher(AsyncDispatcher(policy=CONFLATE, on_overflow=self.unwatch))
+        self.dispatcher.bind(asyncio.get_running_loop())
+        self.add_observer(ALL, websocket)
+        await websocket.send_json({"type": "snapshot", **self.snapshot()})
+
+    def unwatch(self, websocket) -> None:
+        self.remove_observer(ALL, websocket)
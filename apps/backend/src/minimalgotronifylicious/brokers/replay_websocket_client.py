@@ -0,0 +1,140 @@
+# brokers/replay_websocket_client.py
+"""
+A feed socket that plays back recorded segments (see streaming/recorder.py).
+
+Drop-in for AngelOneWebSocketV2Client behind WebSocketManager: connect()
+opens, emits every recorded frame through the same decoder and on_data
+callback, sets `done`, then stays open and quiet until disconnect() (a
+replay that closed would just be reconnected and played again). The
+manager → observers → UI path runs exactly as in production, minus the
+broker login.
+
+    speed=1      original pacing (receive timestamps, mapped to wall time)
+    speed=N      N× faster
+    speed=0      as fast as possible
+
+Only subscribed tokens are emitted unless subscribe_all=True, so demand-
+driven subscriptions replay the way they happened.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Iterable, Iterator, Optional, Set, Tuple, Union
+
+from src.minimalgotronifylicious.brokers.abstract_websocket_client import AbstractWebSocketClient
+from src.minimalgotronifylicious.brokers.angelone_tick_decoder import decode_ticks
+from src.minimalgotronifylicious.streaming.recorder import iter_frames, list_segments, segment_clock
+from src.minimalgotronifylicious.utils.metrics import get_metrics
+from src.minimalgotronifylicious.utils.tracing import get_tracer
+
+log = logging.getLogger(__name__)
+
+
+def recorded_frames(source: Union[str, Iterable[str]]) -> Iterator[Tuple[int, bytes]]:
+    """(wall_ns, frame) across segments; a directory means every segment under it, oldest first."""
+    paths = list_segments(source) if isinstance(source, str) and os.path.isdir(source) else (
+        [source] if isinstance(source, str) else list(source))
+    for path in paths:
+        wall0, mono0 = segment_clock(path)
+        for ts, frame in iter_frames(path):
+            yield wall0 + (ts - mono0), frame
+
+
+class ReplayWebSocketClient(AbstractWebSocketClient):
+    def __init__(self, source: Union[str, Iterable[str]], speed: float = 1.0, subscribe_all: bool = False):
+        super().__init__()
+        self.source = source
+        self.speed = speed
+        self.subscribe_all = subscribe_all
+        self._tokens: Set[str] = set()
+        self._stop = threading.Event()
+        self.done = threading.Event()
+        self._on_pong = None
+        self.metrics = get_metrics()
+        self.tracer = get_tracer()
+        self.frames = 0
+        self.ticks = 0
+        self.elapsed_s = 0.0
+        self.set_callbacks(lambda ws, msg: None)
+
+    # ---------- BaseWebSocketClient ----------
+    def connect(self):
+        """Blocks for the whole replay, like SmartWebSocketV2.connect()."""
+        self._stop.clear()
+        self.done.clear()
+        self._connected = True
+        self._on_open(self)
+        started = time.perf_counter()
+        try:
+            self._play(started)
+        except Exception as e:
+            self._connected = False
+            self._on_error(self, e)
+            raise
+        finally:
+            self.elapsed_s = time.perf_counter() - started
+        self.done.set()
+        self._stop.wait()
+        self._connected = False
+        self._on_close(self)
+
+    def run_forever(self):
+        self.connect()
+
+    def disconnect(self):
+        self._stop.set()
+
+    def subscribe(self, correlation_id: str, mode, token_list: list):
+        for entry in token_list:
+            self._tokens.update(str(t) for t in entry["tokens"])
+
+    def unsubscribe(self, correlation_id: str, mode, token_list: list):
+        for entry in token_list:
+            self._tokens.difference_update(str(t) for t in entry["tokens"])
+
+    # ---------- liveness (answers at once) ----------
+    def set_pong_callback(self, on_pong):
+        self._on_pong = on_pong
+
+    def ping(self, payload: str = ""):
+        if self._on_pong is not None:
+            self._on_pong(payload)
+
+    # ---------- playback ----------
+    def _play(self, started: float) -> None:
+        first: Optional[int] = None
+        speed = self.speed
+        for wall_ns, frame in recorded_frames(self.source):
+            if self._stop.is_set():
+                return
+            if speed:
+                if first is None:
+                    first = wall_ns
+                due = started + (wall_ns - first) / 1e9 / speed
+                ahead = due - time.perf_counter()
+                if ahead > 0.001:  # sub-ms gaps go out back to back
+                    if self._stop.wait(ahead):
+                        return
+            self.frames += 1
+            t0 = time.perf_counter()
+            try:
+                ticks = decode_ticks(frame)
+            except (ValueError, TypeError) as e:
+                log.debug("ReplayWebSocketClient: skipping undecodable frame (%s)", e)
+                continue
+            t1 = time.perf_counter()
+            self.tracer.frame(t0, t1)
+            self.metrics.decode.observe(t1 - t0, "replay")
+            self.metrics.frames.inc("replay")
+            for tick in ticks:
+                if self.subscribe_all or tick.token in self._tokens:
+                    self.ticks += 1
+                    self._on_data(self, tick)
+
+    def stats(self) -> dict:
+        rate = self.ticks / self.elapsed_s if self.elapsed_s else 0.0
+        return {"frames": self.frames, "ticks": self.ticks, "elapsed_s": round(self.elapsed_s, 3),
+                "ticks_per_s": round(rate, 1)}
@@ -0,0 +1,290 @@
+# brokers/request_scheduler.py
+"""
+Every broker REST call goes through one scheduler.
+
+- Token bucket per (broker, lane): calls wait for a token instead of
+  bursting into HTTP 429/403 and tripping the Circuit.
+- Priority lanes: ORDER before QUOTE before HISTORY. When workers are
+  busy, a queued order is dispatched ahead of every queued quote.
+- Coalescing: identical reads that are queued or in flight share one
+  upstream call; every waiter gets the same result (or exception).
+
+    caller ─► call(broker, lane, fn, key=...) ─► pending (by lane, then FIFO)
+                                                    │ dispatcher: first job whose bucket has a token
+                                                    ▼
+                                              worker pool ─► fn() ─► Future ─► all waiters
+
+Brokers without limits (paper_trade) are called inline.
+"""
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from src.minimalgotronifylicious.utils.metrics import get_metrics
+
+log = logging.getLogger(__name__)
+
+ORDER, QUOTE, HISTORY = 0, 1, 2
+LANES = {"order": ORDER, "quote": QUOTE, "history": HISTORY}
+LANE_NAMES = {lane: name for name, lane in LANES.items()}
+
+# (requests per second, burst) — SmartAPI publishes per-endpoint limits; stay a little under them
+DEFAULT_LIMITS: Dict[str, Dict[int, Tuple[float, int]]] = {
+    "angel_one": {ORDER: (9, 9), QUOTE: (9, 9), HISTORY: (3, 3)},
+    "binance": {ORDER: (10, 10), QUOTE: (20, 40), HISTORY: (5, 10)},
+}
+
+# client method → lane, for ScheduledClient
+METHOD_LANES = {
+    "place_order": ORDER, "modify_order": ORDER, "cancel_order": ORDER,
+    "ltp": QUOTE, "get_positions": QUOTE, "get_holdings": QUOTE, "positions": QUOTE,
+    "get_order_book": QUOTE, "get_trade_book": QUOTE, "option_chain": QUOTE,
+    "fetch_candles": HISTORY, "getCandleData": HISTORY,
+}
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "stamp")
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.stamp = time.monotonic()
+
+    def wait_time(self, now: float) -> float:
+        """0 if a token is available now, else seconds until one is."""
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1.0
+
+
+def _method(fn: Callable) -> str:
+    return getattr(fn, "__name__", None) or type(fn).__name__
+
+
+class _Job:
+    __slots__ = ("broker", "lane", "seq", "fn", "args", "kwargs", "key", "future", "queued")
+
+    def __init__(self, broker, lane, seq, fn, args, kwargs, key):
+        self.broker = broker
+        self.lane = lane
+        self.seq = seq
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.key = key
+        self.future: Future = Future()
+        self.queued = time.perf_counter()
+
+
+class RequestScheduler:
+    def __init__(self, limits: Optional[Dict[str, Dict[int, Tuple[float, int]]]] = None,
+                 workers: Optional[int] = None):
+        self.limits = DEFAULT_LIMITS if limits is None else limits
+        self._buckets: Dict[Tuple[str, int], TokenBucket] = {}
+        self._pending: List[List[_Job]] = [[] for _ in LANES]
+        self._inflight: Dict[Hashable, Future] = {}
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        workers = workers or int(os.getenv("BROKER_WORKERS", "8"))
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="broker-call")
+        # a job is only picked when a worker is free, so priority holds under load
+        self._slots = threading.Semaphore(workers)
+        self._dispatcher: Optional[threading.Thread] = None
+        self.coalesced = 0
+        self.metrics = get_metrics()
+
+    def limited(self, broker: str) -> bool:
+        return broker in self.limits
+
+    # ---------- public ----------
+    def submit(self, broker: str, lane: int, fn: Callable, *args,
+               key: Optional[Hashable] = None, **kwargs) -> Future:
+        """
+        Queue fn(*args, **kwargs). Reads pass a `key`; a second submit with
+        the same (broker, lane, key) while the first is pending or running
+        gets the first one's Future.
+        """
+        if not self.limited(broker):
+            fut: Future = Future()
+            t0 = time.perf_counter()
+            try:
+                fut.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                fut.set_exception(e)
+            self._observe(broker, fn, t0, fut.exception() is None)
+            return fut
+
+        ckey = (broker, lane, key) if key is not None else None
+        with self._cond:
+            if ckey is not None:
+                existing = self._inflight.get(ckey)
+                if existing is not None:
+                    self.coalesced += 1
+                    return existing
+            job = _Job(broker, lane, next(self._seq), fn, args, kwargs, ckey)
+            if ckey is not None:
+                self._inflight[ckey] = job.future
+            self._pending[lane].append(job)
+            self._ensure_dispatcher()
+            self._cond.notify()
+        return job.future
+
+    def call(self, broker: str, lane: int, fn: Callable, *args, key: Optional[Hashable] = None,
+             timeout: Optional[float] = None, **kwargs) -> Any:
+        return self.submit(broker, lane, fn, *args, key=key, **kwargs).result(timeout)
+
+    def depths(self) -> Dict[str, int]:
+        with self._cond:
+            return {name: len(self._pending[lane]) for name, lane in LANES.items()}
+
+    # ---------- dispatch ----------
+    def _bucket(self, broker: str, lane: int) -> Optional[TokenBucket]:
+        b = self._buckets.get((broker, lane))
+        if b is None:
+            spec = self.limits.get(broker, {}).get(lane)
+            if spec is None:
+                return None
+            b = self._buckets[(broker, lane)] = TokenBucket(*spec)
+        return b
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None or not self._dispatcher.is_alive():
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, name="broker-scheduler", daemon=True)
+            self._dispatcher.start()
+
+    def _next_job(self) -> Tuple[Optional[_Job], Optional[float]]:
+        """Highest-priority runnable job, else how long until one could run."""
+        now = time.monotonic()
+        soonest = None
+        for queue in self._pending:  # lanes in priority order
+            blocked = set()
+            for i, job in enumerate(queue):
+                if job.broker in blocked:
+                    continue  # keep FIFO within a (broker, lane)
+                bucket = self._bucket(job.broker, job.lane)
+                wait = 0.0 if bucket is None else bucket.wait_time(now)
+                if wait == 0.0:
+                    if bucket is not None:
+                        bucket.take()
+                    del queue[i]
+                    return job, None
+                blocked.add(job.broker)
+                soonest = wait if soonest is None else min(soonest, wait)
+        return None, soonest
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            self._slots.acquire()
+            with self._cond:
+                job, wait = self._next_job()
+                while job is None:
+                    self._cond.wait(timeout=wait)
+                    job, wait = self._next_job()
+            self._pool.submit(self._run, job)
+
+    def _run(self, job: _Job) -> None:
+        if not job.future.set_running_or_notify_cancel():  # cancelled while queued, e.g. its caller timed out
+            self._finish(job)
+            self._slots.release()
+            return
+        t0 = time.perf_counter()
+        self.metrics.broker_wait.observe(t0 - job.queued, job.broker, LANE_NAMES[job.lane])
+        try:
+            result = job.fn(*job.args, **job.kwargs)
+        except BaseException as e:
+            self._observe(job.broker, job.fn, t0, False)
+            self._finish(job)
+            job.future.set_exception(e)
+        else:
+            self._observe(job.broker, job.fn, t0, True)
+            self._finish(job)
+            job.future.set_result(result)
+        finally:
+            self._slots.release()
+
+    def _observe(self, broker: str, fn: Callable, t0: float, ok: bool) -> None:
+        self.metrics.broker_call.observe(time.perf_counter() - t0, broker, _method(fn), "ok" if ok else "error")
+
+    def _finish(self, job: _Job) -> None:
+        if job.key is not None:
+            with self._cond:
+                if self._inflight.get(job.key) is job.future:
+                    del self._inflight[job.key]
+
+
+class ScheduledClient:
+    """
+    Wraps a broker client so its REST methods go through the scheduler.
+    Lane comes from METHOD_LANES; reads are coalesced on (method, args).
+    Anything not listed (attributes, helpers) passes straight through.
+    """
+
+    def __init__(self, broker: str, client: Any, scheduler: RequestScheduler):
+        self._broker = broker
+        self._client = client
+        self._scheduler = scheduler
+
+    @property
+    def wrapped(self) -> Any:
+        return self._client
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._client, name)
+        lane = METHOD_LANES.get(name)
+        if lane is None or not callable(attr):
+            return attr
+
+        def scheduled(*args, **kwargs):
+            key = None
+            if lane != ORDER:
+                try:
+                    key = (name, args, tuple(sorted(kwargs.items())))
+                    hash(key)
+                except TypeError:
+                    key = None  # unhashable args → no coalescing
+            return self._scheduler.call(self._broker, lane, attr, *args, key=key, **kwargs)
+
+        scheduled.__name__ = name
+        return scheduled
+
+    def submit(self, name: str, *args, **kwargs) -> Future:
+        """Queue client.name(...) without waiting, e.g. to fan a basket of orders out."""
+        lane = METHOD_LANES.get(name, ORDER)
+        return self._scheduler.submit(self._broker, lane, getattr(self._client, name), *args, **kwargs)
+
+
+def submit_call(client: Any, name: str, *args, **kwargs) -> Future:
+    """
+    Future for client.name(*args, **kwargs): queued on the scheduler (within
+    the broker's rate limit) for a ScheduledClient, run inline otherwise.
+    """
+    if isinstance(client, ScheduledClient):
+        return client.submit(name, *args, **kwargs)
+    fut: Future = Future()
+    try:
+        fut.set_result(getattr(client, name)(*args, **kwargs))
+    except BaseException as e:
+        fut.set_exception(e)
+    return fut
+
+
+def scheduled_client(broker: str, client: Any, scheduler: Optional[RequestScheduler] = None) -> Any:
+    scheduler = scheduler or get_scheduler()
+    return ScheduledClient(broker, client, scheduler) if scheduler.limited(broker) else client
+
+
+@lru_cache(maxsize=1)
+def get_scheduler() -> RequestScheduler:
+    return RequestScheduler()
@@ -0,0 +1,412 @@
+# brokers/sim_market.py
+"""
+Synthetic market for load testing without a broker login.
+
+A few index underlyings plus SIM_SYMBOLS equities follow correlated
+geometric Brownian motion (one market factor; SIM_CORR is the pairwise
+correlation between equities). Each index carries an option chain, ATM ±
+SIM_STRIKES strikes, CE and PE, priced Black-Scholes off the index on
+every step, so option ticks move with their underlying:
+
+    sync() ── elapsed × SIM_TIME_SCALE ──► step(dt)
+                                             │ z_mkt, z_i ~ N(0,1)
+                                             │ S_i *= exp(−σ²h/2 + σ√h (β_i z_mkt + √(1−β_i²) z_i))
+                                             ▼
+                                           options: BS(S_u, K, T − elapsed, iv(K/S_u))
+    frame(idx) ──► Angel binary packets, built as one NumPy record array
+
+The feed side (brokers/sim_websocket_client.py) and SimClient below read
+the same process-wide market, so fills happen at prices viewers saw.
+Every instrument has a numeric token from 900001 up, NSE for equities and
+indices, NFO for options, so TickHub keys look like a live feed's.
+"""
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.minimalgotronifylicious.brokers.angelone_tick_decoder import QUOTE
+
+TRADING_SECONDS_PER_YEAR = 252 * 375 * 60
+RISK_FREE = 0.065
+SMILE = 8.0          # iv × (1 + SMILE · ln(K/S)²)
+FIRST_TOKEN = 900001
+
+# name, spot, strike step, annual vol, lot size
+INDICES = (
+    ("NIFTY", 22500.0, 50.0, 0.14, 75),
+    ("BANKNIFTY", 48000.0, 100.0, 0.18, 35),
+    ("FINNIFTY", 21500.0, 50.0, 0.16, 65),
+)
+INDEX_LOADING = 0.95
+
+# SmartWebSocketV2 packet layouts (see angelone_tick_decoder) as packed records
+LTP_PACKET = np.dtype([
+    ("mode", "u1"), ("exchange_type", "u1"), ("token", "S25"),
+    ("seq", "<i8"), ("exchange_ts", "<i8"), ("ltp", "<i8"),
+])
+QUOTE_PACKET = np.dtype(LTP_PACKET.descr + [
+    ("ltq", "<i8"), ("avg_price", "<i8"), ("volume", "<i8"),
+    ("buy_qty", "<f8"), ("sell_qty", "<f8"),
+    ("open", "<i8"), ("high", "<i8"), ("low", "<i8"), ("close", "<i8"),
+])
+assert LTP_PACKET.itemsize == 51 and QUOTE_PACKET.itemsize == 123
+
+_erf = np.frompyfunc(math.erf, 1, 1)
+
+
+def _ncdf(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + _erf(x / math.sqrt(2.0)).astype(np.float64))
+
+
+def _paise(rupees: np.ndarray) -> np.ndarray:
+    """Rupees → paise on the 5-paise tick grid."""
+    return np.rint(rupees * 20.0).astype(np.int64) * 5
+
+
+def black_scholes(spot, strike, t, iv, call, r: float = RISK_FREE):
+    """Vectorised European price; `call` is a bool mask (False → put)."""
+    sd = iv * np.sqrt(t)
+    d1 = (np.log(spot / strike) + (r + 0.5 * iv * iv) * t) / sd
+    d2 = d1 - sd
+    disc = strike * np.exp(-r * t)
+    c = spot * _ncdf(d1) - disc * _ncdf(d2)
+    p = disc * _ncdf(-d2) - spot * _ncdf(-d1)
+    return np.where(call, c, p)
+
+
+class MarketSimulator:
+    def __init__(self, symbols: Optional[int] = None, corr: Optional[float] = None,
+                 strikes: Optional[int] = None, indices: Optional[int] = None, expiry_days: int = 7,
+                 time_scale: Optional[float] = None, seed: Optional[int] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        symbols = symbols if symbols is not None else int(os.getenv("SIM_SYMBOLS", "2000"))
+        corr = corr if corr is not None else float(os.getenv("SIM_CORR", "0.3"))
+        strikes = strikes if strikes is not None else int(os.getenv("SIM_STRIKES", "10"))
+        indices = indices if indices is not None else int(os.getenv("SIM_INDICES", "2"))
+        self.time_scale = time_scale if time_scale is not None else float(os.getenv("SIM_TIME_SCALE", "1"))
+        if seed is None and os.getenv("SIM_SEED"):
+            seed = int(os.getenv("SIM_SEED"))
+        if not 0.0 <= corr < 1.0:
+            raise ValueError(f"SIM_CORR must be in [0, 1): {corr}")
+        self.rng = np.random.default_rng(seed)
+        self._clock = clock
+        self._lock = threading.Lock()
+        rng = self.rng
+
+        # ---------- underlyings: indices, then equities ----------
+        idx = INDICES[:indices]
+        names = [row[0] for row in idx] + [f"SIM{i + 1:05d}" for i in range(symbols)]
+        self.spot = np.concatenate([[row[1] for row in idx],
+                                    np.exp(rng.uniform(math.log(50), math.log(5000), symbols))])
+        self.sigma = np.concatenate([[row[3] for row in idx], rng.uniform(0.15, 0.45, symbols)])
+        self.loading = np.concatenate([np.full(len(idx), INDEX_LOADING), np.full(symbols, math.sqrt(corr))])
+        self.idio = np.sqrt(1.0 - self.loading ** 2)
+        n_under = len(names)
+
+        # ---------- option chains on the indices ----------
+        self.expiry = (date.today() + timedelta(days=expiry_days)).isoformat()
+        self.expiry_t = expiry_days / 365.0
+        tag = self.expiry.replace("-", "")[2:]
+        under, strike, call = [], [], []
+        lots = [row[4] for row in idx] + [1] * symbols
+        self.step_of: Dict[str, float] = {}
+        for u, (name, spot, step, _vol, lot) in enumerate(idx):
+            self.step_of[name] = step
+            atm = round(spot / step) * step
+            for k in range(-strikes, strikes + 1):
+                for is_call in (True, False):
+                    k_px = atm + k * step
+                    under.append(u)
+                    strike.append(k_px)
+                    call.append(is_call)
+                    lots.append(lot)
+                    names.append(f"{name}{tag}{int(k_px)}{'CE' if is_call else 'PE'}")
+        self.n_under = n_under
+        self.opt_under = np.array(under, dtype=np.int64)
+        self.opt_strike = np.array(strike, dtype=np.float64)
+        self.opt_call = np.array(call, dtype=bool)
+        self.elapsed_t = 0.0  # years of simulated time
+
+        # ---------- every instrument ----------
+        n = len(names)
+        self.names: List[str] = names
+        self.tokens: List[str] = [str(FIRST_TOKEN + i) for i in range(n)]
+        self.token_bytes = np.array([t.encode() for t in self.tokens], dtype="S25")
+        self.exchange_type = np.concatenate([np.ones(n_under, np.uint8), np.full(n - n_under, 2, np.uint8)])
+        self.lot = np.array(lots, dtype=np.int64)
+        self.price = np.empty(n, dtype=np.float64)
+        self.price[:n_under] = self.spot
+        self._reprice()
+        self.open = self.price.copy()
+        self.high = self.price.copy()
+        self.low = self.price.copy()
+        self.volume = np.zeros(n, dtype=np.int64)
+        self.turnover = np.zeros(n, dtype=np.float64)
+        self.seq = 0
+        self._index: Dict[str, int] = {}
+        for i, (name, token) in enumerate(zip(self.names, self.tokens)):
+            ex = "NSE" if i < n_under else "NFO"
+            for key in (name, f"{ex}:{name}", f"{ex}:{token}"):
+                self._index[key] = i
+        self._t = clock()
+
+    # ---------- dynamics ----------
+    def _implied_vol(self) -> np.ndarray:
+        s = self.spot[self.opt_under]
+        return self.sigma[self.opt_under] * (1.0 + SMILE * np.log(self.opt_strike / s) ** 2)
+
+    def _time_left(self) -> float:
+        return max(self.expiry_t - self.elapsed_t, 1.0 / (365 * 24 * 60))  # floor: one minute
+
+    def _reprice(self) -> None:
+        if not len(self.opt_under):
+            return
+        px = black_scholes(self.spot[self.opt_under], self.opt_strike, self._time_left(),
+                           self._implied_vol(), self.opt_call)
+        self.price[self.n_under:] = np.maximum(px, 0.05)
+
+    def step(self, dt_s: float) -> None:
+        """Advance every price by dt_s seconds of trading time."""
+        if dt_s <= 0:
+            return
+        h = dt_s / TRADING_SECONDS_PER_YEAR
+        z = self.rng.standard_normal(self.n_under + 1)
+        shock = self.loading * z[0] + self.idio * z[1:]
+        self.spot *= np.exp(-0.5 * self.sigma ** 2 * h + self.sigma * math.sqrt(h) * shock)
+        self.elapsed_t += h
+        self.price[:self.n_under] = self.spot
+        self._reprice()
+        np.maximum(self.high, self.price, out=self.high)
+        np.minimum(self.low, self.price, out=self.low)
+
+    def sync(self) -> None:
+        """Catch the simulation up with the clock; safe to call from every feed thread."""
+        with self._lock:
+            now = self._clock()
+            dt, self._t = now - self._t, now
+            self.step(dt * self.time_scale)
+
+    # ---------- packets ----------
+    def frame(self, idx: np.ndarray, mode: int = QUOTE) -> bytes:
+        """One binary frame with a packet per index in idx (repeats allowed)."""
+        k = len(idx)
+        with self._lock:
+            pk = np.empty(k, dtype=QUOTE_PACKET if mode >= QUOTE else LTP_PACKET)
+            pk["mode"] = mode
+            pk["exchange_type"] = self.exchange_type[idx]
+            pk["token"] = self.token_bytes[idx]
+            pk["seq"] = np.arange(self.seq + 1, self.seq + k + 1)
+            pk["exchange_ts"] = int(time.time() * 1000)
+            price = self.price[idx]
+            pk["ltp"] = _paise(price)
+            self.seq += k
+            if mode >= QUOTE:
+                ltq = self.rng.integers(1, 20, k) * self.lot[idx]
+                np.add.at(self.volume, idx, ltq)
+                np.add.at(self.turnover, idx, ltq * price)
+                vol = self.volume[idx]
+                pk["ltq"] = ltq
+                pk["avg_price"] = _paise(self.turnover[idx] / vol)
+                pk["volume"] = vol
+                pk["buy_qty"] = vol * self.rng.uniform(0.3, 0.7, k)
+                pk["sell_qty"] = vol - pk["buy_qty"]
+                pk["open"] = _paise(self.open[idx])
+                pk["high"] = _paise(self.high[idx])
+                pk["low"] = _paise(self.low[idx])
+                pk["close"] = pk["open"]
+        return pk.tobytes()
+
+    # ---------- lookups ----------
+    def index_of(self, symbol: str) -> int:
+        """'NIFTY', 'SIM00042', 'NSE:900001', 'NFO:<tradingsymbol>' … → instrument index."""
+        i = self._index.get(str(symbol).strip().upper())
+        if i is None:
+            raise ValueError(f"Unknown instrument: {symbol}")
+        return i
+
+    def key(self, i: int) -> str:
+        return f"{'NSE' if i < self.n_under else 'NFO'}:{self.tokens[i]}"
+
+    def ltp(self, symbol: str) -> float:
+        i = self.index_of(symbol)
+        self.sync()
+        return round(float(self.price[i]), 2)
+
+    def option_rows(self, underlying: str) -> List[Dict[str, Any]]:
+        u = self.index_of(underlying)
+        self.sync()
+        with self._lock:
+            rows = []
+            iv = self._implied_vol()
+            for j in np.flatnonzero(self.opt_under == u):
+                i = self.n_under + int(j)
+                ltp = round(float(self.price[i]), 2)
+                half = max(0.05, round(ltp * 0.0025, 2))
+                strike = float(self.opt_strike[j])
+                rows.append(dict(
+                    tradingsymbol=self.names[i], exchange="NFO", token=self.tokens[i],
+                    strike=strike, side="CE" if self.opt_call[j] else "PE", expiry=self.expiry,
+                    ltp=ltp, iv=round(float(iv[j]) * 100, 2),
+                    oi=int(500000 * math.exp(-abs(math.log(strike / self.spot[u])) * 40)),
+                    bid=round(ltp - half, 2), ask=round(ltp + half, 2),
+                ))
+        return rows
+
+    def greeks(self, symbol: str) -> Dict[str, float]:
+        i = self.index_of(symbol)
+        if i < self.n_under:
+            raise ValueError(f"{symbol} is not an option")
+        j = i - self.n_under
+        self.sync()
+        with self._lock:
+            s = float(self.spot[self.opt_under[j]])
+            iv = float(self._implied_vol()[j])
+            t = self._time_left()
+        k = float(self.opt_strike[j])
+        sd = iv * math.sqrt(t)
+        d1 = (math.log(s / k) + (RISK_FREE + 0.5 * iv * iv) * t) / sd
+        d2 = d1 - sd
+        pdf = math.exp(-0.5 * d1 * d1) / math.sqrt(2 * math.pi)
+        n = lambda x: 0.5 * (1 + math.erf(x / math.sqrt(2)))
+        disc = k * math.exp(-RISK_FREE * t)
+        if self.opt_call[j]:
+            delta, theta = n(d1), -s * pdf * iv / (2 * math.sqrt(t)) - RISK_FREE * disc * n(d2)
+        else:
+            delta, theta = n(d1) - 1, -s * pdf * iv / (2 * math.sqrt(t)) + RISK_FREE * disc * n(-d2)
+        return dict(delta=round(delta, 4), gamma=round(pdf / (s * sd), 6),
+                    theta=round(theta / 365, 4), vega=round(s * pdf * math.sqrt(t) / 100, 4))
+
+    def instruments(self) -> List[Dict[str, str]]:
+        """Symbol-picker rows: EXCHANGE:TOKEN keys, human names as labels."""
+        out = []
+        for i, name in enumerate(self.names):
+            kind = "index" if i < len(self.step_of) else "equity" if i < self.n_under else "option"
+            out.append({"symbol": self.key(i), "label": name, "kind": kind})
+        return out
+
+
+@lru_cache(maxsize=1)
+def get_market() -> MarketSimulator:
+    return MarketSimulator()
+
+
+class SimClient:
+    """
+    Order client over the shared simulated market. MARKET orders fill at
+    once at the touch (ltp ± half spread); a LIMIT fills only if it is
+    marketable, otherwise it is rejected (no resting book here).
+    """
+
+    def __init__(self, market: Optional[MarketSimulator] = None, seed_cash: Optional[float] = None):
+        self.market = market or get_market()
+        self.cash = seed_cash if seed_cash is not None else float(os.getenv("SIM_SEED_CASH", "100000"))
+        self.book: Dict[str, Dict[str, float]] = {}  # {symbol: {"qty", "avg"}}
+        self.orders: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def login(self) -> None:
+        pass
+
+    def logout(self) -> None:
+        pass
+
+    def ltp(self, symbol: str, *, exchange: Optional[str] = None) -> float:
+        return self.market.ltp(f"{exchange}:{symbol}" if exchange and ":" not in symbol else symbol)
+
+    def _touch(self, symbol: str) -> Tuple[float, float]:
+        ltp = self.ltp(symbol)
+        half = max(0.05, round(ltp * 0.0005, 2))
+        return round(ltp - half, 2), round(ltp + half, 2)
+
+    def place_order(self, symbol: str, side: str, qty: float, order_type: str = "MARKET",
+                    price: Optional[float] = None, **kwargs: Any) -> Dict[str, Any]:
+        side = side.upper()
+        order_type = str(kwargs.pop("type", order_type))  # OrderRequest calls it `type`
+        if side not in ("BUY", "SELL") or qty <= 0:
+            raise ValueError(f"Bad order: {side} {qty}")
+        bid, ask = self._touch(symbol)
+        fill = ask if side == "BUY" else bid
+        oid = str(uuid.uuid4())
+        ts = int(time.time() * 1000)
+        if order_type.upper() == "LIMIT":
+            if price is None:
+                raise ValueError("LIMIT order needs a price")
+            if (side == "BUY" and price < ask) or (side == "SELL" and price > bid):
+                order = {"status": "REJECTED", "order_id": oid, "symbol": symbol, "side": side, "qty": qty,
+                         "price": price, "ts": ts, "message": "limit not marketable"}
+                self.orders.append(order)
+                return order
+        signed = qty if side == "BUY" else -qty
+        with self._lock:
+            p = self.book.setdefault(symbol, {"qty": 0, "avg": 0.0})
+            new_qty = p["qty"] + signed
+            if p["qty"] == 0 or (p["qty"] > 0) == (signed > 0):
+                p["avg"] = (p["avg"] * abs(p["qty"]) + fill * qty) / abs(new_qty)
+            elif new_qty and (new_qty > 0) != (p["qty"] > 0):
+                p["avg"] = fill  # flipped through flat
+            p["qty"] = new_qty
+            if not new_qty:
+                p["avg"] = 0.0
+            self.cash -= signed * fill
+        order = {"status": "ACCEPTED", "order_id": oid, "symbol": symbol, "side": side, "qty": qty,
+                 "price": fill, "ts": ts}
+        self.orders.append(order)
+        return order
+
+    def positions(self) -> Dict[str, Any]:
+        rows = []
+        with self._lock:
+            book = {s: dict(p) for s, p in self.book.items() if p["qty"]}
+        for s, p in book.items():
+            ltp = self.ltp(s)
+            rows.append({"symbol": s, **p, "ltp": ltp, "pnl": round((ltp - p["avg"]) * p["qty"], 2)})
+        value = sum(r["ltp"] * r["qty"] for r in rows)
+        return {"cash": round(self.cash, 2), "positions": rows, "market_value": round(value, 2),
+                "equity": round(self.cash + value, 2)}
+
+    # ---------- options (routers/options.py surface) ----------
+    def option_chain(self, underlying: str, expirySel: str = "current_week", expiry: Optional[str] = None):
+        return self.market.option_rows(underlying)  # one listed expiry
+
+    def resolve_option(self, **kw) -> Tuple[str, str]:
+        underlying = kw["underlying"]
+        chain = self.option_chain(underlying, kw.get("expirySel", "current_week"), kw.get("expiry"))
+        step = self.market.step_of[underlying.upper()]
+        spot = self.market.ltp(underlying)
+        strike = round(spot / step) * step
+        steps = (kw.get("steps") or 0) * step
+        if kw["strikeSel"] == "OTM+steps":
+            strike += steps if kw["side"] == "CE" else -steps
+        elif kw["strikeSel"] == "ITM+steps":
+            strike += -steps if kw["side"] == "CE" else steps
+        elif kw["strikeSel"] == "ByStrike":
+            strike = float(kw.get("strike") or strike)
+        for r in chain:
+            if r["strike"] == strike and r["side"] == kw["side"]:
+                return r["tradingsymbol"], r["exchange"]
+        raise ValueError(f"No {kw['side']} at strike {strike} for {underlying}")
+
+    def option_value(self, symbol: str, field: str) -> float:
+        if field == "ltp":
+            return self.ltp(symbol)
+        if field not in ("iv", "oi"):
+            raise ValueError("field must be ltp|iv|oi")
+        m = self.market
+        i = m.index_of(symbol)
+        if i < m.n_under:
+            raise ValueError(f"{symbol} is not an option")
+        under = m.names[int(m.opt_under[i - m.n_under])]
+        row = next(r for r in m.option_rows(under) if r["tradingsymbol"] == m.names[i])
+        return row[field]
+
+    def greeks(self, symbol: str) -> Dict[str, float]:
+        return self.market.greeks(symbol)
@@ -0,0 +1,157 @@
+# brokers/sim_websocket_client.py
+"""
+A feed socket over the synthetic market (see brokers/sim_market.py).
+
+Drop-in for AngelOneWebSocketV2Client behind WebSocketManager, like the
+replay client: connect() opens and then emits binary frames of Angel
+packets through the same decoder and on_data callback until disconnect().
+
+    every frame_ms ──► market.sync() ──► pick k subscribed instruments
+                                          k = ticks due at ticks_per_s (0 = flat out)
+                   ──► market.frame(idx) ──► decode_ticks ──► on_data(tick) ...
+
+ticks_per_s is per socket (SIM_TICKS_PER_S). With max_ticks set, `done`
+is set once that many ticks went out and the socket stays open and quiet,
+which is what benchmarks wait on.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Optional, Set
+
+import numpy as np
+
+from src.minimalgotronifylicious.brokers.abstract_websocket_client import AbstractWebSocketClient
+from src.minimalgotronifylicious.brokers.angelone_tick_decoder import QUOTE, decode_ticks
+from src.minimalgotronifylicious.brokers.sim_market import MarketSimulator, get_market
+from src.minimalgotronifylicious.streaming.tick import EXCHANGES
+from src.minimalgotronifylicious.utils.metrics import get_metrics
+from src.minimalgotronifylicious.utils.tracing import get_tracer
+
+log = logging.getLogger(__name__)
+
+FLAT_OUT_BATCH = 512  # packets per frame when ticks_per_s = 0
+
+
+class SimWebSocketClient(AbstractWebSocketClient):
+    def __init__(self, market: Optional[MarketSimulator] = None, ticks_per_s: Optional[float] = None,
+                 mode: int = QUOTE, subscribe_all: bool = False, max_ticks: Optional[int] = None,
+                 frame_ms: float = 10.0, seed: Optional[int] = None):
+        super().__init__()
+        self.market = market or get_market()
+        self.ticks_per_s = ticks_per_s if ticks_per_s is not None else float(os.getenv("SIM_TICKS_PER_S", "10000"))
+        self.mode = mode
+        self.max_ticks = max_ticks
+        self.frame_s = frame_ms / 1000
+        self._rng = np.random.default_rng(seed)
+        self._subscribed: Set[int] = set(range(len(self.market.names))) if subscribe_all else set()
+        self._active = np.fromiter(sorted(self._subscribed), dtype=np.int64)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.done = threading.Event()
+        self._on_pong = None
+        self.metrics = get_metrics()
+        self.tracer = get_tracer()
+        self.frames = 0
+        self.ticks = 0
+        self.elapsed_s = 0.0
+        self.set_callbacks(lambda ws, msg: None)
+
+    # ---------- BaseWebSocketClient ----------
+    def connect(self):
+        """Blocks until disconnect(), like SmartWebSocketV2.connect()."""
+        self._stop.clear()
+        self.done.clear()
+        self._connected = True
+        self._on_open(self)
+        started = time.perf_counter()
+        try:
+            self._pump(started)
+        except Exception as e:
+            self._connected = False
+            self._on_error(self, e)
+            raise
+        finally:
+            self.elapsed_s = time.perf_counter() - started
+        self.done.set()
+        self._stop.wait()
+        self._connected = False
+        self._on_close(self)
+
+    def run_forever(self):
+        self.connect()
+
+    def disconnect(self):
+        self._stop.set()
+
+    def subscribe(self, correlation_id: str, mode, token_list: list):
+        self._update(token_list, add=True)
+
+    def unsubscribe(self, correlation_id: str, mode, token_list: list):
+        self._update(token_list, add=False)
+
+    def _update(self, token_list: list, add: bool) -> None:
+        with self._lock:
+            for entry in token_list:
+                ex = EXCHANGES.get(entry["exchangeType"], entry["exchangeType"])
+                for token in entry["tokens"]:
+                    try:
+                        i = self.market.index_of(f"{ex}:{token}")
+                    except ValueError:
+                        log.debug("SimWebSocketClient: no simulated instrument %s:%s", ex, token)
+                        continue
+                    (self._subscribed.add if add else self._subscribed.discard)(i)
+            # the feed thread only ever reads a finished array
+            self._active = np.fromiter(sorted(self._subscribed), dtype=np.int64)
+
+    # ---------- liveness (answers at once) ----------
+    def set_pong_callback(self, on_pong):
+        self._on_pong = on_pong
+
+    def ping(self, payload: str = ""):
+        if self._on_pong is not None:
+            self._on_pong(payload)
+
+    # ---------- generation ----------
+    def _pump(self, started: float) -> None:
+        rate = self.ticks_per_s
+        cap = max(1, int(rate * self.frame_s * 4)) if rate else FLAT_OUT_BATCH
+        base, sent = started, 0  # pacing restarts whenever there was nothing to send
+        while not self._stop.is_set():
+            active = self._active
+            if not len(active):
+                if self._stop.wait(self.frame_s):
+                    return
+                base, sent = time.perf_counter(), 0
+                continue
+            k = min(int((time.perf_counter() - base) * rate) - sent, cap) if rate else cap
+            if self.max_ticks is not None:
+                k = min(k, self.max_ticks - self.ticks)
+            if k <= 0:
+                if self._stop.wait(self.frame_s):
+                    return
+                continue
+            idx = self._rng.choice(active, k, replace=k > len(active))
+            self.market.sync()
+            frame = self.market.frame(idx, self.mode)
+            self.frames += 1
+            t0 = time.perf_counter()
+            ticks = decode_ticks(frame)
+            t1 = time.perf_counter()
+            self.tracer.frame(t0, t1)
+            self.metrics.decode.observe(t1 - t0, "simulator")
+            self.metrics.frames.inc("simulator")
+            for tick in ticks:
+                self._on_data(self, tick)
+            self.ticks += k
+            sent += k
+            if self.max_ticks is not None and self.ticks >= self.max_ticks:
+                return
+
+    def stats(self) -> dict:
+        rate = self.ticks / self.elapsed_s if self.elapsed_s else 0.0
+        return {"frames": self.frames, "ticks": self.ticks, "subscribed": len(self._active),
+                "elapsed_s": round(self.elapsed_s, 3), "ticks_per_s": round(rate, 1)}
@@ -16,6 +16,24 @@ class WebSocketClientFactory:
                 retry_duration=retry_config.get("duration", 30)
             )
 
+        elif broker_name == "replay":
+            # recorded feed segments; no session needed
+            from src.minimalgotronifylicious.brokers.replay_websocket_client import ReplayWebSocketClient
+            return ReplayWebSocketClient(
+                source=auth_data["source"],
+                speed=float(auth_data.get("speed", 1.0)),
+                subscribe_all=bool(auth_data.get("subscribe_all", False)),
+            )
+
+        elif broker_name == "simulator":
+            # synthetic market; no session needed
+            from src.minimalgotronifylicious.brokers.sim_websocket_client import SimWebSocketClient
+            rate = auth_data.get("ticks_per_s")
+            return SimWebSocketClient(
+                ticks_per_s=float(rate) if rate is not None else None,
+                subscribe_all=bool(auth_data.get("subscribe_all", False)),
+            )
+
         # elif broker_name == "zerodha":
         #     return ZerodhaWebSocketClient(...)
 
@@ -0,0 +1,240 @@
+# src/minimalgotronifylicious/candles/store.py
+"""
+On-disk candle history with incremental backfill.
+
+One append-only file of fixed-size records per (interval, symbol):
+
+    <root>/<INTERVAL>/<EXCHANGE>_<TOKEN>.bin    ts, open, high, low, close, volume
+    <root>/<INTERVAL>/<EXCHANGE>_<TOKEN>.json   covered_from / covered_to (ms)
+
+Records are sorted by ts, so the ts column is the index: a range read is
+two searchsorted calls on a read-only memmap. The sidecar remembers which
+span has already been asked of the broker (holidays and gaps included), so
+only what lies outside it is ever fetched again:
+
+    request [from, to] ──► store covers it?  ── yes ──► memmap slice
+                                │ no
+                                ▼
+                 fetch head [from, covered_from) and/or tail [last bar, to]
+                 in chunks of at most MAX_SPAN_DAYS[interval] (the broker's limit)
+                 merge (head) or append / overwrite last bar (tail)
+
+Coverage never extends past now: bars that have not happened yet are not
+"covered", so a later request for them goes back to the broker.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.minimalgotronifylicious.utils.symbols import normalize
+
+CANDLE = np.dtype([("ts", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"),
+                   ("close", "<f8"), ("volume", "<i8")])
+
+INTERVAL_MS = {
+    "ONE_MINUTE": 60_000, "THREE_MINUTE": 180_000, "FIVE_MINUTE": 300_000,
+    "TEN_MINUTE": 600_000, "FIFTEEN_MINUTE": 900_000, "THIRTY_MINUTE": 1_800_000,
+    "ONE_HOUR": 3_600_000, "ONE_DAY": 86_400_000,
+}
+
+# longest range getCandleData accepts per request, in days
+MAX_SPAN_DAYS = {
+    "ONE_MINUTE": 30, "THREE_MINUTE": 60, "FIVE_MINUTE": 100, "TEN_MINUTE": 100,
+    "FIFTEEN_MINUTE": 200, "THIRTY_MINUTE": 200, "ONE_HOUR": 400, "ONE_DAY": 2000,
+}
+DAY_MS = 86_400_000
+
+# fetch(symbol, interval, from_ms, to_ms, exchange) -> rows [[time, o, h, l, c, v], ...]
+Fetcher = Callable[[str, str, int, int, str], Sequence[Sequence[Any]]]
+
+
+def _now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+def _ts_ms(t: Any) -> int:
+    """Angel sends ISO strings with offset; accept ms ints too."""
+    if isinstance(t, (int, np.integer)):
+        return int(t)
+    if isinstance(t, float):
+        return int(t)
+    return int(datetime.fromisoformat(str(t)).timestamp() * 1000)
+
+
+def to_records(rows: Sequence[Sequence[Any]]) -> np.ndarray:
+    out = np.empty(len(rows), dtype=CANDLE)
+    for i, r in enumerate(rows):
+        out[i] = (_ts_ms(r[0]), r[1], r[2], r[3], r[4], r[5] if len(r) > 5 else 0)
+    if len(out) > 1 and np.any(np.diff(out["ts"]) <= 0):
+        out = out[np.argsort(out["ts"], kind="stable")]
+        out = out[np.append(out["ts"][1:] != out["ts"][:-1], True)]  # last one per ts wins
+    return out
+
+
+class CandleStore:
+    def __init__(self, root: Optional[str] = None, fetch: Optional[Fetcher] = None,
+                 clock: Callable[[], int] = _now_ms):
+        self.root = root or os.getenv("CANDLE_STORE_DIR", "data/candles")
+        self._fetch = fetch or angel_one_fetcher
+        self._clock = clock
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    # ---------- paths & metadata ----------
+    def _paths(self, key: str, interval: str) -> Tuple[str, str]:
+        base = os.path.join(self.root, interval.upper(), key.replace(":", "_"))
+        return base + ".bin", base + ".json"
+
+    def _lock(self, key: str, interval: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault((key, interval), threading.Lock())
+
+    @staticmethod
+    def _read_meta(path: str) -> Dict[str, int]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _write_meta(path: str, meta: Dict[str, int]) -> None:
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path)
+
+    # ---------- raw storage ----------
+    def load(self, symbol: str, interval: str) -> np.ndarray:
+        """Read-only memmap of every stored bar (empty array if none)."""
+        data_path, _ = self._paths(normalize(symbol)[2], interval)
+        if not os.path.exists(data_path) or os.path.getsize(data_path) < CANDLE.itemsize:
+            return np.empty(0, dtype=CANDLE)
+        return np.memmap(data_path, dtype=CANDLE, mode="r")
+
+    def _append(self, data_path: str, new: np.ndarray) -> None:
+        """Append bars newer than the last one; a bar with the last ts replaces it (it was still forming)."""
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        size = os.path.getsize(data_path) if os.path.exists(data_path) else 0
+        count = size // CANDLE.itemsize
+        with open(data_path, "r+b" if size else "wb") as f:
+            if count:
+                f.seek((count - 1) * CANDLE.itemsize)
+                last_ts = np.frombuffer(f.read(CANDLE.itemsize), dtype=CANDLE)["ts"][0]
+                new = new[new["ts"] >= last_ts]
+                if len(new) and new["ts"][0] == last_ts:
+                    f.seek((count - 1) * CANDLE.itemsize)
+                else:
+                    f.seek(count * CANDLE.itemsize)
+            f.write(new.tobytes())
+
+    def _merge(self, data_path: str, new: np.ndarray) -> None:
+        """Rare path (history before the first stored bar): rewrite the file sorted."""
+        old = np.fromfile(data_path, dtype=CANDLE) if os.path.exists(data_path) else np.empty(0, dtype=CANDLE)
+        both = np.concatenate([new, old])  # stored bars win on equal ts
+        keep = np.unique(both["ts"][::-1], return_index=True)[1]
+        merged = both[::-1][keep]
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        tmp = data_path + ".tmp"
+        merged.tofile(tmp)
+        os.replace(tmp, data_path)
+
+    def _fetch_range(self, token: str, interval: str, from_ts: int, to_ts: int, ex: str) -> np.ndarray:
+        """One broker call per MAX_SPAN_DAYS chunk; chunks share their edge bar, to_records dedups."""
+        span = MAX_SPAN_DAYS[interval] * DAY_MS
+        raw: List[Sequence[Any]] = []
+        start = from_ts
+        while True:
+            end = min(start + span, to_ts)
+            raw.extend(self._fetch(token, interval, start, end, ex))
+            if end >= to_ts:
+                return to_records(raw)
+            start = end
+
+    # ---------- read-through ----------
+    def get(self, symbol: str, interval: str, from_ts: Optional[int] = None, to_ts: Optional[int] = None,
+            limit: Optional[int] = None, exchange: Optional[str] = None) -> Tuple[np.ndarray, int]:
+        """
+        Bars in [from_ts, to_ts] (ms). Returns (bars, fetched) where fetched is
+        the number of bars that had to come from the broker on this call.
+        """
+        interval = interval.upper()
+        step = INTERVAL_MS.get(interval)
+        if step is None:
+            raise ValueError(f"Unknown interval: {interval}")
+        ex, token, key = normalize(symbol, default_ex=exchange or "NSE")
+        now = self._clock()
+        to_ts = to_ts if to_ts is not None else now
+        if from_ts is None:
+            from_ts = to_ts - step * (limit or 500)
+        data_path, meta_path = self._paths(key, interval)
+
+        fetched = 0
+        with self._lock(key, interval):
+            meta = self._read_meta(meta_path)
+            lo, hi = meta.get("covered_from"), meta.get("covered_to")
+            if lo is None:
+                new = self._fetch_range(token, interval, from_ts, to_ts, ex)
+                self._append(data_path, new)
+                fetched += len(new)
+                lo, hi = from_ts, max(from_ts, min(to_ts, now))
+            else:
+                if from_ts < lo:
+                    new = self._fetch_range(token, interval, from_ts, lo, ex)
+                    if len(new):
+                        self._merge(data_path, new)
+                    fetched += len(new)
+                    lo = from_ts
+                if to_ts >= hi + step:
+                    # within one interval of the last fetch nothing new can have closed;
+                    # otherwise resume from the last stored bar: it may have been incomplete
+                    stored = self.load(key, interval)
+                    start = int(stored["ts"][-1]) if len(stored) else hi
+                    del stored
+                    new = self._fetch_range(token, interval, start, to_ts, ex)
+                    self._append(data_path, new)
+                    fetched += len(new)
+                    hi = max(hi, min(to_ts, now))
+            if meta.get("covered_from") != lo or meta.get("covered_to") != hi:
+                self._write_meta(meta_path, {"covered_from": lo, "covered_to": hi})
+
+        bars = self.load(key, interval)
+        ts = bars["ts"]
+        i, j = np.searchsorted(ts, from_ts, "left"), np.searchsorted(ts, to_ts, "right")
+        out = bars[i:j]
+        if limit is not None:
+            out = out[-limit:]
+        return out, fetched
+
+
+def rows(bars: np.ndarray) -> List[List[Any]]:
+    """JSON shape close to getCandleData: [ts_ms, open, high, low, close, volume]."""
+    return [[int(b["ts"]), float(b["open"]), float(b["high"]), float(b["low"]),
+             float(b["close"]), int(b["volume"])] for b in bars]
+
+
+def angel_one_fetcher(token: str, interval: str, from_ms: int, to_ms: int, exchange: str):
+    from src.minimalgotronifylicious.brokers.request_scheduler import HISTORY, get_scheduler
+    from src.minimalgotronifylicious.sessions.session_registry import get_session_registry
+    sess = get_session_registry().session("angel_one")
+    # history is the lowest lane; identical concurrent range requests share one call
+    resp = get_scheduler().call("angel_one", HISTORY, sess.fetch_candles, token, interval, from_ms, to_ms,
+                                key=("candles", exchange, token, interval, from_ms, to_ms), exchange=exchange)
+    if isinstance(resp, dict):
+        if resp.get("status") is False:
+            raise RuntimeError(f"getCandleData failed: {resp.get('message') or resp}")
+        return resp.get("data") or []
+    return resp or []
+
+
+@lru_cache(maxsize=1)
+def get_candle_store() -> CandleStore:
+    return CandleStore()
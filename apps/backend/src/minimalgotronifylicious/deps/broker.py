@@ -2,7 +2,7 @@
 from fastapi import Header, HTTPException
 from typing import Optional
 import os
-from src.minimalgotronifylicious.brokers.order_client_factory import order_client_factory
+from src.minimalgotronifylicious.sessions.session_registry import get_session_registry
 
 def client_dep(
     x_broker: Optional[str] = Header(None, convert_underscores=False),
@@ -12,12 +12,8 @@ def client_dep(
     market_open = (x_market_open or "").strip().lower() in ("1","true","yes","on")
 
     try:
-        if broker == "angel_one":
-            # session is the only special case
-            from src.minimalgotronifylicious.sessions.angelone_session import AngelOneSession
-            sess = AngelOneSession.from_env()
-            return order_client_factory("angel_one", session=sess)
-        return order_client_factory(broker, market_open=market_open)
+        # pooled: logins and client construction happen once per process, not per request
+        return get_session_registry().client(broker, market_open=market_open)
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e))
     except ValueError as e:
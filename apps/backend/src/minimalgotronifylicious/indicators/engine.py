@@ -0,0 +1,157 @@
+# src/minimalgotronifylicious/indicators/engine.py
+"""
+Shared indicator instances per symbol.
+
+Strategies ask for ("NSE:3045", "ema", period=21); everyone asking for the
+same triple gets the same object, so a tick updates each distinct
+indicator exactly once no matter how many strategies read it.
+
+    WebSocketManager ──tick──► SymbolIndicators.update ──► ema21, rsi14, vwap, ...
+                                  (one per symbol)            (one per distinct params)
+
+Instances are reference-counted; the last release() drops them.
+
+Observers that read shared indicators (EMAObserver, ChartObserver, ...) hold
+an IndicatorFeed cursor and forward the ticks they receive; the first reader
+to forward a tick applies it, the others only move their cursor. Either
+register engine.observer(symbol) with the manager or let readers forward,
+not both.
+"""
+from __future__ import annotations
+
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from src.minimalgotronifylicious.indicators.incremental import INDICATORS, Indicator
+from src.minimalgotronifylicious.streaming.tick import Tick
+
+Spec = Tuple[str, Tuple[Tuple[str, Any], ...]]  # (name, sorted params)
+
+
+def spec(name: str, **params) -> Spec:
+    name = name.lower()
+    if name not in INDICATORS:
+        raise ValueError(f"Unknown indicator: {name}")
+    return name, tuple(sorted(params.items()))
+
+
+class SymbolIndicators:
+    """Observer for one symbol; fans each tick into its distinct indicators."""
+    __slots__ = ("symbol", "indicators", "refs", "ticks", "last", "_last_volume")
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.indicators: Dict[Spec, Indicator] = {}
+        self.refs: Dict[Spec, int] = {}
+        self.ticks = 0  # ticks applied so far; readers' cursors count against it
+        self.last: Optional[Tick] = None
+        self._last_volume: Optional[int] = None
+
+    def update(self, data) -> None:
+        tick = Tick.coerce(data)
+        price = tick.ltp / 100.0
+        # ticks carry the day's cumulative volume; indicators want the increment. The
+        # first tick only sets the baseline: that volume traded before we were listening.
+        last, self._last_volume = self._last_volume, tick.volume
+        if last is None:
+            traded = 0
+        else:
+            traded = tick.volume - last if tick.volume >= last else tick.volume
+        self.ticks += 1
+        self.last = tick
+        for ind in self.indicators.values():
+            ind.update(price, traded)
+
+    def advance(self, data, seen: int) -> int:
+        """Apply a tick for a reader that had forwarded `seen` ticks, unless another reader already did."""
+        if seen < self.ticks:
+            return seen + 1
+        self.update(data)
+        return self.ticks
+
+    def values(self) -> Dict[str, Any]:
+        return {_label(s): ind.value for s, ind in self.indicators.items()}
+
+
+class IndicatorFeed:
+    """One reader's cursor into a symbol's shared indicators; see SymbolIndicators.advance."""
+    __slots__ = ("bundle", "seen")
+
+    def __init__(self, bundle: SymbolIndicators, joining: Optional[Tick] = None):
+        self.bundle = bundle
+        # ticks before the reader joined are not its to apply; neither is the tick it
+        # joins on (`joining`) if another reader already applied it
+        self.seen = bundle.ticks - (joining is not None and joining == bundle.last)
+
+    def update(self, data) -> None:
+        self.seen = self.bundle.advance(data, self.seen)
+
+
+def _label(s: Spec) -> str:
+    name, params = s
+    return name + "".join(f"_{v}" for _, v in params)
+
+
+class IndicatorEngine:
+    def __init__(self):
+        self._symbols: Dict[str, SymbolIndicators] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, symbol: str, name: str, **params) -> Indicator:
+        """Shared instance for (symbol, name, params); create it on first use."""
+        s = spec(name, **params)
+        with self._lock:
+            bundle = self._symbols.get(symbol)
+            if bundle is None:
+                bundle = self._symbols[symbol] = SymbolIndicators(symbol)
+            ind = bundle.indicators.get(s)
+            if ind is None:
+                # copy-on-write so the feed thread can iterate without the lock
+                indicators = dict(bundle.indicators)
+                ind = indicators[s] = INDICATORS[s[0]](**params)
+                bundle.indicators = indicators
+            bundle.refs[s] = bundle.refs.get(s, 0) + 1
+            return ind
+
+    def release(self, symbol: str, name: str, **params) -> None:
+        s = spec(name, **params)
+        with self._lock:
+            bundle = self._symbols.get(symbol)
+            if bundle is None or s not in bundle.refs:
+                return
+            bundle.refs[s] -= 1
+            if bundle.refs[s] <= 0:
+                del bundle.refs[s]
+                bundle.indicators = {k: v for k, v in bundle.indicators.items() if k != s}
+            if not bundle.indicators:
+                del self._symbols[symbol]
+
+    def observer(self, symbol: str) -> SymbolIndicators:
+        """Register this with manager.register(symbol, ...) to drive the symbol's indicators."""
+        with self._lock:
+            bundle = self._symbols.get(symbol)
+            if bundle is None:
+                bundle = self._symbols[symbol] = SymbolIndicators(symbol)
+            return bundle
+
+    def feed(self, symbol: str, joining: Optional[Tick] = None) -> IndicatorFeed:
+        """Cursor for an observer that forwards its own ticks, bound before or on `joining`."""
+        return IndicatorFeed(self.observer(symbol), joining)
+
+    def on_tick(self, symbol: str, data) -> None:
+        bundle = self._symbols.get(symbol)
+        if bundle is not None:
+            bundle.update(data)
+
+    def snapshot(self, symbol: str) -> Dict[str, Any]:
+        bundle = self._symbols.get(symbol)
+        return bundle.values() if bundle is not None else {}
+
+    def __len__(self) -> int:
+        return sum(len(b.indicators) for b in self._symbols.values())
+
+
+@lru_cache(maxsize=1)
+def get_indicator_engine() -> IndicatorEngine:
+    return IndicatorEngine()
@@ -0,0 +1,225 @@
+# src/minimalgotronifylicious/indicators/incremental.py
+"""
+Streaming indicators: each update() is O(1) and state is bounded.
+
+Every indicator takes one observation at a time and returns its current
+value (None while warming up):
+
+    update(price, volume=0.0, high=None, low=None)
+
+`volume` is the quantity traded since the previous update (VWAP only);
+`high`/`low` default to `price`, which is what a tick stream gives you.
+Windowed indicators keep a ring of `period` values plus running sums, so
+nothing is ever re-summed over history.
+"""
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Iterable, Optional, Tuple
+
+
+class Indicator:
+    __slots__ = ("value",)
+    name = "indicator"
+
+    def __init__(self):
+        self.value = None
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def update(self, price: float, volume: float = 0.0, high: Optional[float] = None,
+               low: Optional[float] = None):
+        raise NotImplementedError
+
+    def seed(self, prices: Iterable[float]):
+        """Warm up from history (e.g. closes from /candles)."""
+        for p in prices:
+            self.update(p)
+        return self.value
+
+
+class SMA(Indicator):
+    __slots__ = ("period", "_window", "_sum")
+    name = "sma"
+
+    def __init__(self, period: int = 20):
+        super().__init__()
+        self.period = period
+        self._window = deque(maxlen=period)
+        self._sum = 0.0
+
+    def update(self, price, volume=0.0, high=None, low=None):
+        if len(self._window) == self.period:
+            self._sum -= self._window[0]
+        self._window.append(price)
+        self._sum += price
+        if len(self._window) == self.period:
+            self.value = self._sum / self.period
+        return self.value
+
+
+class EMA(Indicator):
+    """Seeded with the SMA of the first `period` prices, then the usual smoothing."""
+    __slots__ = ("period", "alpha", "_n", "_seed")
+    name = "ema"
+
+    def __init__(self, period: int = 21):
+        super().__init__()
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self._n = 0
+        self._seed = 0.0
+
+    def update(self, price, volume=0.0, high=None, low=None):
+        if self.value is not None:
+            self.value += self.alpha * (price - self.value)
+            return self.value
+        self._n += 1
+        self._seed += price
+        if self._n == self.period:
+            self.value = self._seed / self.period
+        return self.value
+
+
+class RSI(Indicator):
+    """Wilder's RSI: simple average of the first `period` moves, then Wilder smoothing."""
+    __slots__ = ("period", "_prev", "_n", "_gain", "_loss")
+    name = "rsi"
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self._prev = None
+        self._n = 0
+        self._gain = 0.0
+        self._loss = 0.0
+
+    def update(self, price, volume=0.0, high=None, low=None):
+        prev, self._prev = self._prev, price
+        if prev is None:
+            return self.value
+        change = price - prev
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        n = self.period
+        if self._n < n:
+            self._n += 1
+            self._gain += gain / n
+            self._loss += loss / n
+            if self._n < n:
+                return self.value
+        else:
+            self._gain = (self._gain * (n - 1) + gain) / n
+            self._loss = (self._loss * (n - 1) + loss) / n
+        if self._loss == 0.0:
+            self.value = 100.0 if self._gain > 0 else 50.0
+        else:
+            self.value = 100.0 - 100.0 / (1.0 + self._gain / self._loss)
+        return self.value
+
+
+class MACD(Indicator):
+    """value = (macd, signal, histogram)."""
+    __slots__ = ("_fast", "_slow", "_signal")
+    name = "macd"
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        super().__init__()
+        self._fast = EMA(fast)
+        self._slow = EMA(slow)
+        self._signal = EMA(signal)
+
+    def update(self, price, volume=0.0, high=None, low=None) -> Optional[Tuple[float, float, float]]:
+        fast = self._fast.update(price)
+        slow = self._slow.update(price)
+        if fast is None or slow is None:
+            return self.value
+        line = fast - slow
+        sig = self._signal.update(line)
+        if sig is not None:
+            self.value = (line, sig, line - sig)
+        return self.value
+
+
+class VWAP(Indicator):
+    """Cumulative since the last reset(); call reset() at the session open."""
+    __slots__ = ("_pv", "_vol")
+    name = "vwap"
+
+    def __init__(self):
+        super().__init__()
+        self._pv = 0.0
+        self._vol = 0.0
+
+    def reset(self) -> None:
+        self.value = None
+        self._pv = self._vol = 0.0
+
+    def update(self, price, volume=0.0, high=None, low=None):
+        if volume > 0:
+            self._pv += price * volume
+            self._vol += volume
+            self.value = self._pv / self._vol
+        return self.value
+
+
+class ATR(Indicator):
+    """Wilder's ATR over true ranges; with ticks high == low == price."""
+    __slots__ = ("period", "_prev_close", "_n", "_sum")
+    name = "atr"
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self._prev_close = None
+        self._n = 0
+        self._sum = 0.0
+
+    def update(self, price, volume=0.0, high=None, low=None):
+        high = price if high is None else high
+        low = price if low is None else low
+        prev, self._prev_close = self._prev_close, price
+        tr = high - low if prev is None else max(high - low, abs(high - prev), abs(low - prev))
+        if self.value is not None:
+            self.value = (self.value * (self.period - 1) + tr) / self.period
+            return self.value
+        self._n += 1
+        self._sum += tr
+        if self._n == self.period:
+            self.value = self._sum / self.period
+        return self.value
+
+
+class BollingerBands(Indicator):
+    """value = (lower, middle, upper) from a running sum and sum of squares."""
+    __slots__ = ("period", "k", "_window", "_sum", "_sumsq")
+    name = "bbands"
+
+    def __init__(self, period: int = 20, k: float = 2.0):
+        super().__init__()
+        self.period = period
+        self.k = k
+        self._window = deque(maxlen=period)
+        self._sum = 0.0
+        self._sumsq = 0.0
+
+    def update(self, price, volume=0.0, high=None, low=None) -> Optional[Tuple[float, float, float]]:
+        if len(self._window) == self.period:
+            old = self._window[0]
+            self._sum -= old
+            self._sumsq -= old * old
+        self._window.append(price)
+        self._sum += price
+        self._sumsq += price * price
+        n = len(self._window)
+        if n == self.period:
+            mean = self._sum / n
+            sd = math.sqrt(max(self._sumsq / n - mean * mean, 0.0))  # population σ, as charting tools use
+            self.value = (mean - self.k * sd, mean, mean + self.k * sd)
+        return self.value
+
+
+INDICATORS = {cls.name: cls for cls in (SMA, EMA, RSI, MACD, VWAP, ATR, BollingerBands)}
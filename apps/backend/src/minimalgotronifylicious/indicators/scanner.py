@@ -0,0 +1,92 @@
+# src/minimalgotronifylicious/indicators/scanner.py
+"""
+EMA crossover screening for a whole universe at once.
+
+Input is a closes matrix, one row per symbol and one column per bar, oldest
+first. Shorter histories are left-padded with NaN so the last column is the
+same bar for everyone. The EMA recursion runs once per bar over all
+symbols together (N-wide vector ops), so the cost grows with the number of
+bars, not with symbols × bars of Python work.
+
+EMA matches pandas `ewm(span=period, adjust=False)`: it starts at each
+symbol's first close.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+def ema_matrix(closes: np.ndarray, period: int = 21, last_only: bool = False) -> np.ndarray:
+    """EMA along axis 1. With last_only, returns just the last two columns (N × 2)."""
+    closes = np.asarray(closes, dtype=np.float64)
+    if closes.ndim != 2:
+        raise ValueError("closes must be a 2-D array (symbols × bars)")
+    n, t = closes.shape
+    alpha = 2.0 / (period + 1)
+
+    ema = np.full(n, np.nan)
+    prev = np.full(n, np.nan)
+    out = None if last_only else np.empty((n, t))
+    for j in range(t):
+        x = closes[:, j]
+        started = ~np.isnan(ema)
+        # ema += α·(x − ema) where both exist; start at x where history begins; hold over gaps
+        step = ema + alpha * (x - ema)
+        prev, ema = ema, np.where(started, np.where(np.isnan(x), ema, step), x)
+        if out is not None:
+            out[:, j] = ema
+    return np.column_stack((prev, ema)) if last_only else out
+
+
+@dataclass
+class Crossovers:
+    symbols: List[str]
+    crossed_above: List[str]
+    crossed_below: List[str]
+    close: np.ndarray       # last close per symbol
+    ema: np.ndarray         # last EMA per symbol
+    above: np.ndarray       # bool mask: last close > last EMA
+
+    def as_dict(self) -> Dict[str, object]:
+        return {"crossed_above": self.crossed_above, "crossed_below": self.crossed_below,
+                "above": [s for s, a in zip(self.symbols, self.above) if a]}
+
+
+def scan_crossovers(closes: np.ndarray, symbols: Sequence[str], period: int = 21) -> Crossovers:
+    """
+    Symbols whose last close crossed the EMA on the last bar: below-or-on →
+    above is `crossed_above`, above-or-on → below is `crossed_below`.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    if len(symbols) != closes.shape[0]:
+        raise ValueError(f"{len(symbols)} symbols for {closes.shape[0]} rows")
+    ema = ema_matrix(closes, period, last_only=True)
+    last2 = closes[:, -2:] if closes.shape[1] >= 2 else np.full((closes.shape[0], 2), np.nan)
+    diff = last2 - ema
+    prev, last = diff[:, 0], diff[:, 1]  # NaN compares False → never flagged
+    up = (prev <= 0) & (last > 0)
+    down = (prev >= 0) & (last < 0)
+    names = np.asarray(symbols, dtype=object)
+    return Crossovers(
+        symbols=list(symbols),
+        crossed_above=names[up].tolist(),
+        crossed_below=names[down].tolist(),
+        close=last2[:, 1],
+        ema=ema[:, 1],
+        above=last > 0,
+    )
+
+
+def closes_matrix(series: Dict[str, Sequence[float]]) -> Tuple[List[str], np.ndarray]:
+    """{symbol: closes oldest-first} → (symbols, right-aligned NaN-padded matrix)."""
+    symbols = list(series)
+    width = max((len(v) for v in series.values()), default=0)
+    out = np.full((len(symbols), width), np.nan)
+    for i, s in enumerate(symbols):
+        v = np.asarray(series[s], dtype=np.float64)
+        if len(v):
+            out[i, width - len(v):] = v
+    return symbols, out
@@ -3,24 +3,48 @@ import datetime
 from collections import deque
 import plotly.graph_objects as go
 from .base_observer import BaseObserver
+from src.minimalgotronifylicious.indicators.engine import get_indicator_engine
+from src.minimalgotronifylicious.streaming.tick import iter_ticks
 
 
 class ChartObserver(BaseObserver):
-    def __init__(self, window_size=50):
+    def __init__(self, window_size=50, ema_period=21, symbol=None, engine=None):
         self.data_queue = deque(maxlen=window_size)
         self.fig = go.Figure()
+        # EMA overlay shared per symbol through the indicator engine
+        self.ema_period = ema_period
+        self._engine = engine if engine is not None else get_indicator_engine()
+        self.symbol = None
+        self._ema = None
+        self._feed = None
+        if symbol:
+            self.bind(symbol)
+
+    def bind(self, symbol, joining=None):
+        self.symbol = symbol
+        self._ema = self._engine.acquire(symbol, "ema", period=self.ema_period)
+        self._feed = self._engine.feed(symbol, joining)
+
+    def close(self):
+        if self.symbol is not None:
+            self._engine.release(self.symbol, "ema", period=self.ema_period)
+            self.symbol = self._ema = self._feed = None
 
     def update(self, data):
-        for item in data.get("data", []):
+        for tick in iter_ticks(data):
+            if self._feed is None:
+                self.bind(f"{tick.exchange}:{tick.token}", tick)
+            self._feed.update(tick)
             timestamp = datetime.datetime.now()  # or use real timestamp
-            ltp = item.get("ltp", 0) / 100
-            self.data_queue.append({"timestamp": timestamp, "ltp": ltp})
+            self.data_queue.append({"timestamp": timestamp, "ltp": tick.price, "ema": self._ema.value})
 
     def render_chart(self):
         df = pd.DataFrame(self.data_queue)
         if not df.empty:
             self.fig.data = []  # Clear previous
             self.fig.add_trace(go.Scatter(x=df["timestamp"], y=df["ltp"], mode="lines", name="LTP"))
+            self.fig.add_trace(go.Scatter(x=df["timestamp"], y=df["ema"], mode="lines",
+                                          name=f"EMA({self.ema_period})"))
             self.fig.update_layout(title="Live Price", xaxis_title="Time", yaxis_title="Price")
             self.fig.show()
 
@@ -1,15 +1,22 @@
 from .base_observer import BaseObserver
 from .email import EmailAlertObserver
-from collections import deque
-import json
+from src.minimalgotronifylicious.indicators.engine import get_indicator_engine
+from src.minimalgotronifylicious.streaming.tick import iter_ticks
 
 # EMA Observer with Stop-Loss & Take-Profit Tracking
 class EMAObserver(BaseObserver):
-    def __init__(self, period=10, stop_loss_pct=2, take_profit_pct=4):
+    def __init__(self, period=10, stop_loss_pct=2, take_profit_pct=4, symbol=None, engine=None):
         self.period = period
         self.stop_loss_pct = stop_loss_pct / 100  # Convert percentage to decimal
         self.take_profit_pct = take_profit_pct / 100  # Convert percentage to decimal
-        self.prices = deque(maxlen=period)
+        # EMA(period) is shared per symbol through the indicator engine; bound to
+        # `symbol`, or to the first tick's EXCHANGE:TOKEN
+        self._engine = engine if engine is not None else get_indicator_engine()
+        self.symbol = None
+        self._ema = None
+        self._feed = None
+        if symbol:
+            self.bind(symbol)
         self.ema = None
         self.last_ltp = None
         self.trade_entry_price = None
@@ -17,38 +24,42 @@ class EMAObserver(BaseObserver):
         self.take_profit = None
         self.trade_type = None  # "CALL" or "PUT"
 
-    def update(self, message):
-        data = json.loads(message)
-        if "ltp" in data:
-            ltp = data["ltp"]
+    def bind(self, symbol, joining=None):
+        """Read the shared EMA(period) of `symbol` (an EXCHANGE:TOKEN feed key)."""
+        self.symbol = symbol
+        self._ema = self._engine.acquire(symbol, "ema", period=self.period)
+        self._feed = self._engine.feed(symbol, joining)
 
-            # Store previous LTP before updating EMA
-            previous_ltp = self.last_ltp
-            self.last_ltp = ltp
+    def close(self):
+        """Give the shared EMA back to the engine."""
+        if self.symbol is not None:
+            self._engine.release(self.symbol, "ema", period=self.period)
+            self.symbol = self._ema = self._feed = None
 
-            # Update EMA
-            self.add_price(ltp)
+    def update(self, message):
+        # Tick / TickBatch straight from the manager; JSON is parsed once in iter_ticks
+        for tick in iter_ticks(message):
+            if self._feed is None:
+                self.bind(f"{tick.exchange}:{tick.token}", tick)
+            self._feed.update(tick)  # moves the shared EMA once, however many observers forward it
+            self.on_price(tick.price)
+
+    def on_price(self, ltp):
+        """One price (rupees) through signals, SL and TP; the shared EMA has already taken it."""
+        # Store previous LTP before reading the EMA
+        previous_ltp = self.last_ltp
+        self.last_ltp = ltp
+
+        # Read EMA
+        self.ema = self._ema.value
+        if self.ema is not None:
             print(f"📊 [EMA] Updated EMA({self.period}): {self.ema:.2f}")
 
-            # Handle trade signals, SL, and TP checks
-            if previous_ltp is not None and self.ema is not None:
-                self.check_trade_signals(previous_ltp, ltp)
-                self.check_stop_loss(ltp)
-                self.check_take_profit(ltp)
-
-    def add_price(self, price):
-        """Update the EMA with the new price."""
-        self.prices.append(price)
-        if len(self.prices) == self.period:
-            self.calculate_ema()
-
-    def calculate_ema(self):
-        """Calculate EMA using the smoothing formula."""
-        smoothing = 2 / (self.period + 1)
-        if self.ema is None:
-            self.ema = sum(self.prices) / self.period  # First EMA is SMA
-        else:
-            self.ema = (self.prices[-1] * smoothing) + (self.ema * (1 - smoothing))
+        # Handle trade signals, SL, and TP checks
+        if previous_ltp is not None and self.ema is not None:
+            self.check_trade_signals(previous_ltp, ltp)
+            self.check_stop_loss(ltp)
+            self.check_take_profit(ltp)
 
     def check_trade_signals(self, previous_ltp, ltp):
         """Check for trade entry signals."""
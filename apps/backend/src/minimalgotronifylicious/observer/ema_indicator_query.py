@@ -1,6 +1,8 @@
 # modules
 import pandas as pd
 
+from src.minimalgotronifylicious.indicators.scanner import closes_matrix, scan_crossovers
+
 # config
 from src import config as cnf, session
 
@@ -39,26 +41,21 @@ class EMA(session.Session):
         return data
 
     def get_latest_close_greater_than_ema(self, _historical_data, time_interval, start_date, end_date):
-        # _flag = None
-        # try:
-        _ema_data = self.calculate_ema(_historical_data)
-        _ema_sorted = _ema_data.sort_values(by='EMA_21', ascending=True)
-        print('+++ ema sorted \n\n', _ema_sorted)
-        _greater_than = _ema_sorted[_ema_sorted['close'] > _ema_sorted['EMA_21']]
-        print('+++ all greater than \n\n', _greater_than)
-        last_row = _ema_sorted.iloc[-1]
-        if last_row['close'] > last_row['EMA_21']:
+        # one pass, no sorting or filtered copies: only the last bars matter
+        closes = _historical_data['close'].to_numpy()[None, :]
+        scan = scan_crossovers(closes, [self.TRADING_SYMBOL], period=21)
+        if scan.above[0]:
             print("Condition met. Placing order because last close {} is greater than last ema_21 {}\n".format(
-                last_row['close'], last_row['EMA_21']))
-
-        _greater_last_row = _greater_than.iloc[-1]
-        if _greater_last_row['close'] > _greater_last_row['EMA_21']:
-            print("_greater_last_row : Condition met. Placing order because last close {} is greater than last ema_21 {}\n".format(
-                _greater_last_row['close'], _greater_last_row['EMA_21']))
+                scan.close[0], scan.ema[0]))
+        if scan.crossed_above:
+            print("Crossed above on the last bar: close {} vs ema_21 {}\n".format(scan.close[0], scan.ema[0]))
+        return scan
 
-        # except Exception as e:
-        #     print(f"Error fetching candle data: {str(e)}")
-        # return _flag
+    @staticmethod
+    def scan_universe(frames, period=21):
+        """{symbol: candle DataFrame} → Crossovers for all of them in one NumPy pass."""
+        symbols, closes = closes_matrix({s: df['close'].to_numpy() for s, df in frames.items()})
+        return scan_crossovers(closes, symbols, period=period)
 
 # Strategy Execution
 def main():
@@ -1,24 +1,29 @@
 from .base_observer import BaseObserver
-from core.session import AngelOneSession
+from src.minimalgotronifylicious.streaming.tick import Tick
+from src.minimalgotronifylicious.utils.tracing import get_tracer
 
 class LimitOrderTriggerObserver(BaseObserver):
-    def __init__(self, tradingsymbol, target_price, quantity, symbol_token, order_type="BUY"):
+    def __init__(self, tradingsymbol, target_price, quantity, symbol_token, order_type="BUY", smart_api=None):
         self.tradingsymbol = tradingsymbol
         self.target_price = target_price
         self.quantity = quantity
         self.symbol_token = symbol_token
         self.triggered = False
         self.order_type = order_type  # "BUY" or "SELL"
-        self.session = AngelOneSession()
+        self.smart_api = smart_api  # SmartConnect; the shared Angel One session's when None
+        self.tracer = get_tracer()
 
     def update(self, market_data):
-        ltp = market_data["ltp"]
+        ltp = Tick.coerce(market_data).price
         if not self.triggered and ltp <= self.target_price:
+            # opened on the feed thread, so it inherits this frame's arrival/parse stamps
+            trace = self.tracer.start(f"NSE:{self.symbol_token}")
             print(f"📌 LTP dropped to {ltp}, placing limit order at {self.target_price}")
-            self.place_limit_order()
+            self.place_limit_order(trace)
             self.triggered = True
 
-    def place_limit_order(self):
+    def place_limit_order(self, trace=None):
+        trace = trace or self.tracer.start(f"NSE:{self.symbol_token}")
         order_params = {
             "variety": "NORMAL",
             "tradingsymbol": self.tradingsymbol,  # Example: adjust to your symbol
@@ -29,11 +34,22 @@ class LimitOrderTriggerObserver(BaseObserver):
             "producttype": "INTRADAY",
             "duration": "DAY",
             "price": self.target_price,
-            "quantity": self.quantity
+            "quantity": self.quantity,
+            "ordertag": trace.id,  # ties the broker's order book entry back to this trace
         }
+        trace.mark("build")
         try:
-            smart_api = self.session.get_api()
+            smart_api = self._api()
+            trace.mark("send")
             response = smart_api.placeOrder(order_params)
+            self.tracer.finish(trace, "ok", order_id=str(response) if response else None)
             print("✅ Order response:", response)
         except Exception as e:
+            self.tracer.finish(trace, "error")
             print(f"❌ Failed to place order: {e}")
+
+    def _api(self):
+        if self.smart_api is None:
+            from src.minimalgotronifylicious.sessions.session_registry import get_session_registry
+            self.smart_api = get_session_registry().session("angel_one").api
+        return self.smart_api
@@ -2,16 +2,35 @@ import numpy as np
 import pandas as pd
 from sklearn.linear_model import LinearRegression
 from collections import deque
-import json
+
+from src.minimalgotronifylicious.indicators.engine import get_indicator_engine
+from src.minimalgotronifylicious.streaming.tick import iter_ticks
 
 from .base_observer import BaseObserver
 
 class PricePredictionObserver(BaseObserver):
     """Observer that uses ML to predict future prices."""
-    def __init__(self, lookback=10):
+    def __init__(self, lookback=10, symbol=None, engine=None):
         self.lookback = lookback  # Number of past data points to use
         self.data_queue = deque(maxlen=lookback)  # Store past prices
         self.model = LinearRegression()  # Simple regression model
+        # EMA(lookback) baseline, shared per symbol through the indicator engine
+        self._engine = engine if engine is not None else get_indicator_engine()
+        self.symbol = None
+        self._ema = None
+        self._feed = None
+        if symbol:
+            self.bind(symbol)
+
+    def bind(self, symbol, joining=None):
+        self.symbol = symbol
+        self._ema = self._engine.acquire(symbol, "ema", period=self.lookback)
+        self._feed = self._engine.feed(symbol, joining)
+
+    def close(self):
+        if self.symbol is not None:
+            self._engine.release(self.symbol, "ema", period=self.lookback)
+            self.symbol = self._ema = self._feed = None
 
     def train_model(self):
         """Train ML model using past price data."""
@@ -35,19 +54,21 @@ class PricePredictionObserver(BaseObserver):
         return self.model.predict([[next_time_index]])[0]
 
     def update(self, message):
-        """Receives live market data and makes a price prediction."""
+        """Receives live market data (Tick, TickBatch or feed JSON) and makes a price prediction."""
         try:
-            data = json.loads(message)
-            for item in data["data"]:
-                timestamp = item["exchange_timestamp"]
-                ltp = item.get("ltp", 0)
-
-                self.data_queue.append((timestamp, ltp))  # Store data
-                self.train_model()  # Train model
+            # a whole batch is appended first, so the model is refit once per message, not per tick
+            for tick in iter_ticks(message):
+                if self._feed is None:
+                    self.bind(f"{tick.exchange}:{tick.token}", tick)
+                self._feed.update(tick)
+                self.data_queue.append((tick.exchange_ts, tick.price))  # Store data
+            self.train_model()  # Train model
 
-                predicted_price = self.predict_next_price()
-                if predicted_price:
-                    print(f"📈 Predicted Next Price: {predicted_price:.2f}")
+            predicted_price = self.predict_next_price()
+            if predicted_price:
+                baseline = self._ema.value
+                trend = f" (EMA({self.lookback}) {baseline:.2f})" if baseline is not None else ""
+                print(f"📈 Predicted Next Price: {predicted_price:.2f}{trend}")
 
         except Exception as e:
             print(f"⚠️ Error in ML Observer: {e}")
@@ -0,0 +1,161 @@
+# src/minimalgotronifylicious/orders/idempotency.py
+"""
+Idempotency keys for order placement, shared by every worker on the host.
+
+Responses live in one SQLite file in WAL mode (readers never block the
+writer, so any worker can answer a replay another one produced), with a
+small per-process LRU in front so a hot replay never leaves memory:
+
+    get(key) ──► LRU hit? ── yes ──► response            (µs, no I/O)
+                    │ no
+                    ▼
+               SQLite row, not expired? ── yes ──► cache it, response
+                    │ no
+                    ▼
+    reserve(key) ── INSERT pending row ── won? ── place order ── put(key, resp)
+                                             └─ lost: another worker has it in flight
+
+Rows expire after IDEMPOTENCY_TTL_S (a trading day by default) and the
+table is pruned to IDEMPOTENCY_MAX_ROWS, oldest completed row first, every
+PRUNE_EVERY writes; pending rows are never pruned for size, their request is
+still in flight. The LRU holds at most IDEMPOTENCY_CACHE responses. A pending
+row that is never completed (the worker died mid-call) lapses after
+PENDING_TTL_S, after which the key can be claimed again.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+PENDING_TTL_S = 60.0
+PRUNE_EVERY = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS idempotency (
+    key TEXT PRIMARY KEY,
+    response TEXT,              -- NULL while the request is in flight
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idempotency_expires ON idempotency (expires_at);
+"""
+
+
+class IdempotencyStore:
+    def __init__(self, path: Optional[str] = None, ttl_s: Optional[float] = None,
+                 max_rows: Optional[int] = None, cache_size: Optional[int] = None,
+                 clock: Callable[[], float] = time.time):
+        self.path = path or os.getenv("IDEMPOTENCY_DB", "data/idempotency.db")
+        self.ttl_s = ttl_s if ttl_s is not None else float(os.getenv("IDEMPOTENCY_TTL_S", "86400"))
+        self.max_rows = max_rows if max_rows is not None else int(os.getenv("IDEMPOTENCY_MAX_ROWS", "100000"))
+        self.cache_size = cache_size if cache_size is not None else int(os.getenv("IDEMPOTENCY_CACHE", "10000"))
+        self._clock = clock
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._local = threading.local()  # sqlite3 connections are per thread
+        self._writes = 0
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db().executescript(_SCHEMA)
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)  # autocommit
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    # ---------- in-process LRU ----------
+    def _cached(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        with self._cache_lock:
+            hit = self._cache.get(key)
+            if hit is None:
+                return None
+            if hit[0] <= now:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return hit[1]
+
+    def _remember(self, key: str, expires_at: float, response: Dict[str, Any]) -> None:
+        with self._cache_lock:
+            self._cache[key] = (expires_at, response)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # ---------- public ----------
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """The stored response, or None if unknown, expired or still in flight."""
+        now = self._clock()
+        hit = self._cached(key, now)
+        if hit is not None:
+            return hit
+        row = self._db().execute(
+            "SELECT response, expires_at FROM idempotency WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        response = json.loads(row[0])
+        self._remember(key, row[1], response)
+        return response
+
+    def reserve(self, key: str) -> bool:
+        """Claim the key before acting on it; False if it is taken (done or in flight)."""
+        now = self._clock()
+        cur = self._db().execute(
+            "INSERT INTO idempotency (key, response, expires_at) VALUES (?, NULL, ?) "
+            "ON CONFLICT(key) DO UPDATE SET response = NULL, expires_at = excluded.expires_at "
+            "WHERE idempotency.expires_at <= ?",
+            (key, now + PENDING_TTL_S, now),
+        )
+        return cur.rowcount == 1
+
+    def release(self, key: str) -> None:
+        """Drop a reservation whose request failed, so the client may retry."""
+        self._db().execute("DELETE FROM idempotency WHERE key = ? AND response IS NULL", (key,))
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        expires_at = self._clock() + self.ttl_s
+        self._db().execute(
+            "INSERT INTO idempotency (key, response, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET response = excluded.response, expires_at = excluded.expires_at",
+            (key, json.dumps(response), expires_at),
+        )
+        self._remember(key, expires_at, response)
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self) -> int:
+        """Delete expired rows, then the oldest completed ones beyond max_rows; returns rows removed."""
+        db = self._db()
+        removed = db.execute("DELETE FROM idempotency WHERE expires_at <= ?", (self._clock(),)).rowcount
+        excess = db.execute("SELECT COUNT(*) FROM idempotency").fetchone()[0] - self.max_rows
+        if excess > 0:
+            removed += db.execute(
+                "DELETE FROM idempotency WHERE key IN "
+                # pending rows expire within PENDING_TTL_S, so by expires_at they would go first,
+                # and a duplicate arriving mid-call could reserve the key again
+                "(SELECT key FROM idempotency WHERE response IS NOT NULL ORDER BY expires_at LIMIT ?)", (excess,)
+            ).rowcount
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cache_lock:
+            cached = len(self._cache)
+        rows = self._db().execute("SELECT COUNT(*) FROM idempotency").fetchone()[0]
+        return {"path": self.path, "rows": rows, "cached": cached, "ttl_s": self.ttl_s,
+                "max_rows": self.max_rows}
+
+
+@lru_cache(maxsize=1)
+def get_idempotency_store() -> IdempotencyStore:
+    return IdempotencyStore()
@@ -61,13 +61,16 @@ def get_client():
     Reuse your existing order client factory (Angel One / stub).
     Env: USE_STUB=true uses in-memory data.
     """
+    if os.getenv("BROKER", "").lower() == "simulator":
+        from src.minimalgotronifylicious.sessions.session_registry import get_session_registry
+        return get_session_registry().client("simulator")
     use_stub = str(os.getenv("USE_STUB", "true")).lower() == "true"
     if use_stub:
         return _StubClient()
     # live path — adapt to your factory/session names
-    from src.minimalgotronifylicious.sessions.angelone_session import AngelOneSession
+    from src.minimalgotronifylicious.sessions.session_registry import get_session_registry
     from src.minimalgotronifylicious.brokers.order_client_factory import OrderClientFactory
-    sess = AngelOneSession.from_env()
+    sess = get_session_registry().session("angel_one")
     # create accepts "smart_connect" OR "angelone" (see UI patch below)
     return OrderClientFactory.create("smart_connect", sess)
 
@@ -1,7 +1,8 @@
 from __future__ import annotations
 import os, uuid
 import time, logging
-from typing import Optional, Literal, Any, Dict
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Optional, Literal, Any, Dict, List, Union
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Body
 from pydantic import BaseModel, Field
@@ -10,17 +11,23 @@ from src.minimalgotronifylicious.brokers.order_client_factory import (
     order_client_factory, resolve_broker_name
 )
 from src.minimalgotronifylicious.utils.circuit_breaker import Circuit
-from src.minimalgotronifylicious.utils.symbols import normalize
+from src.minimalgotronifylicious.utils.symbols import get_symbol_map, normalize
 from src.minimalgotronifylicious.utils.price import extract_price
 from src.minimalgotronifylicious.utils.broker_registry import get_symbols_provider
 from src.minimalgotronifylicious.deps.broker import client_dep
+from src.minimalgotronifylicious.streaming.tick_store import feed_broker, get_tick_store
+from src.minimalgotronifylicious.sessions.session_registry import get_session_registry
+from src.minimalgotronifylicious.utils.metrics import get_metrics
+from src.minimalgotronifylicious.orders.idempotency import get_idempotency_store
+from src.minimalgotronifylicious.brokers.request_scheduler import submit_call
 
 
 router = APIRouter(prefix="/api", tags=["trading"])
 log = logging.getLogger("uvicorn")
 
 circuit = Circuit()
-_IDEM: Dict[str, Dict[str, Any]] = {}
+# read at scrape time; "order" guards POST /order, "trading" the other routes here
+get_metrics().circuit.set_function(lambda: {("order",): int(circuit.open()), ("trading",): int(_circuit_open())})
 # ---------------------------
 # helpers: mode / circuit / utils
 # ---------------------------
@@ -28,8 +35,20 @@ _IDEM: Dict[str, Dict[str, Any]] = {}
 _failures = 0
 _open_until_ms = 0
 
-# minimal in-memory idempotency for /order
-_IDEM: Dict[str, Dict[str, Any]] = {}
+
+def _replay_or_reserve(key: str) -> Optional[Dict[str, Any]]:
+    """Stored response for a replayed X-Request-Id; None once this request owns the key."""
+    store = get_idempotency_store()
+    hit = store.get(key)
+    if hit is not None:
+        return hit
+    if store.reserve(key):
+        return None
+    hit = store.get(key)  # finished between the two lookups
+    if hit is not None:
+        return hit
+    raise HTTPException(status_code=409, detail="Request with this X-Request-Id is already in progress")
+
 # ---------------------------
 # Models
 # ---------------------------
@@ -38,6 +57,10 @@ class LtpResp(BaseModel):
     symbol: str
     ltp: float
     ts: int
+    source: Literal["stream","rest"] = "rest"
+
+class LtpBatchResp(BaseModel):
+    items: List[LtpResp]
 
 class OrderRequest(BaseModel):
     symbol: str
@@ -51,6 +74,24 @@ class OrderResp(BaseModel):
     status: Literal["ACCEPTED","REJECTED","PENDING"]
     message: Optional[str] = None
 
+class BatchOrderRequest(BaseModel):
+    legs: List[OrderRequest] = Field(..., min_length=1)
+    # parallel: every leg at once; sequential: in list order, stop at the first failed leg
+    mode: Literal["parallel","sequential"] = "parallel"
+
+class LegResult(BaseModel):
+    index: int
+    symbol: str
+    # UNKNOWN: no broker answer within BATCH_LEG_TIMEOUT_S; the order may still have been placed
+    status: Literal["ACCEPTED","REJECTED","PENDING","FAILED","CANCELLED","UNKNOWN"]
+    orderId: Optional[str] = None
+    message: Optional[str] = None
+
+class BatchOrderResp(BaseModel):
+    requestId: str
+    status: Literal["ACCEPTED","PARTIAL","REJECTED"]
+    legs: List[LegResult]
+
 @router.get("/symbols")
 def symbols(
     x_broker: Optional[str] = Header(default=None, convert_underscores=False),
@@ -61,14 +102,57 @@ def symbols(
     provider = get_symbols_provider(name)
     return {"broker": name, "items": provider()}
 
-@router.get("/ltp", response_model=LtpResp)
-def ltp(symbol: str, client = Depends(client_dep)):
+def _rest_ltp(client, symbol: str) -> LtpResp:
     ex, token, combined = normalize(symbol)
     try:
         raw = client.ltp(combined)
     except TypeError:
         raw = client.ltp(exchange=ex, symbol=token)
-    return LtpResp(symbol=combined, ltp=extract_price(raw), ts=__import__("time").time_ns()//1_000_000)
+    # not written to the tick store: that holds stream ticks only, so "stream" stays true
+    return LtpResp(symbol=combined, ltp=extract_price(raw), ts=time.time_ns()//1_000_000)
+
+
+@router.get("/ltp", response_model=Union[LtpResp, LtpBatchResp])
+def ltp(
+    symbol: Optional[str] = None,
+    symbols: Optional[str] = None,
+    x_broker: Optional[str] = Header(default=None, convert_underscores=False),
+    x_market_open: Optional[str] = Header(default=None, convert_underscores=False),
+):
+    """
+    Fresh ticks from the stream are served straight from memory; only stale or
+    unknown symbols cost a broker REST call. ?symbols=a,b,c returns a batch.
+
+    The stream stores ticks per broker under EXCHANGE:TOKEN, so a trading symbol
+    (NSE:SBIN-EQ) is looked up as NSE:3045 in the feed of the broker this
+    request resolves to; paper reads the live feed it trades on.
+    """
+    wanted = [s.strip() for s in (symbols or "").split(",") if s.strip()]
+    if symbol:
+        wanted.insert(0, symbol)
+    if not wanted:
+        raise HTTPException(status_code=422, detail="Pass symbol=... or symbols=a,b,c")
+
+    market_open = (x_market_open or "").strip().lower() in ("1","true","yes","on")
+    try:
+        feed = feed_broker(resolve_broker_name(x_broker or os.getenv("BROKER","auto"), market_open))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    store, symbol_map = get_tick_store(), get_symbol_map(feed)
+    client = None  # built lazily: a fully-cached batch never touches the broker
+    items = []
+    for sym in wanted:
+        hit = store.get(symbol_map.feed(sym), broker=feed)
+        if hit is not None:
+            items.append(LtpResp(symbol=normalize(sym)[2], ltp=hit[0], ts=hit[1], source="stream"))
+            continue
+        if client is None:
+            client = client_dep(x_broker, x_market_open)
+        items.append(_rest_ltp(client, sym))
+
+    if symbols is None:
+        return items[0]
+    return LtpBatchResp(items=items)
 
 @router.post("/order", response_model=OrderResp)
 def order(
@@ -82,12 +166,13 @@ def order(
         raise HTTPException(status_code=400, detail="Missing X-Request-Id")
 
     key = f"order:{request_id}"
-    if key in _IDEM:
-        return _IDEM[key]
+    replay = _replay_or_reserve(key)
+    if replay is not None:
+        return replay
 
     # Paper/live distinction is inside the adapter or via env; just try
     try:
-        result = place_order(**(req.model_dump() if hasattr(req, "model_dump") else req.dict()))
+        result = client.place_order(**(req.model_dump() if hasattr(req, "model_dump") else req.dict()))
         order_id = str(result.get("order_id") or result.get("orderId") or uuid.uuid4())
         status = str(result.get("status") or "ACCEPTED").upper()
         message = result.get("message")
@@ -95,9 +180,114 @@ def order(
         circuit.ok()
     except Exception as e:
         circuit.fail()
+        get_idempotency_store().release(key)
         raise HTTPException(status_code=502, detail=f"Broker error: {type(e).__name__}: {e}") from e
 
-    _IDEM[key] = resp
+    get_idempotency_store().put(key, resp)
+    return resp
+
+
+BATCH_MAX_LEGS = int(os.getenv("BATCH_MAX_LEGS", "20"))
+BATCH_LEG_TIMEOUT_S = float(os.getenv("BATCH_LEG_TIMEOUT_S", "30"))
+_LEG_STATUS = {"SUCCESS": "ACCEPTED", "OK": "ACCEPTED", "OPEN": "ACCEPTED", "COMPLETE": "ACCEPTED",
+               "FILLED": "ACCEPTED", "ERROR": "REJECTED", "FAILED": "REJECTED"}
+
+
+def _validate_legs(legs: List[OrderRequest]) -> List[Dict[str, Any]]:
+    errors = []
+    if len(legs) > BATCH_MAX_LEGS:
+        errors.append({"index": None, "error": f"At most {BATCH_MAX_LEGS} legs per batch"})
+    for i, leg in enumerate(legs):
+        if not normalize(leg.symbol)[1]:
+            errors.append({"index": i, "error": "Empty symbol"})
+        if leg.qty <= 0:
+            errors.append({"index": i, "error": "qty must be positive"})
+        if leg.type == "LIMIT" and not (leg.price and leg.price > 0):
+            errors.append({"index": i, "error": "LIMIT leg needs a positive price"})
+    return errors
+
+
+def _leg_result(index: int, leg: OrderRequest, fut) -> LegResult:
+    symbol = normalize(leg.symbol)[2]
+    try:
+        result = fut.result(BATCH_LEG_TIMEOUT_S) or {}
+    except FutureTimeout:
+        # a slow broker is not a failed one: no circuit penalty either way
+        if fut.cancel():
+            return LegResult(index=index, symbol=symbol, status="CANCELLED",
+                             message=f"Not sent: still queued after {BATCH_LEG_TIMEOUT_S:g}s")
+        return LegResult(index=index, symbol=symbol, status="UNKNOWN",
+                         message=f"No broker answer within {BATCH_LEG_TIMEOUT_S:g}s; the order may still be "
+                                 f"placed, check the order book before retrying")
+    except Exception as e:
+        circuit.fail()
+        return LegResult(index=index, symbol=symbol, status="FAILED", message=f"{type(e).__name__}: {e}")
+    circuit.ok()
+    status = str(result.get("status") or "ACCEPTED").upper()
+    status = _LEG_STATUS.get(status, status)
+    order_id = result.get("order_id") or result.get("orderId") or result.get("orderid")
+    return LegResult(index=index, symbol=symbol,
+                     status=status if status in ("ACCEPTED", "REJECTED", "PENDING") else "REJECTED",
+                     orderId=str(order_id) if order_id else None,
+                     message=result.get("message") or result.get("reason") or result.get("error"))
+
+
+@router.post("/orders/batch", response_model=BatchOrderResp)
+def order_batch(
+    req: BatchOrderRequest,
+    client = Depends(client_dep),
+    request_id: Optional[str] = Header(default=None, convert_underscores=False, alias="X-Request-Id"),
+):
+    """
+    Several legs under one X-Request-Id. Every leg is validated before any is
+    sent; legs then go to the broker concurrently, paced by its rate limit
+    (RequestScheduler ORDER lane). In sequential mode legs go one at a time
+    in the given order and the rest are cancelled once a leg fails.
+
+    A leg the broker has not answered within BATCH_LEG_TIMEOUT_S is cancelled
+    if it is still queued (CANCELLED), otherwise reported UNKNOWN: the call is
+    in flight and the order may yet be placed, so look it up in the order
+    book rather than resending. Neither counts against the circuit breaker;
+    a batch with UNKNOWN legs is PARTIAL, and in sequential mode it stops there.
+    """
+    if circuit.open():
+        raise HTTPException(status_code=503, detail="Circuit open")
+    if not request_id:
+        raise HTTPException(status_code=400, detail="Missing X-Request-Id")
+    errors = _validate_legs(req.legs)
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+
+    key = f"batch:{request_id}"
+    replay = _replay_or_reserve(key)
+    if replay is not None:
+        return replay
+
+    try:
+        payloads = [leg.model_dump() for leg in req.legs]
+        results: List[LegResult] = []
+        if req.mode == "parallel":
+            futures = [submit_call(client, "place_order", **p) for p in payloads]
+            results = [_leg_result(i, leg, f) for i, (leg, f) in enumerate(zip(req.legs, futures))]
+        else:
+            failed = None
+            for i, (leg, p) in enumerate(zip(req.legs, payloads)):
+                if failed is not None:
+                    results.append(LegResult(index=i, symbol=normalize(leg.symbol)[2], status="CANCELLED",
+                                             message=f"Not sent: leg {failed} {results[failed].status.lower()}"))
+                    continue
+                results.append(_leg_result(i, leg, submit_call(client, "place_order", **p)))
+                if results[-1].status in ("FAILED", "REJECTED", "CANCELLED", "UNKNOWN"):
+                    failed = i
+    except BaseException:
+        get_idempotency_store().release(key)
+        raise
+
+    placed = sum(r.status in ("ACCEPTED", "PENDING") for r in results)
+    maybe = sum(r.status == "UNKNOWN" for r in results)
+    status = "ACCEPTED" if placed == len(results) else "PARTIAL" if placed or maybe else "REJECTED"
+    resp = BatchOrderResp(requestId=request_id, status=status, legs=results).model_dump()
+    get_idempotency_store().put(key, resp)
     return resp
 
 
@@ -136,14 +326,8 @@ def get_client(
         market_open = x_market_open.strip().lower() in ("1","true","yes","on")
 
     try:
-        # Angel One uses session; factory will validate envs
-        if broker == "angel_one":
-            from src.minimalgotronifylicious.sessions.angelone_session import AngelOneSession
-            sess = AngelOneSession.from_env()
-            return order_client_factory("angel_one", session=sess)
-
-        # Others don't need session; pass flags for AUTO
-        return order_client_factory(broker, market_open=market_open)
+        # Pooled per broker (+ credentials); Angel One logs in once and refreshes ahead of expiry
+        return get_session_registry().client(broker, market_open=market_open)
 
     except RuntimeError as e:
         # Missing creds etc.
@@ -199,8 +383,9 @@ def place_order(
         raise HTTPException(status_code=400, detail="Missing X-Request-Id")
 
     key = f"order:{request_id}"
-    if key in _IDEM:
-        return _IDEM[key]
+    replay = _replay_or_reserve(key)
+    if replay is not None:
+        return replay
 
     # Paper: fake accept; Live: call real adapter
     if paper_mode():
@@ -217,17 +402,19 @@ def place_order(
             resp = OrderResp(orderId=order_id, status=status, message=message).model_dump()
         except Exception as e:
             _record_failure()
+            get_idempotency_store().release(key)
             raise HTTPException(status_code=502, detail=f"Broker error: {type(e).__name__}: {e}") from e
 
     _record_success()
-    _IDEM[key] = resp
+    get_idempotency_store().put(key, resp)
     return resp
 
 
 @router.get("/positions")
 def positions(client = Depends(get_client)):
     """
-    Paper: returns in-memory snapshot if available.
+    Paper: returns the portfolio as kept (running P&L, no price lookups);
+    /ws/positions streams the same state as per-position deltas.
     Live: call adapter's positions/holdings as you wire it.
     """
     if _circuit_open():
@@ -4,6 +4,7 @@ import os
 from logzero import logger
 from SmartApi import SmartConnect
 from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 from src.minimalgotronifylicious.sessions.base_broker_session import BaseBrokerSession  # your abstract base
 from src.minimalgotronifylicious.utils.net import get_public_ip
@@ -145,6 +146,23 @@ class AngelOneSession(BaseBrokerSession):
         except Exception as e:
             logger.debug(f"Could not resolve public IP (non-fatal): {e}")
 
+    def refresh(self) -> None:
+        """
+        Renews the JWT with the refresh token instead of a full TOTP login.
+        """
+        if not self.api or not self.refresh_token:
+            raise RuntimeError("AngelOne session not logged in; nothing to refresh.")
+
+        data = self.api.generateToken(self.refresh_token)
+        if not data or data.get("status") is False:
+            logger.error({"where": "angelone.refresh.generateToken", "resp": data})
+            raise RuntimeError(f"AngelOne token refresh failed: {data}")
+
+        d = data.get("data") or {}
+        self.auth_token = d.get("jwtToken", self.auth_token)
+        self.refresh_token = d.get("refreshToken", self.refresh_token)
+        self.feed_token = d.get("feedToken", self.feed_token)
+
     # ---- Compatibility helpers ----
     def get_auth_info(self) -> Dict[str, Any]:
         return {
@@ -172,16 +190,26 @@ class AngelOneSession(BaseBrokerSession):
         if not self.api:
             raise RuntimeError("AngelOne session not initialized (self.api is None). Did you call login()?")
 
+        # getCandleData takes one dict with IST "YYYY-MM-DD HH:MM" bounds
         params: Dict[str, Any] = {
+            "exchange": extra_params.pop("exchange", "NSE"),
             "symboltoken": symbol,
             "interval": interval,
         }
         if from_ts is not None:
-            params["from"] = from_ts
+            params["fromdate"] = _ist(from_ts)
         if to_ts is not None:
-            params["to"] = to_ts
-        if limit is not None:
-            params["limit"] = limit
+            params["todate"] = _ist(to_ts)
         params.update(extra_params)
 
-        return self.api.getCandleData(**params)
+        resp = self.api.getCandleData(params)
+        if limit is not None and isinstance(resp, dict) and isinstance(resp.get("data"), list):
+            resp["data"] = resp["data"][-limit:]
+        return resp
+
+
+_IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def _ist(ts_ms: int) -> str:
+    return datetime.fromtimestamp(ts_ms / 1000, _IST).strftime("%Y-%m-%d %H:%M")
@@ -0,0 +1,217 @@
+# src/minimalgotronifylicious/sessions/session_registry.py
+"""
+Process-wide pool of logged-in broker sessions and the clients built on them.
+
+A fresh AngelOneSession costs a TOTP login, a profile fetch, a token
+generation and a public-IP lookup. The registry does that once per
+(broker, credentials) and hands the same session to every request:
+
+    fresh           → served from memory
+    near expiry     → served from memory, one background refresh renews it
+    expired/missing → callers wait on ONE in-flight login (single flight)
+
+Clients are pooled per resolved broker name (plus credentials for brokers
+that need a session) and rebuilt only when their session is replaced. Their
+REST calls go through the rate-limited RequestScheduler.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.minimalgotronifylicious.brokers.order_client_factory import (
+    order_client_factory, resolve_broker_name,
+)
+from src.minimalgotronifylicious.brokers.request_scheduler import scheduled_client
+from src.minimalgotronifylicious.utils.broker_registry import load_registry
+
+log = logging.getLogger(__name__)
+
+Key = Tuple[str, str]  # (broker, credentials fingerprint)
+
+
+def env_creds(broker: str):
+    if broker == "angel_one":
+        from src.minimalgotronifylicious.sessions.angelone_session import AngelOneCreds
+        return AngelOneCreds.from_env()
+    raise ValueError(f"Broker {broker!r} has no session")
+
+
+def connect(broker: str, creds) -> Any:
+    """Default login: build the broker's session and log it in."""
+    if broker == "angel_one":
+        from src.minimalgotronifylicious.sessions.angelone_session import AngelOneSession
+        sess = AngelOneSession(creds)
+        sess.login()
+        return sess
+    raise ValueError(f"Broker {broker!r} has no session")
+
+
+def fingerprint(creds) -> str:
+    """Stable key for a credentials object that never keeps the secrets around."""
+    fields = vars(creds) if hasattr(creds, "__dict__") else creds
+    raw = "|".join(f"{k}={fields[k]}" for k in sorted(fields))
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+class _Flight:
+    """One login/refresh in progress; late arrivals wait on it."""
+    __slots__ = ("done", "session", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.session: Any = None
+        self.error: Optional[BaseException] = None
+
+
+@dataclass
+class _Entry:
+    session: Any = None
+    refresh_at: float = 0.0
+    expires_at: float = 0.0
+    flight: Optional[_Flight] = None
+    logins: int = 0
+    refreshes: int = 0
+    clients: Dict[str, Any] = field(default_factory=dict)
+
+
+class SessionRegistry:
+    def __init__(
+        self,
+        connect: Callable[[str, Any], Any] = connect,
+        creds_from_env: Callable[[str], Any] = env_creds,
+        ttl_s: Optional[float] = None,
+        refresh_margin_s: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._connect = connect
+        self._creds_from_env = creds_from_env
+        self.ttl_s = ttl_s if ttl_s is not None else float(os.getenv("SESSION_TTL_S", str(8 * 3600)))
+        self.refresh_margin_s = (
+            refresh_margin_s if refresh_margin_s is not None
+            else float(os.getenv("SESSION_REFRESH_MARGIN_S", "600"))
+        )
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[Key, _Entry] = {}
+        self._clients: Dict[str, Any] = {}  # brokers without a session
+
+    # ---------- sessions ----------
+    def session(self, broker: str = "angel_one", creds=None):
+        creds = creds if creds is not None else self._creds_from_env(broker)
+        key = (broker, fingerprint(creds))
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            now = self._clock()
+            if entry.session is not None and now < entry.expires_at:
+                if now >= entry.refresh_at and entry.flight is None:
+                    # still valid: renew it off the request path
+                    entry.flight = _Flight()
+                    threading.Thread(
+                        target=self._run, args=(key, entry, creds, entry.flight),
+                        name=f"session-refresh-{broker}", daemon=True,
+                    ).start()
+                return entry.session
+            flight = entry.flight
+            leader = flight is None
+            if leader:
+                flight = entry.flight = _Flight()
+        if leader:
+            self._run(key, entry, creds, flight)
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.session
+
+    def _run(self, key: Key, entry: _Entry, creds, flight: _Flight) -> None:
+        current = entry.session
+        try:
+            sess = None
+            refresh = getattr(current, "refresh", None)
+            if refresh is not None:
+                try:
+                    refresh()
+                    sess = current
+                except Exception as e:
+                    log.info("SessionRegistry: refresh for %s failed, logging in again: %s", key[0], e)
+            if sess is None:
+                sess = self._connect(key[0], creds)
+        except BaseException as e:
+            flight.error = e
+            log.warning("SessionRegistry: login for %s failed: %s", key[0], e)
+        else:
+            flight.session = sess
+        with self._lock:
+            entry.flight = None
+            if flight.error is None:
+                now = self._clock()
+                if sess is current:
+                    entry.refreshes += 1
+                else:
+                    entry.logins += 1
+                    entry.clients.clear()  # they wrap the old session's api
+                entry.session = sess
+                entry.expires_at = now + self.ttl_s
+                entry.refresh_at = entry.expires_at - self.refresh_margin_s
+        flight.done.set()
+
+    def invalidate(self, broker: str = "angel_one", creds=None) -> None:
+        """Forget a session (e.g. after the broker rejected its token)."""
+        creds = creds if creds is not None else self._creds_from_env(broker)
+        with self._lock:
+            entry = self._entries.get((broker, fingerprint(creds)))
+            if entry is not None:
+                entry.session = None
+                entry.clients.clear()
+
+    # ---------- clients ----------
+    def client(self, broker: Optional[str] = None, *, market_open: Optional[bool] = None, creds=None):
+        name = resolve_broker_name(broker, market_open)
+        if not (load_registry().get(name) or {}).get("needs_session"):
+            with self._lock:
+                cached = self._clients.get(name)
+            if cached is not None:
+                return cached
+            built = scheduled_client(name, order_client_factory(name))
+            with self._lock:
+                return self._clients.setdefault(name, built)
+
+        creds = creds if creds is not None else self._creds_from_env(name)
+        sess = self.session(name, creds)
+        entry = self._entries[(name, fingerprint(creds))]
+        with self._lock:
+            cached = entry.clients.get(name)
+        if cached is not None and cached[0] is sess:
+            return cached[1]
+        built = scheduled_client(name, order_client_factory(name, session=sess))
+        with self._lock:
+            entry.clients[name] = (sess, built)
+        return built
+
+    # ---------- introspection ----------
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        with self._lock:
+            return {
+                "sessions": {
+                    f"{b}:{fp}": {
+                        "live": e.session is not None and now < e.expires_at,
+                        "expires_in_s": round(max(e.expires_at - now, 0.0), 1),
+                        "logins": e.logins,
+                        "refreshes": e.refreshes,
+                    }
+                    for (b, fp), e in self._entries.items()
+                },
+                "clients": sorted(self._clients),
+            }
+
+
+@lru_cache(maxsize=1)
+def get_session_registry() -> SessionRegistry:
+    return SessionRegistry()
@@ -0,0 +1,146 @@
+# src/minimalgotronifylicious/streaming/demand.py
+"""
+Upstream subscriptions that follow viewer demand.
+
+TickHub calls acquire() on a symbol's first viewer and release() when the
+last one leaves. Nothing is sent on the spot: changes collect for one batch
+window and go out as one control frame per (action, exchange type).
+
+    acquire ──► pending ─┐
+                         ├─ every UPSTREAM_BATCH_MS ─► subscribe([{exchangeType, tokens}])
+    release ──► linger ──┘        (deadline passed)  ─► unsubscribe([{exchangeType, tokens}])
+
+A viewer who comes back within UPSTREAM_LINGER_S (a page reload, a tab
+switch) cancels the pending unsubscribe, so the feed never blinks.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from src.minimalgotronifylicious.streaming.tick import EXCHANGES
+from src.minimalgotronifylicious.utils.symbols import normalize
+
+log = logging.getLogger(__name__)
+
+EXCHANGE_TYPES = {name: code for code, name in EXCHANGES.items()}
+
+Feed = Tuple[int, str]  # (exchangeType, token)
+
+
+def feed_key(symbol: str) -> Tuple[str, Feed]:
+    """'nse:3045' → ('NSE:3045', (1, '3045')); the first is what ticks are published under."""
+    ex, token, key = normalize(symbol)
+    code = EXCHANGE_TYPES.get(ex)
+    if code is None:
+        raise ValueError(f"Unknown exchange: {ex}")
+    return key, (code, token)
+
+
+def _frames(feeds) -> Dict[int, List[str]]:
+    out: Dict[int, List[str]] = {}
+    for code, token in feeds:
+        out.setdefault(code, []).append(token)
+    return out
+
+
+class UpstreamDemand:
+    def __init__(self, manager: Any, linger_s: Optional[float] = None, batch_s: Optional[float] = None,
+                 mode: int = 3, clock: Callable[[], float] = time.monotonic):
+        self.manager = manager
+        self.linger_s = linger_s if linger_s is not None else float(os.getenv("UPSTREAM_LINGER_S", "30"))
+        self.batch_s = batch_s if batch_s is not None else float(os.getenv("UPSTREAM_BATCH_MS", "250")) / 1000
+        self.mode = mode
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sent: Set[Feed] = set()           # subscribed upstream
+        self._pending: Dict[Feed, None] = {}    # to subscribe on the next flush
+        self._linger: Dict[Feed, float] = {}    # feed → unsubscribe deadline
+        self._task: Optional[asyncio.Task] = None
+        self._kick: Optional[asyncio.Event] = None
+
+    # ---------- demand ----------
+    def acquire(self, feed: Feed) -> None:
+        with self._lock:
+            self._linger.pop(feed, None)
+            first = not self._pending
+            if feed not in self._sent:
+                self._pending[feed] = None
+            kick = first and bool(self._pending)
+        self._schedule(kick)
+
+    def release(self, feed: Feed) -> None:
+        with self._lock:
+            if feed in self._sent or feed in self._pending:
+                self._linger[feed] = self._clock() + self.linger_s
+        self._schedule()
+
+    # ---------- batching ----------
+    def flush(self) -> Tuple[Dict[int, List[str]], Dict[int, List[str]]]:
+        """Send what is due. Returns (subscribed, unsubscribed) by exchange type."""
+        now = self._clock()
+        with self._lock:
+            subs = [f for f in self._pending if f not in self._sent]
+            self._pending.clear()
+            self._sent.update(subs)
+            due = [f for f, deadline in self._linger.items() if deadline <= now]
+            for f in due:
+                del self._linger[f]
+            unsubs = [f for f in due if f in self._sent]
+            self._sent.difference_update(unsubs)
+        added, removed = _frames(subs), _frames(unsubs)
+        for code, tokens in added.items():
+            self._send("subscribe", code, tokens)
+        for code, tokens in removed.items():
+            self._send("unsubscribe", code, tokens)
+        return added, removed
+
+    def _send(self, action: str, code: int, tokens: List[str]) -> None:
+        try:
+            getattr(self.manager, action)([{"exchangeType": code, "tokens": tokens}], mode=self.mode)
+        except Exception as e:
+            log.warning("UpstreamDemand: %s %s failed: %s", action, tokens, e)
+
+    def _next_wake(self) -> Optional[float]:
+        """Seconds until the next flush is useful, None when there is nothing left to do."""
+        with self._lock:
+            if self._pending:
+                return self.batch_s
+            if not self._linger:
+                return None
+            return max(self.batch_s, min(self._linger.values()) - self._clock())
+
+    def _schedule(self, kick: bool = False) -> None:
+        """Start the flush loop on the running loop, or cut short its linger sleep."""
+        if self._task is not None and not self._task.done():
+            if kick and self._kick is not None:
+                self._kick.set()
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no loop: the caller drives flush() itself
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        # wakes only when there is something to send or a linger to expire
+        self._kick = asyncio.Event()
+        wait = self._next_wake()
+        while wait is not None:
+            self._kick.clear()
+            try:
+                await asyncio.wait_for(self._kick.wait(), timeout=wait)
+                wait = self.batch_s  # new subscriptions: give the batch its window
+                continue
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.to_thread(self.flush)
+            wait = self._next_wake()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"subscribed": len(self._sent), "pending": len(self._pending), "lingering": len(self._linger)}
@@ -0,0 +1,118 @@
+# src/minimalgotronifylicious/streaming/feed_health.py
+"""
+Feed health: per-socket ping round trips and per-symbol tick staleness.
+
+Every tick touches its symbol's row (O(1), no lock: each symbol is fed by
+one socket thread). A symbol's expected interval is learned from its own
+tick gaps (EWMA); it is stale once silent for FEED_STALE_FACTOR × that,
+never less than FEED_STALE_S:
+
+    touch(sym) ──► last, gap_ewma
+    stale(syms) ◄── now − max(last, last resubscribe) > expected × 2^retries
+
+Only stale tokens get re-subscribed, and each retry doubles that symbol's
+wait (capped), so a closed market or an illiquid contract is not hammered.
+"""
+from __future__ import annotations
+
+import os
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+EWMA_ALPHA = 0.2
+MAX_BACKOFF = 32  # × expected interval
+
+
+class _Track:
+    __slots__ = ("last", "gap", "ticks", "retries", "poked")
+
+    def __init__(self, now: float):
+        self.last = now     # last tick (or when the watch began)
+        self.gap = 0.0      # EWMA of inter-tick gaps, seconds
+        self.ticks = 0
+        self.retries = 0
+        self.poked = 0.0    # last re-subscribe
+
+
+class FeedHealth:
+    def __init__(self, min_stale_s: Optional[float] = None, factor: Optional[float] = None):
+        self.min_stale_s = min_stale_s if min_stale_s is not None else float(os.getenv("FEED_STALE_S", "10"))
+        self.factor = factor if factor is not None else float(os.getenv("FEED_STALE_FACTOR", "5"))
+        self._symbols: Dict[str, _Track] = {}
+        self._sockets: Dict[str, Dict[str, Any]] = {}
+
+    # ---------- symbols ----------
+    def watch(self, symbols: Iterable[str], now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        for s in symbols:
+            if s not in self._symbols:
+                self._symbols[s] = _Track(now)
+
+    def forget(self, symbols: Iterable[str]) -> None:
+        for s in symbols:
+            self._symbols.pop(s, None)
+
+    def touch(self, symbol: str, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        t = self._symbols.get(symbol)
+        if t is None:
+            self._symbols[symbol] = t = _Track(now)
+        elif t.ticks:
+            gap = now - t.last
+            t.gap = gap if t.ticks == 1 else t.gap + EWMA_ALPHA * (gap - t.gap)
+        t.last = now
+        t.ticks += 1
+        t.retries = 0
+
+    def expected_s(self, symbol: str) -> float:
+        t = self._symbols.get(symbol)
+        return max(self.min_stale_s, self.factor * t.gap) if t is not None else self.min_stale_s
+
+    def _overdue(self, t: _Track, now: float) -> bool:
+        wait = max(self.min_stale_s, self.factor * t.gap) * min(2 ** t.retries, MAX_BACKOFF)
+        return now - max(t.last, t.poked) > wait
+
+    def stale(self, symbols: Iterable[str], now: Optional[float] = None) -> List[str]:
+        now = time.monotonic() if now is None else now
+        out = []
+        for s in symbols:
+            t = self._symbols.get(s)
+            if t is not None and self._overdue(t, now):
+                out.append(s)
+        return out
+
+    def resubscribed(self, symbols: Iterable[str], now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        for s in symbols:
+            t = self._symbols.get(s)
+            if t is not None:
+                t.poked = now
+                t.retries += 1
+
+    # ---------- sockets ----------
+    def report_socket(self, name: str, **fields: Any) -> None:
+        self._sockets.setdefault(name, {}).update(fields)
+
+    # ---------- introspection ----------
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.monotonic() if now is None else now
+        symbols = {}
+        for s, t in list(self._symbols.items()):
+            symbols[s] = {
+                "age_s": round(now - t.last, 3),
+                "expected_s": round(max(self.min_stale_s, self.factor * t.gap), 3),
+                "ticks": t.ticks,
+                "stale": self._overdue(t, now),
+                "resubscribes": t.retries,
+            }
+        return {
+            "sockets": {k: dict(v) for k, v in self._sockets.items()},
+            "symbols": symbols,
+            "stale": sorted(s for s, v in symbols.items() if v["stale"]),
+        }
+
+
+@lru_cache(maxsize=1)
+def get_feed_health() -> FeedHealth:
+    return FeedHealth()
@@ -0,0 +1,165 @@
+# src/minimalgotronifylicious/streaming/recorder.py
+"""
+Opt-in recorder for raw feed frames (set FEED_RECORD_DIR to enable).
+
+The socket callback only appends (recv_ns, frame) to a deque; a writer
+thread drains it in large buffered writes, so recording costs the feed one
+clock read and one append per frame.
+
+    <root>/<YYYYMMDD>/<HHMMSS>.<label>.seg    new segment each UTC hour (and each run),
+                                              named by when it was opened
+
+    segment = header  | record | record | ...
+    header  = b"MGTFEED1" | wall_ns <q | mono_ns <q     (same instant on both clocks)
+    record  = recv_mono_ns <q | length <I | frame bytes
+
+Segments are append-only: a crash loses at most the last partial record,
+which iter_frames() stops at.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import struct
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Callable, Iterator, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"MGTFEED1"
+HEADER = struct.Struct("<8sqq")
+RECORD = struct.Struct("<qI")
+
+
+class FrameRecorder:
+    def __init__(self, root: str, label: str = "feed", buffer_bytes: int = 1 << 20,
+                 max_backlog: int = 1_000_000, flush_s: float = 0.05,
+                 wall_clock: Callable[[], float] = time.time):
+        self.root = root
+        self.label = label
+        self.buffer_bytes = buffer_bytes
+        self.max_backlog = max_backlog
+        self.flush_s = flush_s
+        self._wall = wall_clock
+        self._queue: deque = deque()
+        self._stop = threading.Event()
+        self._file = None
+        self._hour: Optional[str] = None  # "YYYYMMDD/HH" of the open segment
+        self.frames = 0
+        self.dropped = 0
+        self.segments: List[str] = []
+        self._writer = threading.Thread(target=self._run, name="feed-recorder", daemon=True)
+        self._writer.start()
+
+    # ---------- hot path (feed thread) ----------
+    def record(self, frame) -> None:
+        if len(self._queue) >= self.max_backlog:
+            self.dropped += 1  # the disk can't keep up; never stall the feed
+            return
+        self._queue.append((time.monotonic_ns(), bytes(frame)))
+
+    # ---------- writer thread ----------
+    def _segment(self) -> None:
+        now = self._wall()
+        stamp = datetime.fromtimestamp(now, tz=timezone.utc).strftime("%Y%m%d/%H%M%S")
+        if stamp[:11] == self._hour:
+            return
+        if self._file is not None:
+            self._file.close()
+        day, hms = stamp.split("/")
+        path = os.path.join(self.root, day, f"{hms}.{self.label}.seg")
+        n = 0
+        while os.path.exists(path):  # restarted within the same second
+            n += 1
+            path = os.path.join(self.root, day, f"{hms}.{self.label}.{n}.seg")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # a segment's monotonic stamps only mean something within one process → never append
+        self._file = open(path, "wb", buffering=self.buffer_bytes)
+        self._file.write(HEADER.pack(MAGIC, int(now * 1e9), time.monotonic_ns()))
+        self._hour = stamp[:11]
+        self.segments.append(path)
+
+    def _drain(self) -> int:
+        q = self._queue
+        n = len(q)
+        if not n:
+            return 0
+        self._segment()
+        pack, write = RECORD.pack, self._file.write
+        for _ in range(n):
+            ts, frame = q.popleft()
+            write(pack(ts, len(frame)))
+            write(frame)
+        self._file.flush()
+        self.frames += n
+        return n
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if not self._drain():
+                    self._stop.wait(self.flush_s)
+            except Exception as e:
+                log.error("FrameRecorder: write failed: %s", e)
+                self._stop.wait(1.0)
+        self._drain()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._writer.join(timeout=5)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def iter_frames(path: str) -> Iterator[Tuple[int, bytes]]:
+    """(recv_mono_ns, frame) for every complete record in one segment."""
+    with open(path, "rb") as f:
+        head = f.read(HEADER.size)
+        if len(head) < HEADER.size or head[:8] != MAGIC:
+            raise ValueError(f"Not a feed segment: {path}")
+        size = RECORD.size
+        while True:
+            raw = f.read(size)
+            if len(raw) < size:
+                return
+            ts, n = RECORD.unpack(raw)
+            frame = f.read(n)
+            if len(frame) < n:
+                return  # torn tail
+            yield ts, frame
+
+
+def segment_clock(path: str) -> Tuple[int, int]:
+    """(wall_ns, mono_ns) recorded when the segment was opened."""
+    with open(path, "rb") as f:
+        magic, wall_ns, mono_ns = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"Not a feed segment: {path}")
+    return wall_ns, mono_ns
+
+
+def list_segments(root: str) -> List[str]:
+    """Every segment under root, oldest first."""
+    out = []
+    for day in sorted(os.listdir(root)) if os.path.isdir(root) else ():
+        d = os.path.join(root, day)
+        if os.path.isdir(d):
+            out.extend(os.path.join(d, f) for f in sorted(os.listdir(d)) if f.endswith(".seg"))
+    return out
+
+
+@lru_cache(maxsize=1)
+def get_recorder() -> Optional[FrameRecorder]:
+    root = os.getenv("FEED_RECORD_DIR")
+    if not root:
+        return None
+    rec = FrameRecorder(root, label=os.getenv("FEED_RECORD_LABEL", "angel_one"))
+    atexit.register(rec.close)
+    log.info("FrameRecorder: recording raw frames under %s", root)
+    return rec
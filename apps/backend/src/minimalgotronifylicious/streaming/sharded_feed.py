@@ -0,0 +1,184 @@
+# src/minimalgotronifylicious/streaming/sharded_feed.py
+"""
+One logical feed spread over several upstream sockets.
+
+SmartAPI caps tokens per connection, and a single socket decodes every
+frame on one thread. ShardedFeed looks like one WebSocketManager to the
+TickHub but places each EXCHANGE:TOKEN on one of up to FEED_SOCKETS
+sockets (FEED_TOKENS_PER_SOCKET each), opening a socket only when a token
+is first placed on it:
+
+    subscribe([...]) ──► placement ──► shard 0: WebSocketManager ── feed thread (decode) ─┐
+                                  ├──► shard 1: WebSocketManager ── feed thread (decode) ─┼─► observers
+                                  └──► shard 2: ...                                       ─┘
+
+A symbol lives on exactly one shard until it is neither subscribed nor
+observed, so its ticks come from one feed thread and stay in order; the
+merged stream needs no resequencing.
+
+Placement is "least_loaded" (fewest subscribed tokens) or "hash" (crc32 of
+the name, falling back to least loaded when that shard is full).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from src.minimalgotronifylicious.streaming.tick import EXCHANGES
+
+log = logging.getLogger(__name__)
+
+LEAST_LOADED = "least_loaded"
+HASH = "hash"
+
+
+class ShardedFeed:
+    def __init__(self, make_shard: Callable[[int], Any], max_shards: Optional[int] = None,
+                 cap: Optional[int] = None, placement: Optional[str] = None):
+        self._make_shard = make_shard
+        self.max_shards = max_shards or int(os.getenv("FEED_SOCKETS", "3"))
+        self.cap = cap or int(os.getenv("FEED_TOKENS_PER_SOCKET", "1000"))
+        self.placement = placement or os.getenv("FEED_PLACEMENT", LEAST_LOADED)
+        if self.placement not in (LEAST_LOADED, HASH):
+            raise ValueError(f"Unknown placement: {self.placement}")
+        self._shards: List[Optional[Any]] = [None] * self.max_shards
+        self._tokens: List[Set[str]] = [set() for _ in range(self.max_shards)]
+        self._home: Dict[str, int] = {}      # EXCHANGE:TOKEN → shard index
+        self._watchers: Dict[str, int] = {}  # EXCHANGE:TOKEN → registered observers
+        self._lock = threading.RLock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._started = False
+
+    # ---------- placement ----------
+    def _place(self, name: str) -> int:
+        home = self._home.get(name)
+        if home is not None:
+            return home
+        if self.placement == HASH:
+            i = zlib.crc32(name.encode()) % self.max_shards
+            if len(self._tokens[i]) < self.cap:
+                self._home[name] = i
+                return i
+        i = min(range(self.max_shards), key=lambda k: len(self._tokens[k]))
+        if len(self._tokens[i]) >= self.cap:
+            raise RuntimeError(f"Feed is full: {self.max_shards} sockets × {self.cap} tokens")
+        self._home[name] = i
+        return i
+
+    def _forget_if_idle(self, name: str) -> None:
+        i = self._home.get(name)
+        if i is not None and name not in self._tokens[i] and not self._watchers.get(name):
+            del self._home[name]
+
+    def _shard(self, i: int):
+        shard = self._shards[i]
+        if shard is None:
+            shard = self._shards[i] = self._make_shard(i)
+            if self._started:
+                self._launch(shard)
+            log.info("ShardedFeed: opened socket %d", i)
+        return shard
+
+    def _launch(self, shard) -> None:
+        """Start a shard's supervisor on the feed's loop, whichever thread we are on."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            shard.start()
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            shard.start()
+        else:
+            loop.call_soon_threadsafe(shard.start)
+
+    # ---------- WebSocketManager surface ----------
+    def start(self):
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+        with self._lock:
+            self._started = True
+            for shard in self._shards:
+                if shard is not None:
+                    self._launch(shard)
+
+    def stop(self):
+        with self._lock:
+            self._started = False
+            shards = [s for s in self._shards if s is not None]
+        for shard in shards:
+            shard.stop()
+
+    def is_connected(self) -> bool:
+        with self._lock:
+            live = [s for s in self._shards if s is not None]
+        return bool(live) and all(s.is_connected() for s in live)
+
+    def register(self, symbol: str, observer) -> None:
+        with self._lock:
+            shard = self._shard(self._place(symbol))
+            self._watchers[symbol] = self._watchers.get(symbol, 0) + 1
+        shard.register(symbol, observer)
+
+    def unregister(self, symbol: str, observer) -> None:
+        with self._lock:
+            i = self._home.get(symbol)
+            if i is None:
+                return
+            shard = self._shards[i]
+            left = self._watchers.get(symbol, 0) - 1
+            if left > 0:
+                self._watchers[symbol] = left
+            else:
+                self._watchers.pop(symbol, None)
+            self._forget_if_idle(symbol)
+        shard.unregister(symbol, observer)
+
+    def subscribe(self, token_list: List[dict], mode=3) -> None:
+        for i, part in self._split(token_list, add=True).items():
+            self._shards[i].subscribe(part, mode=mode)
+
+    def unsubscribe(self, token_list: List[dict], mode=3) -> None:
+        for i, part in self._split(token_list, add=False).items():
+            self._shards[i].unsubscribe(part, mode=mode)
+
+    def _split(self, token_list: List[dict], add: bool) -> Dict[int, List[dict]]:
+        """SmartAPI token_list → {shard: token_list}, updating placement and load."""
+        out: Dict[int, Dict[int, List[str]]] = {}
+        with self._lock:
+            for entry in token_list:
+                code = entry["exchangeType"]
+                for token in entry["tokens"]:
+                    name = f"{EXCHANGES.get(code, code)}:{token}"
+                    if add:
+                        i = self._place(name)
+                        self._shard(i)
+                        self._tokens[i].add(name)
+                    else:
+                        i = self._home.get(name)
+                        if i is None:
+                            continue
+                        self._tokens[i].discard(name)
+                        self._forget_if_idle(name)
+                    out.setdefault(i, {}).setdefault(code, []).append(str(token))
+        return {i: [{"exchangeType": code, "tokens": toks} for code, toks in by_code.items()]
+                for i, by_code in out.items()}
+
+    # ---------- introspection ----------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "placement": self.placement,
+                "sockets": [
+                    {"tokens": len(self._tokens[i]), "connected": bool(s.is_connected())}
+                    for i, s in enumerate(self._shards) if s is not None
+                ],
+            }
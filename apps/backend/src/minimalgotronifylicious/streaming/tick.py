@@ -0,0 +1,129 @@
+# src/minimalgotronifylicious/streaming/tick.py
+"""
+The one tick shape used from the feed to the observers.
+
+A Tick is parsed once, where it enters the process (binary decoder, SDK
+dict or legacy JSON), and then handed around as-is. Prices are integer
+paise so nothing downstream re-rounds floats; `price` gives rupees.
+
+TickBatch keeps many ticks as columns (array('q') per field) so an
+observer can take a whole frame at once, e.g. as NumPy views.
+"""
+from __future__ import annotations
+
+import json
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+# SmartWebSocketV2 exchange_type codes
+EXCHANGES = {1: "NSE", 2: "NFO", 3: "BSE", 4: "BFO", 5: "MCX", 7: "NCDEX", 13: "CDS"}
+
+
+def _paise(rupees) -> int:
+    return int(round(float(rupees) * 100))
+
+
+class Tick(NamedTuple):
+    token: str
+    exchange: str
+    ltp: int            # paise
+    volume: int = 0     # traded for the day; 0 in LTP mode
+    exchange_ts: int = 0  # ms since epoch
+
+    @property
+    def price(self) -> float:
+        return self.ltp / 100.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"token": self.token, "exchange": self.exchange, "ltp": self.price,
+                "volume": self.volume, "exchange_ts": self.exchange_ts}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any], ltp_in_paise: bool = False) -> "Tick":
+        """
+        SDK dicts carry last_traded_price in paise; our own {"ltp": ...} is
+        rupees unless the caller says otherwise (legacy {"data": [...]} items).
+        """
+        if "last_traded_price" in d:
+            ltp = int(d["last_traded_price"])
+        else:
+            ltp = int(d.get("ltp") or 0) if ltp_in_paise else _paise(d.get("ltp") or 0)
+        exch = d.get("exchange") or EXCHANGES.get(d.get("exchange_type"), "NSE")
+        return cls(
+            token=str(d.get("token") or d.get("symbol") or ""),
+            exchange=exch,
+            ltp=ltp,
+            volume=int(d.get("volume_trade_for_the_day") or d.get("volume") or 0),
+            exchange_ts=int(d.get("exchange_timestamp") or d.get("exchange_ts") or 0),
+        )
+
+    @classmethod
+    def coerce(cls, data: Any) -> "Tick":
+        """Whatever arrived on the feed → Tick. A Tick is returned untouched."""
+        if type(data) is cls:
+            return data
+        if isinstance(data, (str, bytes)):
+            data = json.loads(data)
+        if isinstance(data, dict):
+            return cls.from_dict(data)
+        to_tick = getattr(data, "to_tick", None)  # FeedTick from the binary decoder
+        if to_tick is not None:
+            return to_tick()
+        if isinstance(data, (int, float)):
+            return cls(token="", exchange="NSE", ltp=_paise(data))
+        raise TypeError(f"Cannot make a Tick from {type(data).__name__}")
+
+
+class TickBatch:
+    """Column store for a run of ticks; append is O(1) and allocation-free per field."""
+    __slots__ = ("tokens", "exchanges", "ltp", "volume", "exchange_ts")
+
+    def __init__(self, ticks: Optional[Iterable[Tick]] = None):
+        self.tokens: List[str] = []
+        self.exchanges: List[str] = []
+        self.ltp = array("q")
+        self.volume = array("q")
+        self.exchange_ts = array("q")
+        if ticks is not None:
+            self.extend(ticks)
+
+    def append(self, tick: Tick) -> None:
+        self.tokens.append(tick.token)
+        self.exchanges.append(tick.exchange)
+        self.ltp.append(tick.ltp)
+        self.volume.append(tick.volume)
+        self.exchange_ts.append(tick.exchange_ts)
+
+    def extend(self, ticks: Iterable[Tick]) -> None:
+        for t in ticks:
+            self.append(t)
+
+    def __len__(self) -> int:
+        return len(self.ltp)
+
+    def __iter__(self) -> Iterator[Tick]:
+        return map(Tick, self.tokens, self.exchanges, self.ltp, self.volume, self.exchange_ts)
+
+    def prices(self) -> np.ndarray:
+        """LTPs in rupees as float64."""
+        return np.frombuffer(self.ltp, dtype=np.int64) / 100.0
+
+    def timestamps(self) -> np.ndarray:
+        """Zero-copy view of the exchange timestamps."""
+        return np.frombuffer(self.exchange_ts, dtype=np.int64)
+
+
+def iter_ticks(message: Any) -> Iterable[Tick]:
+    """
+    Observer entry point: a Tick, a TickBatch, a feed dict/JSON, or the
+    legacy {"data": [{...}, ...]} envelope (whose ltp values are paise).
+    """
+    if isinstance(message, (Tick, TickBatch)):
+        return (message,) if isinstance(message, Tick) else message
+    if isinstance(message, (str, bytes)):
+        message = json.loads(message)
+    if isinstance(message, dict) and isinstance(message.get("data"), list):
+        return [Tick.from_dict(item, ltp_in_paise=True) for item in message["data"]]
+    return (Tick.coerce(message),)
@@ -0,0 +1,268 @@
+# src/minimalgotronifylicious/streaming/tick_hub.py
+"""
+One process-wide fan-out point for live ticks.
+
+Every /ws/stream connection used to log in and open its own broker socket.
+The hub keeps ONE upstream feed per broker, reference-counts
+viewers per (broker, symbol), and fans each tick out to every registered
+FastAPI WebSocket on the event loop. The upstream token list follows that
+demand (see streaming/demand.py): first viewer subscribes, the last one
+leaving starts a linger timer.
+
+    feed thread(s) ──► ShardedFeed ────► _SymbolRelay ──► TickHub.publish
+                                                             │ AsyncDispatcher
+                                                             ▼
+                                      event loop: one bounded queue per viewer → send_json
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import WebSocket
+
+from src.minimalgotronifylicious.brokers.mixins.async_dispatch import AsyncDispatcher, CONFLATE, DROP_OLDEST
+from src.minimalgotronifylicious.brokers.mixins.observer_mixin import ObserverMixin
+from src.minimalgotronifylicious.streaming.demand import Feed, UpstreamDemand, feed_key
+from src.minimalgotronifylicious.utils.metrics import get_metrics
+
+log = logging.getLogger(__name__)
+
+Key = Tuple[str, str]  # (broker, EXCHANGE:TOKEN)
+
+# followers act on every print (fills), so their queue is deep and never conflates
+FOLLOW_QUEUE_MAXSIZE = int(os.getenv("FOLLOW_QUEUE_MAXSIZE", "10000"))
+
+
+def feed_socket(broker: str, ws_config: dict, index: int = 0):
+    """One broker socket wired into its own WebSocketManager (un-started)."""
+    from src.minimalgotronifylicious.brokers.websocket_client_factory import WebSocketClientFactory
+    from src.minimalgotronifylicious.brokers.angelone_websocket_event_handler import AngelOneWebSocketEventHandler
+    from src.minimalgotronifylicious.web_socket_manager import WebSocketManager
+
+    client = WebSocketClientFactory.create(broker, ws_config)
+    manager = WebSocketManager(client, retry_config=ws_config.get("retry"), correlation_id=f"feed_{index}",
+                               broker=broker)
+    handler = AngelOneWebSocketEventHandler(
+        correlation_id=ws_config.get("correlation_id", "sub_default"),
+        mode=ws_config.get("mode", "full"),
+        token_list=ws_config.get("subscriptions", []),
+        sws=getattr(client, "sws", None),
+        ws_manager=manager,
+    )
+    client.set_callbacks(
+        handler.on_data,
+        handler.on_open,
+        handler.on_close,
+        handler.on_error,
+        handler.on_control_message,
+    )
+    return manager
+
+
+def build_upstream(broker: str):
+    """
+    Default upstream factory: log in once and return a ShardedFeed that opens
+    broker sockets (each its own WebSocketManager) as tokens are placed on
+    them. The feed is returned un-started; the hub starts it.
+    """
+    from src.minimalgotronifylicious.config_loader.broker_config_loader import BrokerConfigLoader
+    from src.minimalgotronifylicious.sessions.session_registry import get_session_registry
+    from src.minimalgotronifylicious.streaming.sharded_feed import ShardedFeed
+    from src.minimalgotronifylicious.utils.broker_registry import load_registry
+
+    ws_config = BrokerConfigLoader().load_websocket_config()
+    if (load_registry().get(broker) or {}).get("needs_session", True):
+        ws_config["session"] = get_session_registry().session(broker)
+
+    feed = ShardedFeed(lambda i: feed_socket(broker, ws_config, i))
+    if ws_config.get("subscriptions"):
+        feed.subscribe(ws_config["subscriptions"], mode=ws_config.get("mode", 3))
+    return feed
+
+
+class _SymbolRelay:
+    """Observer registered on the upstream manager; forwards ticks for one key."""
+    __slots__ = ("hub", "key", "feed")
+
+    def __init__(self, hub: "TickHub", key: Key, feed: Feed):
+        self.hub = hub
+        self.key = key
+        self.feed = feed
+
+    def update(self, data):
+        self.hub.publish(self.key, data)
+
+
+class TickHub(ObserverMixin):
+    """
+    Viewers are observers keyed by (broker, symbol); the number of viewers
+    on a key is its reference count. The upstream only ever sees one relay
+    per key, no matter how many browser tabs are watching.
+    """
+
+    def __init__(self, upstream_factory: Optional[Callable[[str], Any]] = None):
+        super().__init__()
+        self._upstream_factory = upstream_factory or build_upstream
+        self._upstreams: Dict[str, Any] = {}
+        self._demand: Dict[str, UpstreamDemand] = {}
+        self._relays: Dict[Key, _SymbolRelay] = {}
+        self._lock = asyncio.Lock()
+        # dashboards only care about the latest price → conflate unless told otherwise
+        self.attach_dispatcher(AsyncDispatcher(
+            policy=os.getenv("TICK_QUEUE_POLICY", CONFLATE),
+            on_overflow=self._evict,
+        ))
+
+    # ---------- upstream ----------
+    async def _upstream(self, broker: str):
+        manager = self._upstreams.get(broker)
+        if manager is not None:
+            return manager
+        async with self._lock:
+            # someone else may have finished the login while we waited
+            manager = self._upstreams.get(broker)
+            if manager is None:
+                manager = await asyncio.to_thread(self._upstream_factory, broker)
+                # non-blocking: supervises (and re-establishes) the socket as a task on this loop
+                manager.start()
+                self._demand[broker] = UpstreamDemand(manager)
+                self._upstreams[broker] = manager
+                log.info("TickHub: upstream for %s started", broker)
+        return manager
+
+    # ---------- viewers ----------
+    async def subscribe(self, websocket: WebSocket, symbol: str, broker: str = "angel_one",
+                        policy: Optional[str] = None) -> None:
+        self.dispatcher.bind(asyncio.get_running_loop())
+        name, feed = feed_key(symbol)
+        key = (broker, name)
+        if websocket in self.observers.get(key, ()):
+            return  # a repeated subscribe must not touch the live queue
+        if policy:
+            self.dispatcher.configure(websocket, policy=policy)
+        manager = await self._upstream(broker)
+        first = key not in self.observers
+        if websocket in self.observers.get(key, ()):
+            return
+        self.add_observer(key, websocket)
+        if first:
+            relay = _SymbolRelay(self, key, feed)
+            self._relays[key] = relay
+            manager.register(name, relay)
+            self._demand[broker].acquire(feed)
+
+    async def unsubscribe(self, websocket: WebSocket, symbol: str, broker: str = "angel_one") -> None:
+        key = (broker, feed_key(symbol)[0])
+        self.remove_observer(key, websocket)
+        self._release_if_unwatched(key)
+
+    async def unsubscribe_all(self, websocket: WebSocket) -> None:
+        self._drop_viewer(websocket)
+
+    def _drop_viewer(self, websocket: WebSocket) -> None:
+        keys = [k for k, obs in self.observers.items() if websocket in obs]
+        self.remove_all_for_observer(websocket)
+        for key in keys:
+            self._release_if_unwatched(key)
+
+    def _release_if_unwatched(self, key: Key) -> None:
+        if key in self.observers:
+            return
+        relay = self._relays.pop(key, None)
+        manager = self._upstreams.get(key[0])
+        if relay is not None and manager is not None:
+            manager.unregister(key[1], relay)
+            self._demand[key[0]].release(relay.feed)
+
+    # ---------- in-process followers ----------
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """The app's event loop (startup hook), so follow() works before any viewer connects."""
+        self.dispatcher.bind(loop)
+
+    def follow(self, observer: Any, symbol: str, broker: str = "angel_one") -> bool:
+        """
+        Thread-safe subscribe for an observer with update() (the paper account):
+        ticks reach it on the loop, in order, sharing the upstream with viewers.
+        False when no loop is running to carry the feed.
+        """
+        return self._schedule(self._follow(observer, symbol, broker))
+
+    def unfollow(self, observer: Any, symbol: str, broker: str = "angel_one") -> bool:
+        return self._schedule(self.unsubscribe(observer, symbol, broker))
+
+    async def _follow(self, observer: Any, symbol: str, broker: str) -> None:
+        self.dispatcher.configure(observer, policy=DROP_OLDEST, maxsize=FOLLOW_QUEUE_MAXSIZE)
+        await self.subscribe(observer, symbol, broker)
+
+    def _schedule(self, coro) -> bool:
+        loop = self.dispatcher.loop
+        if loop is None or not loop.is_running():
+            coro.close()
+            return False
+        asyncio.run_coroutine_threadsafe(coro, loop).add_done_callback(self._report)
+        return True
+
+    @staticmethod
+    def _report(fut) -> None:
+        if not fut.cancelled() and fut.exception() is not None:
+            log.warning("TickHub: follow/unfollow failed: %s", fut.exception())
+
+    # ---------- fan-out ----------
+    def publish(self, key: Key, data) -> None:
+        """Called from the broker's feed thread; never blocks it."""
+        as_dict = getattr(data, "as_dict", None)
+        if as_dict is not None:  # decoded FeedTick → JSON-ready once, not per viewer
+            data = as_dict()
+        self.notify_observers(key, data)
+
+    def _evict(self, websocket: WebSocket) -> None:
+        """Queue overflowed (disconnect policy) or the send failed."""
+        log.info("TickHub: evicting slow or dead viewer %r", websocket)
+        self._drop_viewer(websocket)
+        close = getattr(websocket, "close", None)
+        if close is not None:
+            asyncio.ensure_future(self._close_quietly(close))
+
+    @staticmethod
+    async def _close_quietly(close) -> None:
+        try:
+            await close()
+        except Exception:
+            pass
+
+    def shutdown(self) -> None:
+        """Stop every upstream feed (process exit, benchmarks); viewers are left as they are."""
+        for manager in self._upstreams.values():
+            manager.stop()
+        self._upstreams.clear()
+        self._demand.clear()
+        self._relays.clear()
+
+    # ---------- introspection ----------
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "upstreams": sorted(self._upstreams),
+            "symbols": {f"{b}:{s}": len(obs) for (b, s), obs in self.observers.items()},
+            "queued": sum(self.dispatcher.depths().values()),
+            "upstream": {b: d.stats() for b, d in self._demand.items()},
+        }
+
+    def queue_depths(self) -> Dict[Tuple[str], int]:
+        """{(viewer,): queued messages}; call on the loop thread, which owns the queues."""
+        out = {}
+        for ws, depth in self.dispatcher.depths().items():
+            client = getattr(ws, "client", None)
+            name = f"{client.host}:{client.port}" if client is not None else f"{type(ws).__name__}@{id(ws):x}"
+            out[(name,)] = depth
+        return out
+
+
+@lru_cache(maxsize=1)
+def get_tick_hub() -> TickHub:
+    hub = TickHub()
+    get_metrics().queue_depth.set_function(hub.queue_depths)
+    return hub
@@ -0,0 +1,97 @@
+# src/minimalgotronifylicious/streaming/tick_store.py
+"""
+Latest price per symbol, fed by the streaming path.
+
+Writers (the feed thread) replace one dict entry per tick, which is atomic
+under the GIL, so readers never need a lock. Each symbol has a freshness
+bound; a tick older than that is treated as missing and the caller falls
+back to REST.
+
+Entries are keyed by (broker, EXCHANGE:TOKEN), the broker being the one whose
+stream wrote them, so one broker's prices are never served for another's.
+Only stream ticks are stored; callers translate trading symbols to feed keys
+(utils.symbols.SymbolMap) before looking up.
+"""
+from __future__ import annotations
+
+import os
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from src.minimalgotronifylicious.streaming.tick import Tick
+from src.minimalgotronifylicious.utils.symbols import normalize
+
+
+DEFAULT_BROKER = "angel_one"
+
+
+def _now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+def feed_broker(broker: str) -> str:
+    """The broker whose stream prices `broker`'s symbols: paper trades on a live feed."""
+    if broker == "paper_trade":
+        return os.getenv("PAPER_FEED_BROKER", DEFAULT_BROKER)
+    return broker
+
+
+def tick_price(data: Any) -> Optional[float]:
+    """Pull a rupee price out of a feed tick (Tick, dict from the SDK or our own)."""
+    if type(data) is Tick:
+        return data.ltp / 100.0
+    if isinstance(data, (int, float)):
+        return float(data)
+    if isinstance(data, dict):
+        if "ltp" in data:
+            return float(data["ltp"])
+        if "last_traded_price" in data:  # SmartWebSocketV2 sends paise
+            return data["last_traded_price"] / 100.0
+        return None
+    paise = getattr(data, "last_traded_price", None)  # FeedTick from the binary decoder
+    if paise is not None:
+        return paise / 100.0
+    return None
+
+
+class LastTickStore:
+    def __init__(self, max_age_ms: Optional[int] = None):
+        self.default_max_age_ms = max_age_ms if max_age_ms is not None else int(os.getenv("LTP_MAX_AGE_MS", "2000"))
+        self._ticks: Dict[Tuple[str, str], Tuple[float, int]] = {}  # (broker, symbol) -> (ltp, received_ms)
+        self._max_age: Dict[str, int] = {}
+
+    @staticmethod
+    def key(symbol: str) -> str:
+        return normalize(symbol)[2]
+
+    def set_max_age(self, symbol: str, max_age_ms: int) -> None:
+        """Illiquid contracts tick rarely; give them a looser bound."""
+        self._max_age[self.key(symbol)] = max_age_ms
+
+    def put(self, symbol: str, ltp: float, ts_ms: Optional[int] = None, broker: str = DEFAULT_BROKER) -> None:
+        self._ticks[(broker, self.key(symbol))] = (float(ltp), ts_ms or _now_ms())
+
+    def update(self, symbol: str, data: Any, broker: str = DEFAULT_BROKER) -> None:
+        """Feed-path entry point: ignores ticks without a price."""
+        px = tick_price(data)
+        if px is not None:
+            self.put(symbol, px, broker=broker)
+
+    def get(self, symbol: str, now_ms: Optional[int] = None,
+            broker: str = DEFAULT_BROKER) -> Optional[Tuple[float, int]]:
+        """(ltp, ts_ms) if `broker`'s last tick is within its freshness bound, else None."""
+        k = self.key(symbol)
+        hit = self._ticks.get((broker, k))
+        if hit is None:
+            return None
+        age = (now_ms or _now_ms()) - hit[1]
+        return hit if age <= self._max_age.get(k, self.default_max_age_ms) else None
+
+    def __len__(self) -> int:
+        return len(self._ticks)
+
+
+@lru_cache(maxsize=1)
+def get_tick_store() -> LastTickStore:
+    return LastTickStore()
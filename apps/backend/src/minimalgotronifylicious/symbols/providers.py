@@ -19,7 +19,7 @@ def nse_provider() -> List[Dict]:
         return _json(p)
     # seed list; replace after you wire your NSE loader
     return [
-        {"symbol": "NSE:SBIN-EQ", "label": "SBIN", "kind": "equity"},
+        {"symbol": "NSE:SBIN-EQ", "label": "SBIN", "kind": "equity", "token": "3045"},
         # options here only if you want; better to let UI filter by kind
         # {"symbol":"NFO:BANKNIFTY25SEP45000CE", "label":"BANKNIFTY 25-Sep 45000 CE", "kind":"option"},
     ]
@@ -54,5 +54,11 @@ def paper_provider() -> List[Dict]:
     # paper can aggregate a few to keep the picker useful
     return [
         {"symbol": "BINANCE:BTCUSDT", "label": "BTC/USDT", "kind": "crypto_spot"},
-        {"symbol": "NSE:SBIN-EQ", "label": "SBIN", "kind": "equity"},
+        {"symbol": "NSE:SBIN-EQ", "label": "SBIN", "kind": "equity", "token": "3045"},
     ]
+
+
+def sim_provider() -> List[Dict]:
+    # every simulated instrument, keyed EXCHANGE:TOKEN like the live feed
+    from src.minimalgotronifylicious.brokers.sim_market import get_market
+    return get_market().instruments()
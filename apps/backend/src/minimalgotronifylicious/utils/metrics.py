@@ -0,0 +1,280 @@
+# src/minimalgotronifylicious/utils/metrics.py
+"""
+Prometheus-style metrics, cheap enough to leave on for the tick path.
+
+Counters and histograms keep one row of cells per thread (thread-local),
+so recording is a dict lookup and two integer adds with no lock and no
+lost updates; only a scrape walks every thread's rows and sums them.
+Gauges are either set directly or computed by a callback at scrape time
+(queue depths, circuit state), which costs the hot path nothing.
+
+    feed thread ─ observe(v) ─► thread-local [bucket counts…, sum]  ─┐
+    loop thread ─ observe(v) ─► thread-local [bucket counts…, sum]  ─┼─ render() ─► GET /metrics
+    workers     ─ inc()      ─► thread-local {labels: n}            ─┘   (text format 0.0.4)
+"""
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 5e-3, 0.025)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(v: Any) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class _PerThread(_Metric):
+    """Cells live in a per-thread dict {labels: cells}; scrape merges them."""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._local = threading.local()
+        self._shards: List[Dict[Labels, Any]] = []
+        self._lock = threading.Lock()  # taken once per thread, on its first record
+
+    def _rows(self) -> Dict[Labels, Any]:
+        rows = getattr(self._local, "rows", None)
+        if rows is None:
+            rows = self._local.rows = {}
+            with self._lock:
+                self._shards.append(rows)
+        return rows
+
+    def _snapshot(self) -> List[Dict[Labels, Any]]:
+        with self._lock:
+            shards = list(self._shards)
+        return [dict(s) for s in shards]
+
+
+class Counter(_PerThread):
+    kind = "counter"
+
+    def inc(self, *labels: str, by: float = 1) -> None:
+        rows = self._rows()
+        rows[labels] = rows.get(labels, 0) + by
+
+    def values(self) -> Dict[Labels, float]:
+        out: Dict[Labels, float] = {}
+        for shard in self._snapshot():
+            for k, v in shard.items():
+                out[k] = out.get(k, 0) + v
+        return out
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for k, v in sorted(self.values().items()):
+            lines.append(f"{self.name}{_labels(self.label_names, k)} {_num(v)}")
+        return lines
+
+
+class Histogram(_PerThread):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        rows = self._rows()
+        cells = rows.get(labels)
+        if cells is None:
+            cells = rows[labels] = [0] * (len(self.buckets) + 1) + [0.0]  # buckets…, +Inf, sum
+        cells[bisect_left(self.buckets, value)] += 1
+        cells[-1] += value
+
+    def time(self, *labels: str) -> "_Timer":
+        return _Timer(self, labels)
+
+    def values(self) -> Dict[Labels, List[float]]:
+        out: Dict[Labels, List[float]] = {}
+        for shard in self._snapshot():
+            for k, cells in shard.items():
+                cells = list(cells)
+                acc = out.get(k)
+                out[k] = cells if acc is None else [a + b for a, b in zip(acc, cells)]
+        return out
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        bounds = ['le="%s"' % _num(b) for b in self.buckets] + ['le="+Inf"']
+        for k, cells in sorted(self.values().items()):
+            running = 0
+            for le, n in zip(bounds, cells[:-1]):
+                running += n
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, k, le)} {running}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, k)} {_num(cells[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, k)} {running}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("hist", "labels", "t0")
+
+    def __init__(self, hist: Histogram, labels: Labels):
+        self.hist = hist
+        self.labels = labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.t0, *self.labels)
+        return False
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Labels, float] = {}
+        self._fn: Optional[Callable[[], Dict[Labels, float]]] = None
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def set_function(self, fn: Optional[Callable[[], Dict[Labels, float]]]) -> None:
+        """fn() → {label values: value}, evaluated on every scrape."""
+        self._fn = fn
+
+    def values(self) -> Dict[Labels, float]:
+        out = dict(self._values)
+        if self._fn is not None:
+            out.update(self._fn())
+        return out
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for k, v in sorted(self.values().items()):
+            lines.append(f"{self.name}{_labels(self.label_names, k)} {_num(v)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _add(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labels))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception as e:  # one broken gauge callback must not blank the scrape
+                lines.append(f"# {metric.name} unavailable: {_escape(e)}")
+        return "\n".join(lines) + "\n"
+
+
+class Metrics:
+    """The process's instruments, created once (see get_metrics)."""
+
+    def __init__(self, registry: Optional[Registry] = None):
+        r = self.registry = registry or Registry()
+        self.http = r.histogram("http_request_duration_seconds",
+                                "HTTP request latency by route template.", ("method", "route", "status"))
+        self.broker_call = r.histogram("broker_call_duration_seconds",
+                                       "Broker REST call time by client method, queueing excluded.",
+                                       ("broker", "method", "outcome"))
+        self.broker_wait = r.histogram("broker_queue_wait_seconds",
+                                       "Time a broker call waited for a rate-limit token and a worker.",
+                                       ("broker", "lane"))
+        self.circuit = r.gauge("circuit_open", "1 while a circuit breaker is open.", ("breaker",))
+        self.frames = r.counter("feed_frames_total", "Binary frames received from the feed.", ("source",))
+        self.ticks = r.counter("feed_ticks_total", "Ticks streamed to observers.", ("socket",))
+        self.decode = r.histogram("feed_decode_seconds", "Binary frame decode time.", ("source",), FAST_BUCKETS)
+        self.dispatch = r.histogram("observer_dispatch_seconds",
+                                    "Feed-thread time to hand one tick to its observers.", ("path",), FAST_BUCKETS)
+        self.deliver = r.histogram("subscriber_deliver_seconds",
+                                   "Event-loop time to deliver one message to one subscriber.", (), FAST_BUCKETS)
+        self.queue_depth = r.gauge("subscriber_queue_depth", "Messages waiting per subscriber.", ("subscriber",))
+
+    def render(self) -> str:
+        return self.registry.render()
+
+
+@lru_cache(maxsize=1)
+def get_metrics() -> Metrics:
+    return Metrics()
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware (no BaseHTTPMiddleware task hop): times every HTTP
+    request and labels it with the matched route template, never the raw
+    path, so /api/ltp?symbol=... stays one series.
+    """
+
+    def __init__(self, app, metrics: Optional[Metrics] = None):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            (self.metrics or get_metrics()).http.observe(
+                time.perf_counter() - t0, scope.get("method", "GET"), template, str(status[0]))
@@ -1,4 +1,5 @@
 import os, socket, logging
+from functools import lru_cache
 import requests
 log = logging.getLogger(__name__)
 
@@ -7,10 +8,20 @@ def get_public_ip(cfg: dict | None = None) -> str:
     ip = os.getenv("PUBLIC_IP") or (cfg or {}).get("public_ip")
     if ip:
         return ip
+    return _lookup_public_ip()
 
+@lru_cache(maxsize=1)
+def _ipify() -> str:
+    # the address doesn't change under a running process; look it up once.
+    # A failure raises, and lru_cache does not keep exceptions: the next call retries
+    resp = requests.get("https://api.ipify.org", timeout=2)
+    resp.raise_for_status()
+    return resp.text.strip()
+
+def _lookup_public_ip() -> str:
     # 2) try external
     try:
-        return requests.get("https://api.ipify.org", timeout=2).text.strip()
+        return _ipify()
     except Exception as e:
         log.info("Public IP lookup failed, using local IP: %s", e)
 
@@ -1,3 +1,10 @@
+import logging
+from functools import lru_cache
+from typing import Dict, Iterable
+
+log = logging.getLogger(__name__)
+
+
 def normalize(raw: str, default_ex="NSE") -> tuple[str,str,str]:
     s = (raw or "").strip().upper()
     if ":" in s:
@@ -6,3 +13,50 @@ def normalize(raw: str, default_ex="NSE") -> tuple[str,str,str]:
     else:
         ex, token = default_ex, s
     return ex, token, f"{ex}:{token}"
+
+
+class SymbolMap:
+    """
+    Trading symbol ↔ feed key for one broker, built once from its symbol-provider rows.
+
+    Orders and positions are keyed by trading symbol (NSE:SBIN-EQ); the stream,
+    TickHub and the tick store by EXCHANGE:TOKEN (NSE:3045). A row carrying a
+    "token" ({"symbol": "NSE:SBIN-EQ", "token": "3045"}, or an Angel scrip-master
+    row {"symbol": "SBIN-EQ", "token": "3045", "exch_seg": "NSE"}) links the two.
+    Symbols without a token (Binance pairs, simulator keys) are their own feed key.
+    """
+
+    def __init__(self, rows: Iterable[Dict] = ()):
+        self._feed: Dict[str, str] = {}
+        self._name: Dict[str, str] = {}
+        for row in rows:
+            token = row.get("token")
+            if not token or not row.get("symbol"):
+                continue
+            ex, _, name = normalize(row["symbol"], row.get("exch_seg") or "NSE")
+            feed = f"{ex}:{str(token).strip().upper()}"
+            self._feed[name] = feed
+            self._name[feed] = name
+
+    def feed(self, symbol: str) -> str:
+        """'nse:sbin-eq' → 'NSE:3045'; feed keys and unknown symbols come back normalized."""
+        key = normalize(symbol)[2]
+        return self._feed.get(key, key)
+
+    def name(self, symbol: str) -> str:
+        """'NSE:3045' → 'NSE:SBIN-EQ'; trading symbols and unknown tokens come back normalized."""
+        key = normalize(symbol)[2]
+        return self._name.get(key, key)
+
+    def __len__(self) -> int:
+        return len(self._feed)
+
+
+@lru_cache(maxsize=8)
+def get_symbol_map(broker: str = "angel_one") -> SymbolMap:
+    from src.minimalgotronifylicious.utils.broker_registry import get_symbols_provider
+    try:
+        return SymbolMap(get_symbols_provider(broker)())
+    except Exception as e:
+        log.warning("No symbol map for %s (%s); symbols are used as feed keys", broker, e)
+        return SymbolMap()
@@ -0,0 +1,142 @@
+# src/minimalgotronifylicious/utils/tracing.py
+"""
+Tick-to-order latency traces.
+
+The feed thread stamps every frame it decodes (one thread-local store, no
+allocation per tick). When a strategy observer decides to trade, it opens
+a Trace that picks those stamps up, marks each later stage on the same
+monotonic clock and closes it with the broker's answer. Closed traces go
+into a ring buffer of the last TRACE_BUFFER orders.
+
+    socket._on_data ── frame(arrived, parsed) ─► thread-local (per feed thread)
+                                                        │
+    observer.update ── start(symbol) ─► Trace [frame, parse, observer]
+        build params ── mark("build")
+        placeOrder   ── mark("send") … mark("response") ── finish() ─► ring buffer ─► GET /traces
+
+Each stage's span is the time since the previous stamp, so the spans of
+one trace add up to its total. Observers only see frame stamps when they
+run on the feed thread, which is the case for WebSocketManager (it has no
+dispatcher); a trace started anywhere else begins at "observer".
+"""
+from __future__ import annotations
+
+import itertools
+import math
+import os
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+STAGES = ("frame", "parse", "observer", "build", "send", "response")
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values), math.ceil(q / 100 * len(sorted_values))) - 1)
+    return sorted_values[k]
+
+
+class Trace:
+    __slots__ = ("id", "symbol", "stamps", "outcome", "order_id", "started_at")
+
+    def __init__(self, trace_id: str, symbol: str, stamps: List[Tuple[str, float]]):
+        self.id = trace_id
+        self.symbol = symbol
+        self.stamps = stamps
+        self.outcome: Optional[str] = None
+        self.order_id: Optional[str] = None
+        self.started_at = time.time()
+
+    def mark(self, stage: str) -> None:
+        self.stamps.append((stage, time.perf_counter()))
+
+    def spans_ms(self) -> Dict[str, float]:
+        """{stage: ms since the previous stamp} plus "total"."""
+        out = {}
+        for (_, prev), (stage, t) in zip(self.stamps, self.stamps[1:]):
+            out[stage] = (t - prev) * 1000
+        if len(self.stamps) > 1:
+            out["total"] = (self.stamps[-1][1] - self.stamps[0][1]) * 1000
+        return out
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "symbol": self.symbol,
+            "started_at": self.started_at,
+            "outcome": self.outcome,
+            "order_id": self.order_id,
+            "stages": [s for s, _ in self.stamps],
+            "spans_ms": {k: round(v, 3) for k, v in self.spans_ms().items()},
+        }
+
+
+class Tracer:
+    def __init__(self, size: Optional[int] = None):
+        size = size if size is not None else int(os.getenv("TRACE_BUFFER", "1000"))
+        self._local = threading.local()
+        self._done: deque = deque(maxlen=size)
+        self._ids = itertools.count(1)
+        self._prefix = f"{os.getpid():x}"
+
+    # ---------- feed side (per frame) ----------
+    def frame(self, arrived: float, parsed: Optional[float] = None) -> None:
+        """Called by the socket as each frame is decoded, before its ticks go out."""
+        self._local.frame = (arrived, parsed)
+
+    # ---------- strategy side (per order) ----------
+    def start(self, symbol: str = "") -> Trace:
+        now = time.perf_counter()
+        stamps: List[Tuple[str, float]] = []
+        frame = getattr(self._local, "frame", None)
+        if frame is not None:
+            arrived, parsed = frame
+            stamps.append(("frame", arrived))
+            if parsed is not None:
+                stamps.append(("parse", parsed))
+        stamps.append(("observer", now))
+        # short and alphanumeric, so it also fits the broker's order tag
+        return Trace(f"{self._prefix}t{next(self._ids)}", symbol, stamps)
+
+    def finish(self, trace: Trace, outcome: str = "ok", order_id: Optional[str] = None) -> None:
+        if trace.stamps[-1][0] != "response":
+            trace.mark("response")
+        trace.outcome = outcome
+        trace.order_id = order_id
+        self._done.append(trace)
+
+    # ---------- queries ----------
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        traces = list(self._done)[-limit:] if limit > 0 else []
+        return [t.as_dict() for t in reversed(traces)]
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-stage count and p50/p95/p99/max in ms over the buffered traces."""
+        per_stage: Dict[str, List[float]] = {}
+        traces = list(self._done)
+        for t in traces:
+            for stage, ms in t.spans_ms().items():
+                per_stage.setdefault(stage, []).append(ms)
+        out = {}
+        for stage in (*STAGES, "total"):
+            values = sorted(per_stage.get(stage, ()))
+            if not values:
+                continue
+            out[stage] = {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50), 3),
+                "p95_ms": round(percentile(values, 95), 3),
+                "p99_ms": round(percentile(values, 99), 3),
+                "max_ms": round(values[-1], 3),
+            }
+        return {"traces": len(traces), "capacity": self._done.maxlen, "stages": out}
+
+
+@lru_cache(maxsize=1)
+def get_tracer() -> Tracer:
+    return Tracer()
@@ -1,66 +1,198 @@
-import time
+"""
+Supervises one upstream feed socket on asyncio.
+
+    start() ──► run() task ──► link thread: client.connect ──┐
+                   ▲                                          │ on_close / on_error
+                   │  full-jitter backoff                     ▼
+                   └──── old link thread gone ◄──────── connection_lost()  (immediate, no polling)
+
+The broker SDKs connect() synchronously (SmartWebSocketV2 blocks for the
+socket's lifetime), so each attempt runs on a dedicated link thread of its
+own, never on the loop's default executor (one manager per shard would pin
+an executor thread each). Before reconnecting, the manager closes the socket
+and waits for the previous link thread to return, so two connects never
+overlap. The manager owns the subscription set: subscribe() records it, and
+connection_opened() replays exactly that set on every (re)connect.
+
+Liveness is a WebSocket ping every heartbeat_interval carrying its send
+time; the pong gives the round trip, and no pong within ping_timeout drops
+the socket. The same tick re-subscribes only the tokens FeedHealth reports
+stale, instead of re-sending the whole token list.
+"""
+import asyncio
+import os
+import random
 import threading
+import time
 import logging
+from typing import Any, Dict, List, Optional
+
 from src.minimalgotronifylicious.brokers.base_websocket_client import BaseWebSocketClient
 from src.minimalgotronifylicious.brokers.mixins.observer_mixin import ObserverMixin
+from src.minimalgotronifylicious.streaming.feed_health import FeedHealth, get_feed_health
+from src.minimalgotronifylicious.streaming.tick import EXCHANGES, Tick
+from src.minimalgotronifylicious.streaming.tick_store import get_tick_store
+from src.minimalgotronifylicious.utils.metrics import get_metrics
 from fastapi import WebSocket
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SNAP_QUOTE = 3  # SmartAPI mode; the binary decoder handles modes 1–3
+
+# how long to wait for a link thread to leave connect() after closing its socket, per try
+LINK_JOIN_S = float(os.getenv("FEED_LINK_JOIN_S", "5"))
+
+DEFAULT_RETRY = {
+    "delay": 0.25,      # first retry lands within 250 ms
+    "multiplier": 2,
+    "max_delay": 30,
+}
+
+
 class WebSocketManager(ObserverMixin):
-    def __init__(self, client: BaseWebSocketClient, retry_config=None, heartbeat_interval=15):
+    def __init__(self, client: BaseWebSocketClient, retry_config=None, heartbeat_interval=None,
+                 correlation_id: str = "ws_manager", ping_timeout=None, health: Optional[FeedHealth] = None,
+                 broker: str = "angel_one"):
         super().__init__()  # initialize ObserverMixin
         self.ws_client = client
-        self.retry_config = retry_config or {
-            "max_attempt": 5,
-            "strategy": 2,
-            "delay": 1,
-            "multiplier": 2,
-            "duration": 60
-        }
-        self.heartbeat_interval = heartbeat_interval
+        self.retry_config = {**DEFAULT_RETRY, **(retry_config or {})}
+        self.heartbeat_interval = (heartbeat_interval if heartbeat_interval is not None
+                                   else float(os.getenv("FEED_PING_S", "10")))
+        self.ping_timeout = ping_timeout if ping_timeout is not None else float(os.getenv("FEED_PING_TIMEOUT_S", "5"))
+        self.correlation_id = correlation_id
+        self.broker = broker  # tick-store scope for what this stream writes
+        self.health = health or get_feed_health()
+        self.rtt_ms: Optional[float] = None
+        self._pong: Optional[asyncio.Event] = None
+        self._ping_sent = 0
+        self._can_ping = callable(getattr(client, "ping", None))
+        set_pong = getattr(client, "set_pong_callback", None)
+        if callable(set_pong):
+            set_pong(self.pong_received)
         self._stop_flag = threading.Event()
-        self._watchdog_thread = threading.Thread(target=self._watchdog_loop, daemon=True)
+        self._connected = False
+        self._opened = False  # an open event arrived during the current attempt
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lost: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._link_thread: Optional[threading.Thread] = None
+        # {mode: {exchangeType: {token: None}}} — dicts keep subscription order
+        self._subscriptions: Dict[Any, Dict[int, Dict[str, None]]] = {}
+        self._subs_lock = threading.Lock()
+        self.reconnects = 0
+        self._ticks = get_metrics().ticks
 
+    # ---------- lifecycle ----------
     def start(self):
+        """
+        Never blocks. Inside a running loop (e.g. a FastAPI handler) the
+        supervisor becomes a task on it; otherwise it gets its own loop thread.
+        """
         logger.info("Starting WebSocket client...")
-        self._connect_with_retry()
-        self._watchdog_thread.start()
+        self._stop_flag.clear()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            threading.Thread(target=asyncio.run, args=(self.run(),), name="ws-manager", daemon=True).start()
+        else:
+            loop.create_task(self.run())
 
-    def _connect_with_retry(self):
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._lost = asyncio.Event()
+        self._task = asyncio.current_task()
+        liveness = asyncio.ensure_future(self._liveness())
         attempt = 0
-        delay = self.retry_config["delay"]
-        start_time = time.time()
+        try:
+            while not self._stop_flag.is_set():
+                self._lost.clear()
+                self._opened = False
+                link = self._start_link()
+                lost = asyncio.ensure_future(self._lost.wait())
+                try:
+                    done, _ = await asyncio.wait({link, lost}, return_when=asyncio.FIRST_COMPLETED)
+                    if link in done and link.exception() is None and link.result():
+                        await lost  # connect() returned with the socket up: wait for its close event
+                finally:
+                    lost.cancel()
+                self._connected = False
+                if self._stop_flag.is_set():
+                    break
+                # close/error may arrive while the link thread is still inside connect()
+                await self._retire(link)
+                if link.exception() is not None:
+                    logger.warning(f"Connection attempt failed: {link.exception()}")
 
-        while attempt < self.retry_config["max_attempt"]:
-            try:
-                logger.info(f"Connecting (Attempt {attempt + 1})...")
-                self.ws_client.connect()
-                logger.info("WebSocket connection established.")
+                attempt = 0 if self._opened else attempt + 1
+                cap = min(self.retry_config["max_delay"],
+                          self.retry_config["delay"] * self.retry_config["multiplier"] ** attempt)
+                delay = random.uniform(0, cap)  # full jitter spreads out reconnect storms
+                self.reconnects += 1
+                logger.warning(f"WebSocket down; reconnecting in {delay:.2f}s (attempt {attempt + 1})")
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            liveness.cancel()
+            self._connected = False
+
+    def _start_link(self) -> asyncio.Future:
+        """Run _link on a new dedicated thread; the future resolves on the loop when it returns."""
+        loop = asyncio.get_running_loop()
+        link = loop.create_future()
+
+        def settle(result, error):
+            if link.done():
                 return
-            except Exception as e:
-                logger.warning(f"Connection attempt {attempt + 1} failed: {e}")
-                attempt += 1
-                time.sleep(delay)
-                if self.retry_config["strategy"] == 2:
-                    delay *= self.retry_config["multiplier"]
-                if time.time() - start_time > self.retry_config["duration"]:
-                    logger.error("Retry duration exceeded. Giving up.")
-                    break
+            if error is not None:
+                link.set_exception(error)
+            else:
+                link.set_result(result)
 
-    def _watchdog_loop(self):
-        while not self._stop_flag.is_set():
+        def target():
             try:
-                if not self.ws_client or not self.ws_client.is_connected():
-                    logger.warning("WebSocket disconnected. Reconnecting...")
-                    self._connect_with_retry()
+                result, error = self._link(), None
             except Exception as e:
-                logger.error(f"Watchdog check failed: {e}")
-            time.sleep(self.heartbeat_interval)
+                result, error = None, e
+            try:
+                loop.call_soon_threadsafe(settle, result, error)
+            except RuntimeError:  # loop already closed: the manager was stopped
+                pass
+
+        self._link_thread = threading.Thread(target=target, name=f"ws-link-{self.correlation_id}", daemon=True)
+        self._link_thread.start()
+        return link
+
+    async def _retire(self, link: asyncio.Future) -> None:
+        """Close the socket until the link thread leaves connect(); a new attempt starts only after."""
+        while not link.done():
+            await asyncio.to_thread(self._drop)
+            done, _ = await asyncio.wait({link}, timeout=LINK_JOIN_S)
+            if not done:
+                logger.warning(f"{self._link_thread.name} still in connect() {LINK_JOIN_S}s after close; closing again")
+
+    def _link(self) -> bool:
+        """Link thread: returns once connect() does; True if the socket is up after it."""
+        logger.info("Connecting...")
+        self.ws_client.connect()
+        if self.ws_client.is_connected():
+            if not self._opened:  # client without open events
+                self.connection_opened()
+            return True
+        return False
+
+    def _drop(self):
+        try:
+            self.ws_client.disconnect()
+        except Exception as e:
+            logger.warning(f"Error while disconnecting: {e}")
 
     def stop(self):
         self._stop_flag.set()
+        loop, task = self._loop, self._task
+        if loop is not None and task is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(task.cancel)
         if self.ws_client:
             try:
                 self.ws_client.disconnect()
@@ -68,15 +200,146 @@ class WebSocketManager(ObserverMixin):
             except Exception as e:
                 logger.warning(f"Error while disconnecting: {e}")
 
-    def subscribe(self, instruments):
-        if self.ws_client and self.ws_client.is_connected():
-            self.ws_client.subscribe(instruments)
-        else:
-            logger.warning("Cannot subscribe. WebSocket not connected.")
+    # ---------- liveness ----------
+    async def _liveness(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if not self._connected:
+                continue
+            if self._can_ping and not await self._ping():
+                self.connection_lost(f"no pong within {self.ping_timeout}s")
+                await asyncio.to_thread(self._drop)
+                continue
+            await asyncio.to_thread(self._resubscribe_stale)
+
+    async def _ping(self) -> bool:
+        self._pong = asyncio.Event()
+        self._ping_sent = time.monotonic_ns()
+        try:
+            await asyncio.to_thread(self.ws_client.ping, str(self._ping_sent))
+            await asyncio.wait_for(self._pong.wait(), self.ping_timeout)
+        except asyncio.TimeoutError:
+            return False
+        except Exception as e:
+            logger.warning(f"ping failed: {e}")
+            return False
+        return True
+
+    def pong_received(self, data=None):
+        """Feed thread. The payload is the ping's send time; anything else counts as a pong for the last ping."""
+        now = time.monotonic_ns()
+        try:
+            sent = int(data.decode() if isinstance(data, (bytes, bytearray)) else data)
+        except (TypeError, ValueError):
+            sent = self._ping_sent
+        if sent:
+            self.rtt_ms = (now - sent) / 1e6
+            self.health.report_socket(self.correlation_id, rtt_ms=round(self.rtt_ms, 2), last_pong=time.time())
+        loop, pong = self._loop, self._pong
+        if loop is not None and pong is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(pong.set)
+
+    def _resubscribe_stale(self):
+        feeds = self._feeds()
+        stale = self.health.stale(feeds)
+        if not stale:
+            return
+        by_mode: Dict[Any, Dict[int, List[str]]] = {}
+        for name in stale:
+            mode, code, token = feeds[name]
+            by_mode.setdefault(mode, {}).setdefault(code, []).append(token)
+        logger.info(f"Re-subscribing {len(stale)} stale symbol(s): {stale[:10]}")
+        for mode, by_code in by_mode.items():
+            self._send("subscribe", mode, [{"exchangeType": c, "tokens": t} for c, t in by_code.items()])
+        self.health.resubscribed(stale)
+
+    def _feeds(self) -> Dict[str, tuple]:
+        """EXCHANGE:TOKEN → (mode, exchangeType, token) for everything subscribed."""
+        with self._subs_lock:
+            return {f"{EXCHANGES.get(code, code)}:{token}": (mode, code, token)
+                    for mode, by_ex in self._subscriptions.items()
+                    for code, tokens in by_ex.items() for token in tokens}
+
+    # ---------- socket events (feed thread) ----------
+    def connection_opened(self):
+        logger.info("WebSocket connection established.")
+        self._connected = True
+        self._opened = True
+        self.health.report_socket(self.correlation_id, connected=True)
+        self._replay()
+
+    def connection_lost(self, reason=None):
+        if reason is not None:
+            logger.warning(f"WebSocket lost: {reason}")
+        self._connected = False
+        self.health.report_socket(self.correlation_id, connected=False)
+        loop, lost = self._loop, self._lost
+        if loop is not None and lost is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(lost.set)
 
     def is_connected(self):
-        return self.ws_client and self.ws_client.is_connected()
+        return self._connected
+
+    # ---------- subscriptions ----------
+    def subscribe(self, token_list: List[dict], mode=SNAP_QUOTE):
+        """
+        token_list is SmartAPI's shape: [{"exchangeType": 1, "tokens": ["3045"]}].
+        Recorded for replay; sent now only if the socket is up.
+        """
+        added = []
+        with self._subs_lock:
+            by_ex = self._subscriptions.setdefault(mode, {})
+            for entry in token_list:
+                tokens = by_ex.setdefault(entry["exchangeType"], {})
+                new = [str(t) for t in entry["tokens"] if str(t) not in tokens]
+                tokens.update(dict.fromkeys(new))
+                if new:
+                    added.append({"exchangeType": entry["exchangeType"], "tokens": new})
+        self.health.watch(f"{EXCHANGES.get(e['exchangeType'], e['exchangeType'])}:{t}"
+                          for e in added for t in e["tokens"])
+        if added and self._connected:
+            self._send("subscribe", mode, added)
+
+    def unsubscribe(self, token_list: List[dict], mode=SNAP_QUOTE):
+        removed = []
+        with self._subs_lock:
+            by_ex = self._subscriptions.get(mode, {})
+            for entry in token_list:
+                tokens = by_ex.get(entry["exchangeType"], {})
+                gone = [str(t) for t in entry["tokens"] if str(t) in tokens]
+                for t in gone:
+                    del tokens[t]
+                if not tokens:
+                    by_ex.pop(entry["exchangeType"], None)
+                if gone:
+                    removed.append({"exchangeType": entry["exchangeType"], "tokens": gone})
+            if not by_ex:
+                self._subscriptions.pop(mode, None)
+        self.health.forget(f"{EXCHANGES.get(e['exchangeType'], e['exchangeType'])}:{t}"
+                           for e in removed for t in e["tokens"])
+        if removed and self._connected:
+            if callable(getattr(self.ws_client, "unsubscribe", None)):
+                self._send("unsubscribe", mode, removed)
+            else:
+                # dropped from the replay list, but the broker keeps streaming them until the next reconnect
+                logger.warning(f"{type(self.ws_client).__name__} cannot unsubscribe; still streaming {removed}")
+
+    def subscriptions(self) -> Dict[Any, List[dict]]:
+        with self._subs_lock:
+            return {mode: [{"exchangeType": ex, "tokens": list(tokens)} for ex, tokens in by_ex.items()]
+                    for mode, by_ex in self._subscriptions.items()}
+
+    def _replay(self):
+        for mode, token_list in self.subscriptions().items():
+            self._send("subscribe", mode, token_list)
+
+    def _send(self, action: str, mode, token_list: List[dict]):
+        try:
+            getattr(self.ws_client, action)(self.correlation_id, mode, token_list)
+        except Exception as e:
+            logger.warning(f"{action} failed: {e}")
 
+    # ---------- observers ----------
     def register(self, symbol, websocket: WebSocket):
         self.add_observer(symbol, websocket)
 
@@ -87,7 +350,13 @@ class WebSocketManager(ObserverMixin):
         self.remove_all_for_observer(websocket)
 
     def stream_tick(self, symbol, data):
-        self.notify_observers(symbol, data)
+        # parse once; every store and observer downstream shares this Tick
+        tick = Tick.coerce(data)
+        self.health.touch(symbol)
+        self._ticks.inc(self.correlation_id)
+        # keep /api/ltp warm for every subscribed symbol, watched or not
+        get_tick_store().update(symbol, tick, broker=self.broker)
+        self.notify_observers(symbol, tick)
 
 
 """ HOW TO USE IT
@@ -99,6 +368,7 @@ auth_data = {...}
 client = WebSocketClientFactory.create("angel_one", auth_data)
 
 manager = WebSocketManager(client)
-manager.start()
+manager.subscribe([{"exchangeType": 1, "tokens": ["3045"]}])
+manager.start()   # returns at once; reconnects and resubscribes on its own
 
 """
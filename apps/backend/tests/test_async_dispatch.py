@@ -0,0 +1,55 @@
+import asyncio
+import threading
+
+from src.minimalgotronifylicious.brokers.mixins.async_dispatch import (
+    AsyncDispatcher, SubscriberQueue, CONFLATE, DISCONNECT, DROP_OLDEST,
+)
+from src.minimalgotronifylicious.brokers.mixins.observer_mixin import ObserverMixin
+
+
+class Recorder:
+    def __init__(self):
+        self.seen = []
+
+    async def update(self, data):
+        self.seen.append(data)
+
+
+def test_queue_policies():
+    async def scenario():
+        obs = object()
+        q = SubscriberQueue(obs, maxsize=2, policy=DROP_OLDEST)
+        for i in range(4):
+            q.offer("A", i)
+        assert list(q._items) == [2, 3] and q.dropped == 2
+
+        q = SubscriberQueue(obs, maxsize=2, policy=CONFLATE)
+        for sym, px in (("A", 1), ("B", 1), ("A", 2), ("C", 1)):
+            q.offer(sym, px)
+        assert list(q._items.items()) == [("B", 1), ("C", 1)]  # A conflated to 2, then evicted as oldest
+
+        kicked = []
+        q = SubscriberQueue(obs, maxsize=1, policy=DISCONNECT, on_overflow=kicked.append)
+        assert q.offer("A", 1) and not q.offer("A", 2)
+        assert kicked == [obs] and q.closed
+
+    asyncio.run(scenario())
+
+
+def test_notify_from_feed_thread_awaits_coroutine_observers():
+    async def scenario():
+        mixin = ObserverMixin()
+        mixin.attach_dispatcher(AsyncDispatcher(loop=asyncio.get_running_loop(), maxsize=8))
+        fast, slow = Recorder(), Recorder()
+        mixin.add_observer("A", fast)
+        mixin.add_observer("A", slow)
+
+        t = threading.Thread(target=lambda: [mixin.notify_observers("A", i) for i in range(3)])
+        t.start(); t.join()
+        await asyncio.sleep(0.01)
+        assert fast.seen == slow.seen == [0, 1, 2]
+
+        mixin.remove_all_for_observer(slow)
+        assert slow not in mixin.dispatcher.depths()
+
+    asyncio.run(scenario())
@@ -0,0 +1,103 @@
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.minimalgotronifylicious.brokers.request_scheduler import ORDER, RequestScheduler, ScheduledClient
+from src.minimalgotronifylicious.orders.idempotency import IdempotencyStore
+from src.minimalgotronifylicious.routers import trading
+
+
+class Broker:
+    def __init__(self, reject=()):
+        self.reject = set(reject)
+        self.sent = []
+        self.active = self.peak = 0
+        self.lock = threading.Lock()
+
+    def place_order(self, symbol, qty, side="BUY", type="MARKET", price=None):
+        with self.lock:
+            self.sent.append(symbol)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        if symbol in self.reject:
+            return {"status": "error", "error": "insufficient margin"}
+        return {"status": "success", "orderid": f"id-{symbol}"}
+
+
+def _client(monkeypatch, tmp_path, broker):
+    store = IdempotencyStore(str(tmp_path / "idem.db"))
+    monkeypatch.setattr(trading, "get_idempotency_store", lambda: store)
+    app = FastAPI()
+    app.include_router(trading.router)
+    app.dependency_overrides[trading.client_dep] = lambda: broker
+    return TestClient(app)
+
+
+def _legs(*symbols, **extra):
+    return [{"symbol": s, "qty": 1, **extra} for s in symbols]
+
+
+def test_parallel_legs_are_paced_by_the_scheduler_and_replayed(monkeypatch, tmp_path):
+    broker = Broker(reject={"NSE:B"})
+    sched = RequestScheduler(limits={"fake": {ORDER: (1000, 1000)}}, workers=4)
+    client = _client(monkeypatch, tmp_path, ScheduledClient("fake", broker, sched))
+
+    body = {"legs": _legs("NSE:A", "NSE:B", "NSE:C", "NSE:D")}
+    res = client.post("/api/orders/batch", json=body, headers={"X-Request-Id": "r1"})
+    out = res.json()
+    assert res.status_code == 200 and out["status"] == "PARTIAL"
+    assert [leg["status"] for leg in out["legs"]] == ["ACCEPTED", "REJECTED", "ACCEPTED", "ACCEPTED"]
+    assert out["legs"][0]["orderId"] == "id-NSE:A" and out["legs"][1]["message"] == "insufficient margin"
+    assert broker.peak > 1  # sent concurrently
+
+    again = client.post("/api/orders/batch", json=body, headers={"X-Request-Id": "r1"})
+    assert again.json() == out and len(broker.sent) == 4
+
+
+def test_sequential_mode_cancels_the_rest_after_a_failed_leg(monkeypatch, tmp_path):
+    broker = Broker(reject={"NSE:B"})
+    client = _client(monkeypatch, tmp_path, broker)
+    body = {"legs": _legs("NSE:A", "NSE:B", "NSE:C", "NSE:D"), "mode": "sequential"}
+    out = client.post("/api/orders/batch", json=body, headers={"X-Request-Id": "r2"}).json()
+    assert [leg["status"] for leg in out["legs"]] == ["ACCEPTED", "REJECTED", "CANCELLED", "CANCELLED"]
+    assert broker.sent == ["NSE:A", "NSE:B"]
+
+
+def test_invalid_leg_rejects_the_whole_batch_before_sending(monkeypatch, tmp_path):
+    broker = Broker()
+    client = _client(monkeypatch, tmp_path, broker)
+    legs = _legs("NSE:A") + _legs("NSE:B", type="LIMIT")
+    res = client.post("/api/orders/batch", json={"legs": legs}, headers={"X-Request-Id": "r3"})
+    assert res.status_code == 422 and res.json()["detail"] == [{"index": 1, "error": "LIMIT leg needs a positive price"}]
+    assert broker.sent == []
+
+
+def test_a_leg_without_an_answer_is_unknown_not_failed(monkeypatch, tmp_path):
+    release = threading.Event()
+
+    class SlowBroker(Broker):
+        def place_order(self, symbol, qty, **_):
+            self.sent.append(symbol)
+            release.wait(2)  # the broker is working on it; we stop waiting first
+            return {"status": "success", "orderid": f"id-{symbol}"}
+
+    broker = SlowBroker()
+    sched = RequestScheduler(limits={"fake": {ORDER: (1000, 1000)}}, workers=1)
+    client = _client(monkeypatch, tmp_path, ScheduledClient("fake", broker, sched))
+    monkeypatch.setattr(trading, "BATCH_LEG_TIMEOUT_S", 0.1)
+    monkeypatch.setattr(trading, "circuit", trading.Circuit(threshold=1))
+
+    out = client.post("/api/orders/batch", json={"legs": _legs("NSE:A", "NSE:B")},
+                      headers={"X-Request-Id": "r4"}).json()
+    release.set()
+    # A is in flight and may yet be placed; B never left the queue
+    assert [leg["status"] for leg in out["legs"]] == ["UNKNOWN", "CANCELLED"]
+    assert "order book" in out["legs"][0]["message"] and out["status"] == "PARTIAL"
+    assert not trading.circuit.open()
+    time.sleep(0.1)
+    assert broker.sent == ["NSE:A"]  # the cancelled leg is dropped, not sent late
@@ -0,0 +1,64 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI, WebSocket
+
+from src.minimalgotronifylicious.bin.bench_api import AsgiWebSocket, compare, percentile, run_http
+
+
+def _app():
+    app = FastAPI()
+
+    @app.get("/ok")
+    async def ok():
+        return {"ok": True}
+
+    @app.websocket("/echo")
+    async def echo(ws: WebSocket):
+        await ws.accept()
+        data = await ws.receive_json()
+        await ws.send_json({"echo": data, "exchange_ts": 0})
+        await ws.close()
+
+    return app
+
+
+def test_percentile_is_nearest_rank():
+    xs = [float(i) for i in range(1, 101)]
+    assert percentile(xs, 50) == 50.0 and percentile(xs, 99) == 99.0 and percentile([], 95) == 0.0
+
+
+def test_run_http_counts_every_request_across_workers():
+    app = _app()
+
+    async def go():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as c:
+            async def send(i):
+                return (await c.get("/ok")).status_code == 200
+            return await run_http(send, concurrency=8, total=50)
+
+    stats = asyncio.run(go())
+    assert stats["requests"] == 50 and stats["errors"] == 0
+    assert 0 < stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+
+
+def test_asgi_websocket_drives_an_endpoint_in_process():
+    async def go():
+        ws = AsgiWebSocket(_app(), "/echo")
+        await ws.connect()
+        await ws.send_json({"action": "subscribe"})
+        msg = await ws.receive_json(2)
+        await ws.close()
+        return msg
+
+    assert asyncio.run(go())["echo"] == {"action": "subscribe"}
+
+
+def test_compare_flags_throughput_latency_and_error_regressions():
+    base = {"results": {"ltp": {"4": {"rps": 1000, "p95_ms": 10.0, "errors": 0}}}}
+    same = {"results": {"ltp": {"4": {"rps": 900, "p95_ms": 12.0, "errors": 0}}}}
+    worse = {"results": {"ltp": {"4": {"rps": 600, "p95_ms": 20.0, "errors": 3}},
+                         "order": {"4": {"rps": 1, "p95_ms": 1.0, "errors": 0}}}}
+    assert compare(same, base, 0.25) == []
+    found = compare(worse, base, 0.25)
+    assert len(found) == 3 and all(line.startswith("ltp @ c=4") for line in found)
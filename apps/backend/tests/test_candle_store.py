@@ -0,0 +1,81 @@
+from src.minimalgotronifylicious.candles.store import CandleStore, rows
+
+MIN = 60_000
+
+
+class FakeBroker:
+    """One bar per minute, close = minute index; the newest bar keeps changing."""
+
+    def __init__(self):
+        self.calls = []
+        self.revision = 0
+
+    def __call__(self, token, interval, from_ms, to_ms, exchange):
+        self.calls.append((from_ms, to_ms))
+        out = []
+        for ts in range(from_ms - from_ms % MIN, to_ms + 1, MIN):
+            c = ts // MIN + (self.revision if ts == to_ms - to_ms % MIN else 0)
+            out.append([ts, c, c, c, c, 10])
+        return out
+
+
+def test_repeated_loads_never_refetch(tmp_path):
+    broker = FakeBroker()
+    store = CandleStore(root=str(tmp_path), fetch=broker)
+
+    bars, fetched = store.get("NSE:3045", "ONE_MINUTE", 100 * MIN, 200 * MIN)
+    assert fetched == 101 and len(bars) == 101
+    bars, fetched = store.get("NSE:3045", "one_minute", 120 * MIN, 180 * MIN)
+    assert fetched == 0 and [b[0] for b in rows(bars)][:2] == [120 * MIN, 121 * MIN]
+    assert len(broker.calls) == 1
+
+
+def test_only_missing_head_and_tail_are_fetched(tmp_path):
+    broker = FakeBroker()
+    store = CandleStore(root=str(tmp_path), fetch=broker)
+    store.get("3045", "ONE_MINUTE", 100 * MIN, 200 * MIN)
+
+    broker.revision = 1000  # the last bar was still forming
+    bars, _ = store.get("3045", "ONE_MINUTE", 100 * MIN, 260 * MIN)
+    assert broker.calls[-1] == (200 * MIN, 260 * MIN)  # resumes at the last stored bar
+    assert len(bars) == 161 and bars["close"][-1] == 260 + 1000
+
+    bars, fetched = store.get("3045", "ONE_MINUTE", 50 * MIN, 260 * MIN, limit=5)
+    assert broker.calls[-1] == (50 * MIN, 100 * MIN)
+    assert fetched == 51 and len(bars) == 5
+    all_bars = store.load("NSE:3045", "ONE_MINUTE")
+    assert len(all_bars) == 211 and (all_bars["ts"][1:] > all_bars["ts"][:-1]).all()
+
+
+class LiveBroker(FakeBroker):
+    """Only bars up to `now` exist yet."""
+
+    def __init__(self, now):
+        super().__init__()
+        self.now = now
+
+    def __call__(self, token, interval, from_ms, to_ms, exchange):
+        return super().__call__(token, interval, from_ms, min(to_ms, self.now), exchange)
+
+
+def test_coverage_stops_at_now_so_future_bars_are_fetched_once_they_exist(tmp_path):
+    clock = [1_000 * MIN]
+    broker = LiveBroker(clock[0])
+    store = CandleStore(root=str(tmp_path), fetch=broker, clock=lambda: clock[0])
+
+    bars, _ = store.get("3045", "ONE_MINUTE", 900 * MIN, 1_060 * MIN)  # asks an hour ahead
+    assert bars["ts"][-1] == 1_000 * MIN
+
+    clock[0] = broker.now = 1_030 * MIN
+    bars, fetched = store.get("3045", "ONE_MINUTE", 900 * MIN, 1_030 * MIN)
+    assert len(broker.calls) == 2 and fetched == 31 and bars["ts"][-1] == 1_030 * MIN
+
+
+def test_long_backfills_are_split_into_ranges_the_broker_accepts(tmp_path):
+    day = 24 * 60 * MIN
+    broker = FakeBroker()
+    store = CandleStore(root=str(tmp_path), fetch=broker, clock=lambda: 100 * day)
+
+    bars, _ = store.get("3045", "ONE_MINUTE", 40 * day, 85 * day)
+    assert len(broker.calls) == 2 and all(to - frm <= 30 * day for frm, to in broker.calls)
+    assert len(bars) == 45 * 24 * 60 + 1 and (bars["ts"][1:] > bars["ts"][:-1]).all()
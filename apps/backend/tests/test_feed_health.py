@@ -0,0 +1,23 @@
+from src.minimalgotronifylicious.streaming.feed_health import FeedHealth
+
+
+def test_expected_interval_is_learned_per_symbol():
+    h = FeedHealth(min_stale_s=1, factor=5)
+    for i in range(20):
+        h.touch("NSE:3045", now=i * 0.5)       # liquid: every 0.5 s
+        h.touch("NFO:35001", now=i * 2.0)      # thin: every 2 s
+    assert h.expected_s("NSE:3045") == 2.5
+    assert h.expected_s("NFO:35001") == 10.0
+    assert h.stale(["NSE:3045", "NFO:35001"], now=41.0) == ["NSE:3045"]
+
+
+def test_resubscribe_backs_off_until_a_tick_arrives():
+    h = FeedHealth(min_stale_s=10, factor=5)
+    h.watch(["NSE:3045"], now=0)
+    assert h.stale(["NSE:3045"], now=11) == ["NSE:3045"]
+    h.resubscribed(["NSE:3045"], now=11)
+    assert h.stale(["NSE:3045"], now=25) == []    # next try waits 2 × 10 s
+    assert h.stale(["NSE:3045"], now=32) == ["NSE:3045"]
+    h.touch("NSE:3045", now=33)
+    snap = h.snapshot(now=34)
+    assert snap["stale"] == [] and snap["symbols"]["NSE:3045"]["resubscribes"] == 0
@@ -0,0 +1,71 @@
+import threading
+
+from src.minimalgotronifylicious.orders.idempotency import PENDING_TTL_S, IdempotencyStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_replay_is_served_by_another_worker_through_the_shared_file(tmp_path):
+    path = str(tmp_path / "idem.db")
+    a, b = IdempotencyStore(path), IdempotencyStore(path)
+    assert a.reserve("order:1")
+    assert b.get("order:1") is None  # in flight: nothing to replay yet
+    assert not b.reserve("order:1")
+    a.put("order:1", {"orderId": "X", "status": "ACCEPTED"})
+    assert b.get("order:1") == {"orderId": "X", "status": "ACCEPTED"}
+    assert b.stats()["cached"] == 1  # the next replay stays in memory
+
+
+def test_failed_request_releases_its_key(tmp_path):
+    s = IdempotencyStore(str(tmp_path / "idem.db"))
+    assert s.reserve("order:1")
+    s.release("order:1")
+    assert s.reserve("order:1")
+
+
+def test_rows_expire_and_lapsed_reservations_can_be_reclaimed(tmp_path):
+    clock = Clock()
+    s = IdempotencyStore(str(tmp_path / "idem.db"), ttl_s=60, clock=clock)
+    s.put("order:done", {"orderId": "X"})
+    assert s.reserve("order:stuck")
+    clock.now += max(60, PENDING_TTL_S) + 1
+    assert s.get("order:done") is None
+    assert s.reserve("order:stuck") and s.reserve("order:done")
+
+
+def test_table_and_cache_stay_bounded(tmp_path):
+    s = IdempotencyStore(str(tmp_path / "idem.db"), max_rows=10, cache_size=4)
+    for i in range(50):
+        s.put(f"order:{i}", {"orderId": str(i)})
+    s.prune()
+    stats = s.stats()
+    assert stats["rows"] == 10 and stats["cached"] == 4
+    assert s.get("order:49") == {"orderId": "49"} and s.get("order:0") is None
+
+
+def test_pruning_a_full_table_keeps_in_flight_reservations(tmp_path):
+    s = IdempotencyStore(str(tmp_path / "idem.db"), max_rows=10)
+    assert s.reserve("order:in-flight")
+    for i in range(20):
+        s.put(f"order:{i}", {"orderId": str(i)})
+    s.prune()
+    assert s.stats()["rows"] == 10
+    assert not s.reserve("order:in-flight")  # a duplicate during the broker call still loses
+
+
+def test_only_one_concurrent_claim_wins(tmp_path):
+    path = str(tmp_path / "idem.db")
+    stores = [IdempotencyStore(path) for _ in range(8)]
+    won = []
+    threads = [threading.Thread(target=lambda s=s: won.append(s.reserve("order:race"))) for s in stores]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert won.count(True) == 1
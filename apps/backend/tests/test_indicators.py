@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.minimalgotronifylicious.indicators.engine import IndicatorEngine
+from src.minimalgotronifylicious.indicators.incremental import (
+    ATR, EMA, MACD, RSI, SMA, VWAP, BollingerBands,
+)
+from src.minimalgotronifylicious.streaming.tick import Tick, TickBatch
+
+PRICES = list(100 + np.cumsum(np.random.default_rng(7).normal(0, 1, 300)))
+
+
+def test_window_indicators_match_pandas():
+    s = pd.Series(PRICES)
+    sma, bb = SMA(20), BollingerBands(20, 2.0)
+    for p in PRICES:
+        sma.update(p)
+        bb.update(p)
+    assert sma.value == pytest.approx(s.rolling(20).mean().iloc[-1])
+    sd = s.rolling(20).std(ddof=0).iloc[-1]
+    assert bb.value[0] == pytest.approx(sma.value - 2 * sd)
+    assert bb.value[2] == pytest.approx(sma.value + 2 * sd)
+
+
+def test_ema_is_sma_seeded_then_smoothed():
+    ema = EMA(10)
+    assert ema.seed(PRICES[:9]) is None
+    ema.update(PRICES[9])
+    assert ema.value == pytest.approx(sum(PRICES[:10]) / 10)
+    expected = pd.Series([ema.value] + PRICES[10:]).ewm(span=10, adjust=False).mean().iloc[-1]
+    assert ema.seed(PRICES[10:]) == pytest.approx(expected)
+
+
+def test_rsi_macd_atr_vwap():
+    rsi = RSI(14)
+    rsi.seed(range(1, 30))  # only gains
+    assert rsi.value == 100.0
+
+    macd = MACD(12, 26, 9)
+    macd.seed(PRICES)
+    line, signal, hist = macd.value
+    assert hist == pytest.approx(line - signal)
+
+    atr = ATR(3)
+    for h, l, c in [(10, 8, 9), (11, 9, 10), (12, 10, 11), (14, 12, 13)]:
+        atr.update(c, high=h, low=l)
+    assert atr.value == pytest.approx((2 * 2 + 3) / 3)
+
+    vwap = VWAP()
+    vwap.update(100, 10)
+    vwap.update(110, 30)
+    assert vwap.value == pytest.approx(107.5)
+
+
+def test_engine_shares_instances_and_updates_once():
+    engine = IndicatorEngine()
+    a = engine.acquire("NSE:3045", "ema", period=3)
+    b = engine.acquire("NSE:3045", "ema", period=3)
+    c = engine.acquire("NSE:3045", "vwap")
+    assert a is b and a is not c and len(engine) == 2
+
+    feed = engine.observer("NSE:3045")
+    for ltp, vol in [(10000, 10), (10100, 20), (10200, 40)]:
+        feed.update(Tick("3045", "NSE", ltp, vol))
+    assert a.value == pytest.approx(101.0)  # one update per tick, not one per strategy
+    # the first tick's cumulative volume traded before we listened: it only sets the baseline
+    assert c.value == pytest.approx((101 * 10 + 102 * 20) / 30)
+
+    engine.release("NSE:3045", "ema", period=3)
+    assert engine.snapshot("NSE:3045")["ema_3"] == a.value
+    engine.release("NSE:3045", "ema", period=3)
+    engine.release("NSE:3045", "vwap")
+    assert len(engine) == 0
+
+
+def test_readers_forwarding_the_same_ticks_apply_each_once():
+    engine = IndicatorEngine()
+    ema = engine.acquire("NSE:3045", "ema", period=2)
+    first, second = engine.feed("NSE:3045"), engine.feed("NSE:3045")
+    batch = TickBatch([Tick("3045", "NSE", 10000, 5), Tick("3045", "NSE", 10200, 9)])
+    for tick in batch:  # a batch hands every reader fresh Tick objects
+        first.update(tick)
+    assert ema.value == pytest.approx(101.0)
+    for tick in batch:
+        second.update(tick)
+    assert ema.value == pytest.approx(101.0)
+    late = engine.feed("NSE:3045")  # joins now: the next tick is its to apply
+    late.update(Tick("3045", "NSE", 10500, 12))
+    first.update(Tick("3045", "NSE", 10500, 12))
+    assert ema.value == pytest.approx(101.0 + (105 - 101) * 2 / 3)
+    tick = Tick("3045", "NSE", 10500, 12)  # joins on a tick the others already applied
+    engine.feed("NSE:3045", joining=tick).update(tick)
+    assert ema.value == pytest.approx(101.0 + (105 - 101) * 2 / 3)
+
+
+def test_ema_observers_share_the_engine_ema():
+    # the observer package imports every observer (pymongo, sklearn, ...)
+    EMAObserver = pytest.importorskip("src.minimalgotronifylicious.observer.ema").EMAObserver
+
+    engine = IndicatorEngine()
+    a, b = EMAObserver(period=3, engine=engine), EMAObserver(period=3, engine=engine)
+    for ltp in (10000, 10100, 10200):
+        tick = Tick("3045", "NSE", ltp)
+        a.update(tick)
+        b.update(tick)
+    assert a._ema is b._ema and len(engine) == 1
+    assert a.ema == b.ema == pytest.approx(101.0)
+    a.close()
+    b.close()
+    assert len(engine) == 0
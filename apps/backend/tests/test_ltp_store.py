@@ -0,0 +1,84 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.minimalgotronifylicious.routers import trading
+from src.minimalgotronifylicious.streaming.tick_store import LastTickStore
+from src.minimalgotronifylicious.utils.symbols import SymbolMap
+
+SYMBOLS = SymbolMap([{"symbol": "NSE:SBIN-EQ", "token": "3045"}, {"symbol": "NSE:INFY-EQ", "token": "1594"}])
+
+
+def _app(monkeypatch, store):
+    monkeypatch.setattr(trading, "get_tick_store", lambda: store)
+    monkeypatch.setattr(trading, "get_symbol_map", lambda broker: SYMBOLS)
+    app = FastAPI()
+    app.include_router(trading.router)
+    return TestClient(app)
+
+
+def test_store_freshness_bound():
+    store = LastTickStore(max_age_ms=1000)
+    store.put("sbin-eq", 101.5, ts_ms=10_000)
+    assert store.get("NSE:SBIN-EQ", now_ms=10_500) == (101.5, 10_000)
+    assert store.get("NSE:SBIN-EQ", now_ms=11_001) is None
+
+    store.set_max_age("NSE:SBIN-EQ", 5000)
+    assert store.get("NSE:SBIN-EQ", now_ms=14_000) is not None
+
+    store.update("NSE:3045", {"last_traded_price": 82050})  # SDK ticks are in paise
+    assert store.get("NSE:3045")[0] == 820.5
+    assert store.get("NSE:3045", broker="simulator") is None  # scoped by the broker that streamed it
+
+
+def test_batch_ltp_served_from_stream_without_broker(monkeypatch):
+    def no_broker(*_):
+        raise AssertionError("broker should not be called for fresh ticks")
+
+    monkeypatch.setattr(trading, "client_dep", no_broker)
+    store = LastTickStore()
+    store.update("NSE:3045", {"last_traded_price": 80000})  # the stream writes EXCHANGE:TOKEN
+    store.update("NSE:1594", {"last_traded_price": 150000})
+
+    res = _app(monkeypatch, store).get("/api/ltp", params={"symbols": "NSE:SBIN-EQ,NSE:INFY-EQ"},
+                                       headers={"x_broker": "angel_one"})
+    assert res.status_code == 200
+    items = res.json()["items"]
+    assert [(i["symbol"], i["ltp"], i["source"]) for i in items] == [
+        ("NSE:SBIN-EQ", 800.0, "stream"),
+        ("NSE:INFY-EQ", 1500.0, "stream"),
+    ]
+
+
+def test_stale_symbol_falls_back_to_rest(monkeypatch):
+    class Client:
+        calls = 0
+
+        def ltp(self, symbol):
+            Client.calls += 1
+            return {"ltp": 42.0}
+
+    monkeypatch.setattr(trading, "client_dep", lambda *_: Client())
+    store = LastTickStore()
+    client = _app(monkeypatch, store)
+
+    res = client.get("/api/ltp", params={"symbol": "NSE:NEVERSEEN-EQ"}, headers={"x_broker": "angel_one"})
+    assert res.json()["source"] == "rest" and Client.calls == 1
+    # a REST answer is not a stream tick: it stays out of the store and is asked again
+    res = client.get("/api/ltp", params={"symbol": "NSE:NEVERSEEN-EQ"}, headers={"x_broker": "angel_one"})
+    assert res.json()["source"] == "rest" and Client.calls == 2 and len(store) == 0
+
+
+def test_stream_prices_are_served_only_to_callers_of_that_feed(monkeypatch):
+    class Client:
+        def ltp(self, symbol):
+            return {"ltp": 1.0}
+
+    monkeypatch.setattr(trading, "client_dep", lambda *_: Client())
+    store = LastTickStore()
+    store.update("NSE:3045", {"last_traded_price": 80000}, broker="simulator")
+    client = _app(monkeypatch, store)
+
+    sim = client.get("/api/ltp", params={"symbol": "NSE:SBIN-EQ"}, headers={"x_broker": "simulator"}).json()
+    live = client.get("/api/ltp", params={"symbol": "NSE:SBIN-EQ"}, headers={"x_broker": "angel_one"}).json()
+    assert (sim["ltp"], sim["source"]) == (800.0, "stream")
+    assert (live["ltp"], live["source"]) == (1.0, "rest")
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.minimalgotronifylicious.utils.metrics import Metrics, MetricsMiddleware, Registry
+
+
+def test_histogram_buckets_are_cumulative_in_render():
+    r = Registry()
+    h = r.histogram("lat_seconds", "test", ("route",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 0.5, 5.0):
+        h.observe(v, "/a")
+    text = r.render()
+    assert 'lat_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'lat_seconds_bucket{route="/a",le="1.0"} 3' in text
+    assert 'lat_seconds_bucket{route="/a",le="+Inf"} 4' in text
+    assert 'lat_seconds_count{route="/a"} 4' in text
+    assert 'lat_seconds_sum{route="/a"} 6.05' in text
+
+
+def test_per_thread_cells_merge_without_lost_updates():
+    r = Registry()
+    c = r.counter("n_total", "test", ("src",))
+    h = r.histogram("t_seconds", "test")
+
+    def work():
+        for _ in range(10_000):
+            c.inc("feed")
+            h.observe(0.002)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert c.values() == {("feed",): 40_000}
+    assert h.values()[()][-2] == 0 and sum(h.values()[()][:-1]) == 40_000
+
+
+def test_gauge_function_is_read_at_scrape_and_failures_stay_local():
+    r = Registry()
+    depth = {"n": 1}
+    r.gauge("depth", "test", ("sub",)).set_function(lambda: {("a",): depth["n"]})
+    r.gauge("broken", "test").set_function(lambda: 1 / 0)
+    depth["n"] = 7
+    text = r.render()
+    assert 'depth{sub="a"} 7' in text
+    assert "# broken unavailable" in text
+
+
+def test_middleware_labels_by_route_template():
+    m = Metrics(Registry())
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    app.add_middleware(MetricsMiddleware, metrics=m)
+
+    async def go():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as c:
+            for i in range(3):
+                await c.get(f"/items/{i}")
+            await c.get("/nope")
+
+    asyncio.run(go())
+    seen = {k: sum(v[:-1]) for k, v in m.http.values().items()}
+    assert seen == {("GET", "/items/{item_id}", "200"): 3, ("GET", "unmatched", "404"): 1}
+
+
+def test_scheduler_records_call_time_and_queue_wait_by_method():
+    from src.minimalgotronifylicious.brokers.request_scheduler import QUOTE, RequestScheduler
+
+    sched = RequestScheduler(limits={"metrics_test": {QUOTE: (1000, 10)}}, workers=1)
+    sched.metrics = Metrics(Registry())
+
+    def ltp(symbol):
+        if symbol == "bad":
+            raise RuntimeError("boom")
+        return 1.0
+
+    assert sched.call("metrics_test", QUOTE, ltp, "NSE:1") == 1.0
+    with pytest.raises(RuntimeError):
+        sched.call("metrics_test", QUOTE, ltp, "bad")
+    calls = {k: sum(v[:-1]) for k, v in sched.metrics.broker_call.values().items()}
+    assert calls == {("metrics_test", "ltp", "ok"): 1, ("metrics_test", "ltp", "error"): 1}
+    assert sum(sched.metrics.broker_wait.values()[("metrics_test", "quote")][:-1]) == 2
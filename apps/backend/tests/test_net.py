@@ -0,0 +1,28 @@
+from src.minimalgotronifylicious.utils import net
+
+
+class Resp:
+    text = "203.0.113.7\n"
+
+    def raise_for_status(self):
+        pass
+
+
+def test_only_a_successful_lookup_is_cached(monkeypatch):
+    calls = []
+
+    def get(url, timeout):
+        calls.append(url)
+        if len(calls) == 1:
+            raise ConnectionError("offline")
+        return Resp()
+
+    monkeypatch.delenv("PUBLIC_IP", raising=False)
+    monkeypatch.setattr(net.requests, "get", get)
+    net._ipify.cache_clear()
+    try:
+        assert net.get_public_ip() != "203.0.113.7"  # local fallback, not remembered
+        assert net.get_public_ip() == "203.0.113.7"
+        assert net.get_public_ip() == "203.0.113.7" and len(calls) == 2
+    finally:
+        net._ipify.cache_clear()
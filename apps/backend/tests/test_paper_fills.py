@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from src.minimalgotronifylicious.brokers.paper_client import PaperClient
+from src.minimalgotronifylicious.brokers.paper_fills import FillSimulator
+from src.minimalgotronifylicious.brokers.paper_matching import FILLED, OPEN, TRIGGER_PENDING
+from src.minimalgotronifylicious.brokers.mixins.observer_mixin import ObserverMixin
+from src.minimalgotronifylicious.streaming.tick import Tick
+from src.minimalgotronifylicious.streaming.tick_hub import TickHub
+from src.minimalgotronifylicious.utils.symbols import SymbolMap
+
+T = 1_700_000_000_000
+
+
+def _sim(**kw):
+    opts = dict(latency_ms=50, slippage_bps=10, fee_bps=0, fee_per_order=0, participation=1)
+    opts.update(kw)
+    sim = FillSimulator(**opts)
+    sim.on_tick("NSE:1", 10_000, ts=T)  # sets the market clock
+    return sim
+
+
+def test_orders_wait_out_the_latency_then_fill_with_slippage():
+    sim = _sim()
+    buy = sim.submit("NSE:1", "BUY", 5)
+    assert sim.on_tick("NSE:1", 10_000, ts=T + 20) == [] and buy.status == OPEN
+    [fill] = sim.on_tick("NSE:1", 10_000, ts=T + 60)
+    assert fill.price == 10_010 and not fill.maker and buy.status == FILLED
+
+
+def test_resting_limit_fills_at_its_price_and_taker_limit_is_capped():
+    sim = _sim()
+    resting = sim.submit("NSE:1", "BUY", 1, "LIMIT", 9_900)
+    sim.on_tick("NSE:1", 9_950, ts=T + 60)   # live now, not crossed
+    taker = sim.submit("NSE:1", "SELL", 1, "LIMIT", 9_945)
+    sim.on_tick("NSE:1", 9_950, ts=T + 200)  # taker: ltp - 10bps = 9940 → capped at 9945
+    assert taker.avg_price == 99.45
+    sim.on_tick("NSE:1", 9_800, ts=T + 300)
+    assert resting.avg_price == 99.0
+
+
+def test_traded_volume_is_shared_in_arrival_order_and_fees_charged_once():
+    sim = _sim(fee_bps=10, fee_per_order=20, participation=0.5)
+    a = sim.submit("NSE:1", "BUY", 30)
+    b = sim.submit("NSE:1", "BUY", 30)
+    sim.on_tick("NSE:1", 10_000, volume=1_000, ts=T + 10)  # volume baseline, orders not live yet
+    fills = sim.on_tick("NSE:1", 10_000, volume=1_080, ts=T + 70)  # 80 traded, we may take 40
+    assert [(f.order_id, f.qty) for f in fills] == [(a.id, 30), (b.id, 10)]
+    assert fills[0].fee == round(30 * 10_010 * 0.001) + 2_000
+    [rest] = sim.on_tick("NSE:1", 10_000, volume=1_200, ts=T + 80)
+    assert rest.qty == 20 and rest.fee == round(20 * 10_010 * 0.001)  # no second flat fee
+
+
+def test_stops_arm_on_their_trigger():
+    sim = _sim(slippage_bps=0)
+    stop = sim.submit("NSE:1", "SELL", 2, "SL-M", trigger=9_800)
+    sim.on_tick("NSE:1", 9_900, ts=T + 60)
+    assert stop.status == TRIGGER_PENDING
+    sim.on_tick("NSE:1", 9_790, ts=T + 70)
+    assert stop.status == FILLED and stop.avg_price == 97.9
+
+
+def test_paper_client_in_tick_mode_fills_from_the_stream(monkeypatch):
+    monkeypatch.setenv("PAPER_FILLS", "ticks")
+    client = PaperClient(seed_cash=10_000)
+    client.engine.latency_ms, client.engine.slippage_bps = 0, 0
+    client.engine.fee_bps, client.engine.fee_per_order = 0, 20
+    client.update(Tick("PAPERY", "NSE", 10_000, 0, T))
+    order = client.place_order("NSE:PAPERY", 10, "BUY")
+    assert order["order_status"] == OPEN and not client.positions
+    client.update(Tick("PAPERY", "NSE", 10_050, 0, T + 1))
+    assert client.positions["NSE:PAPERY"] == {"qty": 10, "avg": 100.5} and client.cash == 10_000 - 1_005 - 20
+
+
+def test_one_vectorized_check_per_tick_across_many_open_orders():
+    sim = _sim(latency_ms=0)
+    rng = np.random.default_rng(3)
+    symbols = [f"NSE:{i}" for i in range(100)]
+    for s in symbols:
+        sim.on_tick(s, 10_000, ts=T)
+        for p in rng.integers(9_000, 9_990, 50):
+            sim.submit(s, "BUY", 1, "LIMIT", int(p))
+    t0 = time.perf_counter()
+    for k in range(10_000):
+        sim.on_tick(symbols[k % 100], 10_000 - (k % 7), ts=T + k)
+    assert time.perf_counter() - t0 < 5
+    assert len(sim.open_orders()) == 5_000
+    assert len(sim.on_tick("NSE:0", 8_000, ts=T + 20_000)) == 50
+
+
+class Upstream(ObserverMixin):
+    """Stands in for the broker's WebSocketManager behind the TickHub."""
+
+    def start(self):
+        pass
+
+    def register(self, symbol, obs):
+        self.add_observer(symbol, obs)
+
+    def unregister(self, symbol, obs):
+        self.remove_observer(symbol, obs)
+
+    def frame(self, tick):
+        # the feed thread
+        t = threading.Thread(target=self.notify_observers, args=(f"{tick.exchange}:{tick.token}", tick))
+        t.start()
+        t.join()
+
+
+def test_paper_orders_follow_the_shared_feed_until_flat(monkeypatch):
+    monkeypatch.setenv("PAPER_FILLS", "ticks")
+    upstream = Upstream()
+    now = int(time.time() * 1000) + 1_000
+
+    async def scenario():
+        hub = TickHub(upstream_factory=lambda broker: upstream)
+        hub.bind(asyncio.get_running_loop())
+        client = PaperClient(seed_cash=10_000, feed=hub,
+                             symbols=SymbolMap([{"symbol": "NSE:SBIN-EQ", "token": "3045"}]))
+        client.engine.latency_ms, client.engine.slippage_bps = 0, 0
+        client.engine.fee_bps, client.engine.fee_per_order = 0, 0
+
+        # request threads, as FastAPI runs sync routes
+        orders = [await asyncio.to_thread(client.place_order, "NSE:SBIN-EQ", 5, "BUY") for _ in range(2)]
+        await asyncio.sleep(0.01)
+        assert all(o["order_status"] == OPEN for o in orders)
+        assert list(upstream.observers) == ["NSE:3045"]  # one relay, keyed by token
+
+        upstream.frame(Tick("3045", "NSE", 10_000, 0, now))
+        await asyncio.sleep(0.01)
+        assert client.positions["NSE:SBIN-EQ"] == {"qty": 10, "avg": 100.0} and client.cash == 9_000
+
+        await asyncio.to_thread(client.place_order, "NSE:SBIN-EQ", 10, "SELL")
+        upstream.frame(Tick("3045", "NSE", 10_100, 0, now + 1))
+        await asyncio.sleep(0.01)
+        assert client.positions["NSE:SBIN-EQ"]["qty"] == 0 and client.cash == 10_010
+        assert not upstream.observers and hub.stats()["symbols"] == {}  # flat, nothing open: unfollowed
+
+    asyncio.run(scenario())
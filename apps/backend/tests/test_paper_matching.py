@@ -0,0 +1,109 @@
+import random
+import time
+
+from src.minimalgotronifylicious.brokers import paper_client
+from src.minimalgotronifylicious.brokers.paper_client import PaperClient
+from src.minimalgotronifylicious.brokers.paper_matching import (
+    CANCELLED, FILLED, OPEN, TRIGGER_PENDING, MatchingEngine, PriceLevels,
+)
+from src.minimalgotronifylicious.streaming.tick import Tick
+from src.minimalgotronifylicious.streaming.tick_store import LastTickStore
+from src.minimalgotronifylicious.utils.symbols import SymbolMap
+
+
+def _engine(last=10_000):
+    eng = MatchingEngine()
+    fills = []
+    eng.on_fill(fills.append)
+    eng.on_tick("NSE:1", last)
+    return eng, fills
+
+
+def test_incoming_order_crosses_best_price_first_then_fifo():
+    eng, fills = _engine()
+    a = eng.submit("NSE:1", "SELL", 5, "LIMIT", 10_100)
+    b = eng.submit("NSE:1", "SELL", 5, "LIMIT", 10_050)
+    c = eng.submit("NSE:1", "SELL", 5, "LIMIT", 10_050)
+    buy = eng.submit("NSE:1", "BUY", 8, "LIMIT", 10_100)
+    assert [(f.order_id, f.qty, f.price) for f in fills if f.maker] == [(b.id, 5, 10_050), (c.id, 3, 10_050)]
+    assert buy.status == FILLED and buy.avg_price == 100.5
+    assert c.status == OPEN and c.remaining == 2 and a.remaining == 5
+
+
+def test_resting_orders_share_traded_volume_and_cancel_skips_the_queue():
+    eng, fills = _engine()
+    first = eng.submit("NSE:1", "BUY", 10, "LIMIT", 9_900)
+    gone = eng.submit("NSE:1", "BUY", 10, "LIMIT", 9_900)
+    last = eng.submit("NSE:1", "BUY", 10, "LIMIT", 9_900)
+    eng.cancel(gone.id)
+    eng.on_tick("NSE:1", 9_950, volume=1_000)
+    assert not fills  # above the bids
+    eng.on_tick("NSE:1", 9_900, volume=1_012)  # 12 traded at our price
+    assert first.status == FILLED and gone.status == CANCELLED
+    assert last.filled == 2 and last.status == OPEN
+    assert eng.book("NSE:1").depth()["bids"] == [{"price": 99.0, "qty": 8, "orders": 1}]
+
+
+def test_stop_orders_wait_for_their_trigger():
+    eng, fills = _engine()
+    stop = eng.submit("NSE:1", "SELL", 4, "SL-M", trigger=9_800)
+    stop_limit = eng.submit("NSE:1", "BUY", 4, "SL", price=10_250, trigger=10_200)
+    assert stop.status == stop_limit.status == TRIGGER_PENDING
+    eng.on_tick("NSE:1", 10_210)
+    assert stop_limit.status == FILLED and stop_limit.avg_price == 102.1
+    eng.on_tick("NSE:1", 9_790)
+    assert stop.status == FILLED and stop.avg_price == 97.9
+
+
+def test_paper_client_positions_move_only_on_fills():
+    client = PaperClient(seed_cash=10_000)
+    client.on_tick("NSE:PAPERX", 100.0)
+    resting = client.place_order("NSE:PAPERX", 10, "BUY", type="LIMIT", price=99.0)
+    assert resting["status"] == "ACCEPTED" and resting["order_status"] == "OPEN"
+    assert client.positions.get("NSE:PAPERX", {"qty": 0})["qty"] == 0
+    client.on_tick("NSE:PAPERX", 98.5)
+    assert client.positions["NSE:PAPERX"] == {"qty": 10, "avg": 99.0} and client.cash == 9_010
+    sold = client.place_order("NSE:PAPERX", 10, "SELL")
+    assert sold["filled"] == 10 and sold["price"] == 98.5 and client.positions["NSE:PAPERX"]["qty"] == 0
+    assert client.snapshot()["equity"] == 9_995
+
+
+def test_hundreds_of_thousands_of_resting_orders():
+    eng, _ = _engine(last=100_000)
+    rng = random.Random(7)
+    t0 = time.perf_counter()
+    for _ in range(200_000):
+        if rng.random() < 0.5:
+            eng.submit("NSE:1", "BUY", 1, "LIMIT", rng.randrange(90_000, 99_995, 5))
+        else:
+            eng.submit("NSE:1", "SELL", 1, "LIMIT", rng.randrange(100_005, 110_000, 5))
+    assert time.perf_counter() - t0 < 10
+    assert len(eng.open_orders("NSE:1")) == 200_000
+    assert eng.book("NSE:1").bids.best() < eng.book("NSE:1").asks.best()
+
+
+def test_price_levels_come_out_best_first_on_either_side():
+    class Resting:
+        status = OPEN
+
+    rng = random.Random(3)
+    prices = [rng.randrange(1, 5_000) for _ in range(2_000)]
+    for best_is_highest in (True, False):
+        levels = PriceLevels(best_is_highest)
+        for px in prices:
+            levels.add(px, Resting())
+        expected = sorted(set(prices), reverse=best_is_highest)
+        assert [px for px, _ in levels.levels()] == expected
+        assert levels.best() == expected[0]
+
+
+def test_orders_by_trading_symbol_fill_from_ticks_keyed_by_token(monkeypatch):
+    monkeypatch.setattr(paper_client, "get_tick_store", LastTickStore)  # no stream prices from other tests
+    symbols = SymbolMap([{"symbol": "NSE:SBIN-EQ", "token": "3045"}])
+    client = PaperClient(seed_cash=10_000, engine=MatchingEngine(), symbols=symbols)
+    client.update(Tick("3045", "NSE", 10_000))
+    resting = client.place_order("nse:sbin-eq", 10, "BUY", type="LIMIT", price=99.0)
+    assert resting["symbol"] == "NSE:SBIN-EQ" and list(client.engine.books) == ["NSE:SBIN-EQ"]
+    client.update({"token": "3045", "exchange": "NSE", "ltp": 98.5})  # the hub's JSON form
+    assert client.positions == {"NSE:SBIN-EQ": {"qty": 10, "avg": 99.0}}
+    assert client.ltp("NSE:3045") == client.ltp("NSE:SBIN-EQ") == 98.5
@@ -0,0 +1,178 @@
+import asyncio
+import random
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.minimalgotronifylicious.api import routes
+from src.minimalgotronifylicious.brokers.mixins.observer_mixin import ObserverMixin
+from src.minimalgotronifylicious.brokers import paper_client
+from src.minimalgotronifylicious.brokers.paper_client import PaperClient
+from src.minimalgotronifylicious.brokers.paper_matching import Fill, MatchingEngine
+from src.minimalgotronifylicious.brokers.portfolio import ALL, Portfolio
+from src.minimalgotronifylicious.streaming.tick import Tick
+from src.minimalgotronifylicious.streaming.tick_hub import TickHub
+from src.minimalgotronifylicious.streaming.tick_store import LastTickStore
+from src.minimalgotronifylicious.utils.symbols import SymbolMap
+
+
+class Viewer:
+    def __init__(self):
+        self.seen = []
+
+    def update(self, delta):
+        self.seen.append(delta)
+
+
+def _fill(symbol, side, qty, price, fee=0):
+    return Fill("o", symbol, side, qty, price, 0, False, fee)
+
+
+def test_realized_and_unrealized_follow_fills_and_marks():
+    pf = Portfolio(cash=10_000)
+    pf.apply_fill(_fill("NSE:A", "BUY", 10, 10_000, fee=2_000))
+    pf.mark("NSE:A", 10_500)
+    assert pf.totals()["unrealized"] == 50.0 and pf.totals()["equity"] == 10_030.0
+    pf.apply_fill(_fill("NSE:A", "SELL", 15, 11_000))  # closes 10, flips to short 5 @ 110
+    pos = pf.positions["NSE:A"]
+    assert (pos.qty, pos.avg, pos.realized) == (-5, 11_000, 10_000)
+    pf.mark("NSE:A", 10_800)
+    t = pf.totals()
+    assert (t["realized"], t["unrealized"], t["market_value"], t["fees"]) == (100.0, 10.0, -540.0, 20.0)
+    assert t["cash"] == 10_000 - 1_000 - 20 + 1_650 and t["equity"] == t["cash"] - 540
+
+
+def test_ticks_touch_only_held_positions_and_totals_match_a_full_recompute():
+    pf = Portfolio()
+    viewer = Viewer()
+    pf.add_observer(ALL, viewer)
+    rng = random.Random(5)
+    symbols = [f"NSE:{i}" for i in range(500)]
+    for s in symbols:
+        pf.apply_fill(_fill(s, rng.choice(["BUY", "SELL"]), rng.randrange(1, 50), rng.randrange(5_000, 20_000)))
+    viewer.seen.clear()
+
+    assert pf.mark("NSE:UNHELD", 10_000) is None
+    last = pf.positions["NSE:7"].last
+    assert pf.mark("NSE:7", last) is None  # unchanged price → nothing sent
+    assert not viewer.seen
+    delta = pf.mark("NSE:7", last + 5)
+    assert viewer.seen == [delta] and delta["position"]["symbol"] == "NSE:7"
+
+    for _ in range(20_000):
+        pf.mark(rng.choice(symbols), rng.randrange(5_000, 20_000))
+    unrealized = sum((p.last - p.avg) * p.qty for p in pf.positions.values())
+    value = sum(p.last * p.qty for p in pf.positions.values())
+    assert abs(pf.unrealized - unrealized) < 1e-3 and pf.market_value == value
+    assert [d["totals"]["seq"] for d in viewer.seen] == sorted(d["totals"]["seq"] for d in viewer.seen)
+
+
+def test_paper_client_snapshot_never_looks_prices_up(monkeypatch):
+    client = PaperClient(seed_cash=10_000)
+    client.on_tick("NSE:PAPERZ", 100.0)
+    client.place_order("NSE:PAPERZ", 10, "BUY")
+    client.on_tick("NSE:PAPERZ", 103.0)
+    monkeypatch.setattr(client, "ltp", lambda symbol: (_ for _ in ()).throw(AssertionError("ltp called")))
+    snap = client.snapshot()
+    assert snap["positions"][0]["unrealized"] == 30.0 and snap["equity"] == 10_030.0
+    assert client.positions["NSE:PAPERZ"] == {"qty": 10, "avg": 100.0}
+
+
+def test_watchers_get_a_snapshot_then_conflated_deltas():
+    class Socket:
+        def __init__(self):
+            self.sent = []
+
+        async def send_json(self, data):
+            self.sent.append(data)
+
+    async def run():
+        pf = Portfolio(cash=1_000)
+        pf.apply_fill(_fill("NSE:A", "BUY", 1, 10_000))
+        ws = Socket()
+        await pf.watch(ws)
+        for px in range(10_001, 10_051):  # a burst on one symbol from another thread ...
+            await asyncio.to_thread(pf.mark, "NSE:A", px)
+        pf.apply_fill(_fill("NSE:B", "BUY", 2, 5_000))
+        await asyncio.sleep(0.05)
+        pf.unwatch(ws)
+        pf.mark("NSE:A", 9_000)
+        await asyncio.sleep(0.01)
+        return pf, ws.sent
+
+    pf, sent = asyncio.run(run())
+    assert sent[0]["type"] == "snapshot" and sent[0]["positions"][0]["symbol"] == "NSE:A"
+    deltas = sent[1:]
+    assert deltas and all(d["type"] == "delta" for d in deltas)
+    latest = {}
+    for d in deltas:
+        latest[d["position"]["symbol"]] = d["position"]
+    assert latest["NSE:A"]["last"] == 100.5 and latest["NSE:B"]["qty"] == 2
+    assert max(d["totals"]["seq"] for d in deltas) < pf.seq  # nothing after unwatch
+
+
+def test_marking_500_positions_costs_per_change_not_per_book():
+    pf = Portfolio()
+    for i in range(500):
+        pf.apply_fill(_fill(f"NSE:{i}", "BUY", 1, 10_000))
+    t0 = time.perf_counter()
+    for i in range(50_000):
+        pf.mark(f"NSE:{i % 5}", 10_000 + i % 97 + 1)
+    assert time.perf_counter() - t0 < 2.0
+
+
+class Upstream(ObserverMixin):
+    def start(self):
+        pass
+
+    def register(self, symbol, obs):
+        self.add_observer(symbol, obs)
+
+    def unregister(self, symbol, obs):
+        self.remove_observer(symbol, obs)
+
+    def frame(self, tick):
+        t = threading.Thread(target=self.notify_observers, args=(f"{tick.exchange}:{tick.token}", tick))
+        t.start()
+        t.join()
+
+
+def test_a_feed_tick_reaches_ws_positions_as_a_delta(monkeypatch):
+    monkeypatch.setattr(paper_client, "get_tick_store", LastTickStore)  # no stream prices from other tests
+    upstream = Upstream()
+    hub = TickHub(upstream_factory=lambda broker: upstream)
+    client = PaperClient(seed_cash=10_000, engine=MatchingEngine(), feed=hub,
+                         symbols=SymbolMap([{"symbol": "NSE:SBIN-EQ", "token": "3045"}]))
+    client.update(Tick("3045", "NSE", 10_000))
+
+    class Registry:
+        def client(self, broker=None, **_):
+            assert broker == "paper_trade"
+            return client
+
+    monkeypatch.setattr(routes, "get_session_registry", Registry)
+    app = FastAPI()
+    app.include_router(routes.router)
+
+    async def bind():
+        hub.bind(asyncio.get_running_loop())
+
+    app.router.on_startup.append(bind)
+    with TestClient(app) as http:
+        assert client.place_order("NSE:SBIN-EQ", 10, "BUY")["order_status"] == "FILLED"
+        deadline = time.time() + 2
+        while not upstream.observers and time.time() < deadline:  # follow runs on the app loop
+            time.sleep(0.005)
+        assert list(upstream.observers) == ["NSE:3045"]
+
+        with http.websocket_connect("/ws/positions") as ws:
+            snap = ws.receive_json()
+            assert snap["type"] == "snapshot" and snap["positions"][0]["qty"] == 10
+            upstream.frame(Tick("3045", "NSE", 10_100))
+            upstream.frame(Tick("9999", "NSE", 5_000))  # not held: nothing sent
+            delta = ws.receive_json()
+            assert delta["type"] == "delta" and delta["position"]["symbol"] == "NSE:SBIN-EQ"
+            assert delta["position"]["unrealized"] == 10.0 and delta["totals"]["equity"] == 10_010.0
+            assert delta["totals"]["seq"] > snap["seq"]
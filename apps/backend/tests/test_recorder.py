@@ -0,0 +1,41 @@
+import time
+
+from src.minimalgotronifylicious.streaming.recorder import (
+    FrameRecorder, iter_frames, list_segments, segment_clock,
+)
+
+
+def test_frames_round_trip_in_order(tmp_path):
+    rec = FrameRecorder(str(tmp_path), label="t")
+    frames = [bytes([i % 256]) * (1 + i % 400) for i in range(20_000)]
+    t0 = time.perf_counter()
+    for f in frames:
+        rec.record(f)
+    per_frame_us = (time.perf_counter() - t0) / len(frames) * 1e6
+    rec.close()
+
+    [seg] = list_segments(str(tmp_path))
+    got = list(iter_frames(seg))
+    assert [f for _, f in got] == frames
+    stamps = [ts for ts, _ in got]
+    assert stamps == sorted(stamps) and abs(stamps[0] - segment_clock(seg)[1]) < 5e9
+    assert rec.frames == len(frames) and rec.dropped == 0
+    assert per_frame_us < 50  # the feed thread only pays for an append
+
+
+def test_hourly_rotation_and_torn_tail(tmp_path):
+    hour = [1_700_000_000.0]
+    rec = FrameRecorder(str(tmp_path), label="t", flush_s=0.001, wall_clock=lambda: hour[0])
+    rec.record(b"a")
+    time.sleep(0.05)
+    hour[0] += 3600
+    rec.record(b"b")
+    rec.close()
+
+    segs = list_segments(str(tmp_path))
+    assert len(segs) == 2
+    assert [f for _, f in iter_frames(segs[0])] == [b"a"]
+
+    with open(segs[1], "ab") as f:
+        f.write(b"\x01\x02\x03")  # crash mid-record
+    assert [f for _, f in iter_frames(segs[1])] == [b"b"]
@@ -0,0 +1,81 @@
+import threading
+import time
+
+from src.minimalgotronifylicious.bin.bench_tick_decoder import make_packet
+from src.minimalgotronifylicious.brokers.angelone_tick_decoder import LTP_MODE
+from src.minimalgotronifylicious.brokers.angelone_websocket_event_handler import AngelOneWebSocketEventHandler
+from src.minimalgotronifylicious.brokers.replay_websocket_client import ReplayWebSocketClient
+from src.minimalgotronifylicious.streaming.recorder import HEADER, MAGIC, RECORD
+from src.minimalgotronifylicious.web_socket_manager import WebSocketManager
+
+
+def write_segment(path, frames, gap_ns):
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, 1_700_000_000 * 10**9, 0))
+        for i, frame in enumerate(frames):
+            f.write(RECORD.pack(i * gap_ns, len(frame)) + frame)
+
+
+class Collector:
+    def __init__(self):
+        self.prices = []
+
+    def update(self, tick):
+        self.prices.append(tick.ltp)
+
+
+def _wire(client):
+    manager = WebSocketManager(client)
+    handler = AngelOneWebSocketEventHandler(ws_manager=manager)
+    client.set_callbacks(handler.on_data, handler.on_open, handler.on_close, handler.on_error,
+                         handler.on_control_message)
+    return manager
+
+
+def test_replays_subscribed_tokens_through_the_manager_in_order(tmp_path):
+    seg = tmp_path / "a.seg"
+    frames = [make_packet(LTP_MODE, token=tok, ltp=100 + i) for i in range(300) for tok in ("3045", "2885")]
+    write_segment(seg, frames, gap_ns=0)
+
+    client = ReplayWebSocketClient(str(seg), speed=0)
+    manager = _wire(client)
+    seen = Collector()
+    manager.register("NSE:3045", seen)
+    manager.subscribe([{"exchangeType": 1, "tokens": ["3045"]}])
+    manager.start()
+    assert client.done.wait(5)
+    manager.stop()
+
+    assert seen.prices == [100 + i for i in range(300)]
+    assert client.stats()["frames"] == 600 and client.stats()["ticks"] == 300
+
+
+def test_speed_multiplier_compresses_recorded_pacing(tmp_path):
+    seg = tmp_path / "b.seg"
+    write_segment(seg, [make_packet(LTP_MODE)] * 11, gap_ns=50_000_000)  # 0.5 s recorded
+
+    client = ReplayWebSocketClient(str(seg), speed=5, subscribe_all=True)
+    t0 = time.perf_counter()
+    t = threading.Thread(target=client.connect)
+    t.start()
+    assert client.done.wait(5)
+    took = time.perf_counter() - t0
+    client.disconnect()
+    t.join(2)
+    assert 0.08 <= took < 0.4 and client.ticks == 11
+
+
+def test_a_short_frame_is_skipped_not_fatal(tmp_path):
+    seg = tmp_path / "c.seg"
+    frames = [make_packet(LTP_MODE, ltp=101), b"\x01\x01abc", make_packet(LTP_MODE, ltp=102)]
+    write_segment(seg, frames, gap_ns=0)
+
+    client = ReplayWebSocketClient(str(seg), speed=0, subscribe_all=True)
+    seen = []
+    client.set_callbacks(lambda ws, tick: seen.append(tick.ltp), None, None, None, None)
+    t = threading.Thread(target=client.connect)
+    t.start()
+    assert client.done.wait(5)
+    client.disconnect()
+    t.join(2)
+    assert seen == [101, 102] and client.frames == 3
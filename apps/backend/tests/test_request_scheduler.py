@@ -0,0 +1,54 @@
+import threading
+import time
+
+from src.minimalgotronifylicious.brokers.request_scheduler import (
+    HISTORY, ORDER, QUOTE, RequestScheduler, scheduled_client,
+)
+
+
+def test_identical_reads_share_one_upstream_call():
+    sched = RequestScheduler(limits={"angel_one": {QUOTE: (100, 100)}}, workers=2)
+    gate = threading.Event()
+    calls = []
+
+    def ltp(symbol):
+        calls.append(symbol)
+        gate.wait(2)
+        return {"ltp": 101.5}
+
+    futs = [sched.submit("angel_one", QUOTE, ltp, "SBIN", key=("ltp", "SBIN")) for _ in range(5)]
+    gate.set()
+    assert [f.result(2) for f in futs] == [{"ltp": 101.5}] * 5
+    assert calls == ["SBIN"] and sched.coalesced == 4
+
+
+def test_orders_jump_queued_quotes_and_history():
+    sched = RequestScheduler(limits={"angel_one": {ORDER: (100, 100), QUOTE: (100, 100), HISTORY: (100, 100)}},
+                             workers=1)
+    gate = threading.Event()
+    order = []
+    busy = sched.submit("angel_one", QUOTE, gate.wait, 2)
+    time.sleep(0.05)  # the only worker is now busy
+    futs = [sched.submit("angel_one", HISTORY, order.append, "history"),
+            sched.submit("angel_one", QUOTE, order.append, "quote"),
+            sched.submit("angel_one", ORDER, order.append, "order")]
+    gate.set()
+    busy.result(2)
+    for f in futs:
+        f.result(2)
+    assert order == ["order", "quote", "history"]
+
+
+def test_token_bucket_paces_calls():
+    sched = RequestScheduler(limits={"angel_one": {HISTORY: (20, 1)}}, workers=4)
+    start = time.monotonic()
+    futs = [sched.submit("angel_one", HISTORY, time.monotonic) for _ in range(5)]
+    stamps = sorted(f.result(2) for f in futs)
+    assert stamps[-1] - start >= 4 / 20 * 0.9
+
+
+def test_unlimited_broker_calls_inline_and_unwrapped():
+    sched = RequestScheduler(limits={})
+    client = object()
+    assert scheduled_client("paper_trade", client, sched) is client
+    assert sched.call("paper_trade", ORDER, threading.get_ident) == threading.get_ident()
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.minimalgotronifylicious.indicators import scanner
+from src.minimalgotronifylicious.indicators.scanner import closes_matrix, ema_matrix, scan_crossovers
+
+
+def test_ema_matrix_matches_pandas_per_row():
+    rng = np.random.default_rng(1)
+    closes = 100 + np.cumsum(rng.normal(0, 1, (5, 60)), axis=1)
+    closes[2, :10] = np.nan  # shorter history, left-padded
+    ema = ema_matrix(closes, 21)
+    for i in range(5):
+        row = pd.Series(closes[i]).dropna()
+        expected = row.ewm(span=21, adjust=False).mean().to_numpy()
+        np.testing.assert_allclose(ema[i, -len(row):], expected)
+    np.testing.assert_allclose(ema_matrix(closes, 21, last_only=True), ema[:, -2:])
+
+
+def test_scan_flags_last_bar_crosses():
+    symbols, closes = closes_matrix({
+        "UP": [10] * 30 + [9, 12],      # below, then above on the last bar
+        "DOWN": [10] * 30 + [11, 8],
+        "FLAT": [10] * 32,
+        "SHORT": [5],                    # too short to cross
+    })
+    scan = scan_crossovers(closes, symbols, period=5)
+    assert scan.crossed_above == ["UP"]
+    assert scan.crossed_below == ["DOWN"]
+    assert scan.as_dict()["above"] == ["UP"]
+    with pytest.raises(ValueError):
+        scan_crossovers(closes, symbols[:2])
+
+
+def test_universe_scan_work_grows_with_bars_not_symbols(monkeypatch):
+    class CountingNumpy:
+        """numpy, counting the vector ops the EMA recursion issues."""
+
+        def __init__(self):
+            self.ops = 0
+
+        def where(self, *args):
+            self.ops += 1
+            return np.where(*args)
+
+        def __getattr__(self, name):
+            return getattr(np, name)
+
+    def ops(n_symbols, n_bars):
+        counting = CountingNumpy()
+        monkeypatch.setattr(scanner, "np", counting)
+        closes = 100 + np.cumsum(np.random.default_rng(2).normal(0, 1, (n_symbols, n_bars)), axis=1)
+        scan_crossovers(closes, [f"S{i}" for i in range(n_symbols)])
+        return counting.ops
+
+    assert ops(2000, 250) == ops(2, 250)  # one N-wide step per bar, whatever N is
+    assert ops(2, 500) == 2 * ops(2, 250)
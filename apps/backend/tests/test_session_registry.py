@@ -0,0 +1,91 @@
+import threading
+import time
+
+from src.minimalgotronifylicious.sessions.session_registry import SessionRegistry
+
+
+class Creds:
+    def __init__(self, client_id="C1", password="p"):
+        self.client_id = client_id
+        self.password = password
+
+
+class FakeSession:
+    def __init__(self):
+        self.refreshed = 0
+
+    def refresh(self):
+        self.refreshed += 1
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_concurrent_callers_share_one_login():
+    logins = []
+
+    def connect(broker, creds):
+        logins.append(broker)
+        time.sleep(0.05)  # a slow TOTP login
+        return FakeSession()
+
+    reg = SessionRegistry(connect=connect, creds_from_env=lambda b: Creds(), ttl_s=3600, refresh_margin_s=60)
+    got = []
+    threads = [threading.Thread(target=lambda: got.append(reg.session("angel_one"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert logins == ["angel_one"]
+    assert len(got) == 8 and all(s is got[0] for s in got)
+    # different credentials are a different session
+    assert reg.session("angel_one", Creds(client_id="C2")) is not got[0]
+
+
+def test_refreshes_ahead_of_expiry_and_relogs_after():
+    clock = Clock()
+    sessions = []
+
+    def connect(broker, creds):
+        sessions.append(FakeSession())
+        return sessions[-1]
+
+    reg = SessionRegistry(connect=connect, creds_from_env=lambda b: Creds(),
+                          ttl_s=100, refresh_margin_s=10, clock=clock)
+    first = reg.session()
+
+    clock.now = 95  # inside the refresh margin: served immediately, renewed in the background
+    assert reg.session() is first
+    for _ in range(100):
+        (entry,) = reg.stats()["sessions"].values()
+        if entry["refreshes"]:
+            break
+        time.sleep(0.005)
+    assert first.refreshed == 1 and len(sessions) == 1
+
+    clock.now = 95 + 200  # long past expiry → caller waits; the refresh token still works
+    second = reg.session()
+    assert second is first and first.refreshed == 2
+
+
+def test_failed_login_is_retried_on_next_call():
+    attempts = []
+
+    def connect(broker, creds):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("AngelOne login failed")
+        return FakeSession()
+
+    reg = SessionRegistry(connect=connect, creds_from_env=lambda b: Creds())
+    try:
+        reg.session()
+    except RuntimeError:
+        pass
+    assert isinstance(reg.session(), FakeSession) and len(attempts) == 2
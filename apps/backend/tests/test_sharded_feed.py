@@ -0,0 +1,95 @@
+import threading
+
+import pytest
+
+from src.minimalgotronifylicious.brokers.mixins.observer_mixin import ObserverMixin
+from src.minimalgotronifylicious.streaming.sharded_feed import HASH, ShardedFeed
+
+
+class FakeShard(ObserverMixin):
+    def __init__(self, index):
+        super().__init__()
+        self.index = index
+        self.started = 0
+        self.subs = []
+
+    def start(self):
+        self.started += 1
+
+    def stop(self):
+        pass
+
+    def is_connected(self):
+        return True
+
+    def register(self, symbol, obs):
+        self.add_observer(symbol, obs)
+
+    def unregister(self, symbol, obs):
+        self.remove_observer(symbol, obs)
+
+    def subscribe(self, token_list, mode=3):
+        self.subs.append(("sub", token_list))
+
+    def unsubscribe(self, token_list, mode=3):
+        self.subs.append(("unsub", token_list))
+
+    def stream_tick(self, symbol, data):
+        self.notify_observers(symbol, data)
+
+
+class Collector:
+    def __init__(self):
+        self.seen = []
+
+    def update(self, data):
+        self.seen.append(data)
+
+
+def _feed(**kw):
+    shards = []
+
+    def make(i):
+        shards.append(FakeShard(i))
+        return shards[-1]
+
+    return ShardedFeed(make, **kw), shards
+
+
+def test_tokens_spread_least_loaded_and_sockets_open_lazily():
+    feed, shards = _feed(max_shards=3, cap=2)
+    feed.start()
+    feed.subscribe([{"exchangeType": 1, "tokens": ["1", "2", "3", "4"]}])
+    assert [s.index for s in shards] == [0, 1, 2] and all(s.started == 1 for s in shards)
+    assert [len(t) for t in feed._tokens] == [2, 1, 1]
+    assert shards[0].subs == [("sub", [{"exchangeType": 1, "tokens": ["1", "4"]}])]
+
+    feed.subscribe([{"exchangeType": 2, "tokens": ["5", "6"]}])
+    with pytest.raises(RuntimeError):
+        feed.subscribe([{"exchangeType": 2, "tokens": ["7"]}])
+
+    feed.unsubscribe([{"exchangeType": 1, "tokens": ["2"]}])
+    assert shards[1].subs[-1] == ("unsub", [{"exchangeType": 1, "tokens": ["2"]}])
+    assert "NSE:2" not in feed._home
+
+
+def test_each_symbol_streams_in_order_from_its_own_socket():
+    feed, shards = _feed(max_shards=4, cap=1000, placement=HASH)
+    names = [f"NSE:{t}" for t in range(40)]
+    collectors = {n: Collector() for n in names}
+    for n in names:
+        feed.register(n, collectors[n])
+    feed.subscribe([{"exchangeType": 1, "tokens": [n.split(":")[1] for n in names]}])
+    assert len(shards) > 1
+
+    def pump(shard):
+        for seq in range(200):
+            for n, obs in list(shard.observers.items()):
+                shard.stream_tick(n, seq)
+
+    threads = [threading.Thread(target=pump, args=(s,)) for s in shards]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(c.seen == list(range(200)) for c in collectors.values())
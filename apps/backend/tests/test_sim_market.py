@@ -0,0 +1,103 @@
+import math
+import threading
+import time
+
+import numpy as np
+
+from src.minimalgotronifylicious.brokers.angelone_tick_decoder import decode_many
+from src.minimalgotronifylicious.brokers.angelone_websocket_event_handler import AngelOneWebSocketEventHandler
+from src.minimalgotronifylicious.brokers.sim_market import RISK_FREE, MarketSimulator, SimClient
+from src.minimalgotronifylicious.brokers.sim_websocket_client import SimWebSocketClient
+from src.minimalgotronifylicious.web_socket_manager import WebSocketManager
+
+
+class Collector:
+    def __init__(self):
+        self.ticks = []
+
+    def update(self, tick):
+        self.ticks.append(tick)
+
+
+def test_equity_returns_have_the_configured_correlation():
+    m = MarketSimulator(symbols=60, corr=0.5, strikes=0, indices=0, seed=7)
+    rets = []
+    for _ in range(1500):
+        before = m.spot.copy()
+        m.step(60.0)
+        rets.append(np.log(m.spot / before))
+    c = np.corrcoef(np.array(rets).T)
+    off = c[~np.eye(len(c), dtype=bool)]
+    assert abs(off.mean() - 0.5) < 0.05
+
+
+def test_options_follow_their_underlying_and_keep_put_call_parity():
+    m = MarketSimulator(symbols=1, strikes=2, indices=1, seed=1)
+    ce, pe = m.index_of(m.names[m.n_under]), m.index_of(m.names[m.n_under + 1])
+    spot0, call0 = m.spot[0], m.price[ce]
+    m.spot[0] *= 1.01
+    m.step(1e-9)
+    assert m.price[ce] > call0  # a call rallies with the index
+
+    k, t = m.opt_strike[0], m._time_left()
+    parity = m.price[ce] - m.price[pe] - (m.spot[0] - k * math.exp(-RISK_FREE * t))
+    assert abs(parity) < 0.5 and spot0 != m.spot[0]
+
+
+def test_frames_decode_as_angel_packets():
+    m = MarketSimulator(symbols=5, strikes=1, indices=1, seed=3)
+    idx = np.array([0, 3, m.n_under])
+    ticks = decode_many(m.frame(idx))
+    assert [t.token for t in ticks] == [m.tokens[i] for i in idx]
+    assert [t.exchange_type for t in ticks] == [1, 1, 2]
+    assert ticks[0].last_traded_price == int(round(m.price[0] * 20)) * 5
+    assert ticks[1].volume_trade_for_the_day == ticks[1].last_traded_quantity > 0
+
+
+def test_feed_streams_subscribed_instruments_through_the_manager():
+    m = MarketSimulator(symbols=50, strikes=2, indices=1, seed=5)
+    client = SimWebSocketClient(m, ticks_per_s=0, max_ticks=5000, seed=5)
+    manager = WebSocketManager(client)
+    handler = AngelOneWebSocketEventHandler(ws_manager=manager)
+    client.set_callbacks(handler.on_data, handler.on_open, handler.on_close, handler.on_error,
+                         handler.on_control_message)
+    seen = {m.key(0): Collector(), m.key(m.n_under): Collector()}
+    for key, obs in seen.items():
+        manager.register(key, obs)
+    manager.subscribe([{"exchangeType": 1, "tokens": [m.tokens[0]]},
+                       {"exchangeType": 2, "tokens": [m.tokens[m.n_under]]}])
+    manager.start()
+    assert client.done.wait(5)
+    manager.stop()
+
+    index_ticks, option_ticks = (seen[k].ticks for k in seen)
+    assert len(index_ticks) + len(option_ticks) == 5000
+    assert index_ticks and option_ticks and option_ticks[0].exchange == "NFO"
+
+
+def test_feed_paces_to_the_configured_rate():
+    m = MarketSimulator(symbols=10, strikes=0, indices=0, seed=2)
+    client = SimWebSocketClient(m, ticks_per_s=2000, max_ticks=400, subscribe_all=True)
+    t0 = time.perf_counter()
+    t = threading.Thread(target=client.connect)
+    t.start()
+    assert client.done.wait(5)
+    took = time.perf_counter() - t0
+    client.disconnect()
+    t.join(2)
+    assert 0.15 <= took < 0.6 and client.ticks == 400
+
+
+def test_sim_client_fills_at_the_touch_and_tracks_positions():
+    m = MarketSimulator(symbols=3, strikes=1, indices=1, seed=4)
+    c = SimClient(m, seed_cash=1_000_000)
+    buy = c.place_order("SIM00001", "BUY", 10)
+    assert buy["status"] == "ACCEPTED" and buy["price"] >= m.price[m.index_of("SIM00001")] - 0.01
+    assert c.place_order("SIM00001", "BUY", 1, order_type="LIMIT", price=0.05)["status"] == "REJECTED"
+    pos = c.positions()["positions"]
+    assert pos[0]["symbol"] == "SIM00001" and pos[0]["qty"] == 10
+
+    rows = c.option_chain("NIFTY")
+    assert len(rows) == 6 and {r["side"] for r in rows} == {"CE", "PE"}
+    ts, ex = c.resolve_option(underlying="NIFTY", side="CE", strikeSel="ATM", expirySel="current_week")
+    assert ex == "NFO" and ts.endswith("CE") and 0 < c.greeks(ts)["delta"] < 1
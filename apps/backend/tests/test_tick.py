@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from src.minimalgotronifylicious.bin.bench_tick_decoder import make_packet
+from src.minimalgotronifylicious.brokers.angelone_tick_decoder import QUOTE, decode, decode_ticks
+from src.minimalgotronifylicious.streaming.tick import Tick, TickBatch, iter_ticks
+
+
+def test_coerce_parses_every_feed_shape_once():
+    t = Tick("3045", "NSE", 82050, 10, 1)
+    assert Tick.coerce(t) is t
+    assert Tick.coerce({"token": "3045", "exchange_type": 2, "last_traded_price": 82050}).ltp == 82050
+    assert Tick.coerce({"token": "3045", "exchange_type": 2, "last_traded_price": 82050}).exchange == "NFO"
+    assert Tick.coerce(json.dumps({"symbol": "SBIN", "ltp": 820.5})) == Tick("SBIN", "NSE", 82050)
+    assert Tick.coerce(decode(make_packet(QUOTE))) == decode_ticks(make_packet(QUOTE))[0]
+    with pytest.raises(AttributeError):
+        t.ltp = 1  # immutable
+    with pytest.raises(TypeError):
+        Tick.coerce(object())
+
+
+def test_batch_columns_and_iteration():
+    frame = make_packet(QUOTE, "3045", 82050) + make_packet(QUOTE, "1594", 150010)
+    batch = TickBatch(decode_ticks(frame))
+    assert len(batch) == 2
+    assert batch.prices().tolist() == [820.5, 1500.1]
+    assert [t.token for t in batch] == ["3045", "1594"]
+    assert batch.volume.tolist() == [123456, 123456]
+
+
+def test_legacy_envelope_items_are_paise():
+    ticks = list(iter_ticks(json.dumps({"data": [{"token": "1", "ltp": 12345, "exchange_timestamp": 5}]})))
+    assert ticks == [Tick("1", "NSE", 12345, 0, 5)]
+
@@ -0,0 +1,42 @@
+import pytest
+from SmartApi.smartWebSocketV2 import SmartWebSocketV2
+
+from src.minimalgotronifylicious.bin.bench_tick_decoder import make_packet
+from src.minimalgotronifylicious.brokers.angelone_tick_decoder import (
+    LTP_MODE, QUOTE, SNAP_QUOTE, decode, decode_many, decode_ticks,
+)
+from src.minimalgotronifylicious.streaming.tick_store import tick_price
+
+
+@pytest.mark.parametrize("mode", [LTP_MODE, QUOTE, SNAP_QUOTE])
+def test_matches_sdk_parser(mode):
+    pkt = make_packet(mode)
+    sdk = SmartWebSocketV2.__new__(SmartWebSocketV2)._parse_binary_data(pkt)
+    fast = decode(pkt).as_dict()
+    for key, val in sdk.items():
+        if key.startswith("best_5"):
+            continue
+        assert fast[key] == val, key
+    if mode == SNAP_QUOTE:
+        assert len(fast["best_5_data"]) == 10
+
+
+def test_batch_frame_and_price():
+    frame = make_packet(LTP_MODE, "3045", 82050) + make_packet(QUOTE, "1594", 150010)
+    ticks = decode_many(frame)
+    assert [t.token for t in ticks] == ["3045", "1594"]
+    assert tick_price(ticks[0]) == 820.5
+    assert ticks[1].volume_trade_for_the_day == 123456
+
+
+def test_truncated_or_unknown_packets_are_rejected():
+    with pytest.raises(ValueError):
+        decode_many(make_packet(QUOTE)[:100])
+    with pytest.raises(ValueError):
+        decode(b"\x04" + make_packet(LTP_MODE)[1:])
+    # shorter than the 51-byte header: a whole frame, or a packet trailing a good one
+    for frame in (b"\x01\x01abc", make_packet(LTP_MODE) + b"\x01" * 9):
+        with pytest.raises(ValueError, match="Truncated header"):
+            decode_ticks(frame)
+        with pytest.raises(ValueError, match="Truncated header"):
+            decode_many(frame)
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+
+from src.minimalgotronifylicious.brokers.mixins.observer_mixin import ObserverMixin
+from src.minimalgotronifylicious.streaming.tick_hub import TickHub
+
+
+class FakeManager(ObserverMixin):
+    def __init__(self):
+        super().__init__()
+        self.started = 0
+
+    def start(self):
+        self.started += 1
+
+    def register(self, symbol, obs):
+        self.add_observer(symbol, obs)
+
+    def unregister(self, symbol, obs):
+        self.remove_observer(symbol, obs)
+
+    def stream_tick(self, symbol, data):
+        self.notify_observers(symbol, data)
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+
+def test_one_upstream_many_viewers():
+    calls = []
+    manager = FakeManager()
+
+    def factory(broker):
+        calls.append(broker)
+        return manager
+
+    async def scenario():
+        hub = TickHub(upstream_factory=factory)
+        a, b = FakeSocket(), FakeSocket()
+        await asyncio.gather(hub.subscribe(a, "NSE:3045"), hub.subscribe(b, "NSE:3045"))
+
+        assert calls == ["angel_one"]
+        assert len(manager.observers["NSE:3045"]) == 1  # one relay, two viewers
+
+        # ticks arrive on the feed thread
+        t = threading.Thread(target=manager.stream_tick, args=("NSE:3045", {"ltp": 1.0}))
+        t.start(); t.join()
+        await asyncio.sleep(0.01)
+        assert a.sent == b.sent == [{"ltp": 1.0}]
+
+        await hub.unsubscribe(a, "NSE:3045")
+        assert "NSE:3045" in manager.observers
+        await hub.unsubscribe_all(b)
+        assert "NSE:3045" not in manager.observers
+        assert hub.stats()["symbols"] == {}
+
+    asyncio.run(scenario())
+
+
+def test_repeated_subscribe_keeps_the_viewer_queue():
+    manager = FakeManager()
+
+    async def scenario():
+        hub = TickHub(upstream_factory=lambda broker: manager)
+        ws = FakeSocket()
+        await hub.subscribe(ws, "NSE:3045", policy="drop_oldest")
+        manager.stream_tick("NSE:3045", {"ltp": 1.0})
+        await asyncio.sleep(0)  # fanned out, not yet sent
+        queue = hub.dispatcher._queues[ws]
+        await hub.subscribe(ws, "NSE:3045", policy="disconnect")   # duplicate: ignored
+        await hub.subscribe(ws, "NSE:2885", policy="drop_oldest")  # same settings: queue kept
+        assert hub.dispatcher._queues[ws] is queue and not queue.closed
+        await asyncio.sleep(0.01)
+        assert ws.sent == [{"ltp": 1.0}]
+        await hub.unsubscribe_all(ws)
+
+    asyncio.run(scenario())
@@ -0,0 +1,46 @@
+import threading
+
+from src.minimalgotronifylicious.utils.tracing import Tracer
+
+
+def _order(tracer, symbol="NSE:1"):
+    trace = tracer.start(symbol)
+    trace.mark("build")
+    trace.mark("send")
+    tracer.finish(trace, "ok", order_id="A1")
+    return trace
+
+
+def test_trace_inherits_the_frame_stamps_of_its_thread():
+    tracer = Tracer(size=10)
+    tracer.frame(1.0, 1.001)
+    trace = _order(tracer)
+    assert [s for s, _ in trace.stamps] == ["frame", "parse", "observer", "build", "send", "response"]
+    spans = trace.spans_ms()
+    assert abs(spans["parse"] - 1.0) < 1e-6
+    assert abs(sum(v for k, v in spans.items() if k != "total") - spans["total"]) < 1e-6
+
+    other = []
+    t = threading.Thread(target=lambda: other.append(_order(tracer)))
+    t.start()
+    t.join()
+    assert other[0].stamps[0][0] == "observer"  # no frame seen on that thread
+
+
+def test_fallback_frames_have_no_parse_stage():
+    tracer = Tracer(size=10)
+    tracer.frame(1.0)
+    assert [s for s, _ in tracer.start().stamps] == ["frame", "observer"]
+
+
+def test_ring_buffer_keeps_the_last_n_and_summarizes_per_stage():
+    tracer = Tracer(size=5)
+    ids = [_order(tracer, f"NSE:{i}").id for i in range(8)]
+    recent = tracer.recent(10)
+    assert [r["id"] for r in recent] == ids[::-1][:5]
+    assert len(set(ids)) == 8 and recent[0]["order_id"] == "A1"
+    summary = tracer.summary()
+    assert summary["traces"] == 5 and summary["capacity"] == 5
+    assert set(summary["stages"]) == {"build", "send", "response", "total"}
+    for stats in summary["stages"].values():
+        assert stats["count"] == 5 and stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"] <= stats["max_ms"]
@@ -0,0 +1,72 @@
+import asyncio
+
+from src.minimalgotronifylicious.streaming.demand import UpstreamDemand, feed_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeManager:
+    def __init__(self):
+        self.frames = []
+
+    def subscribe(self, token_list, mode=3):
+        self.frames.append(("sub", token_list))
+
+    def unsubscribe(self, token_list, mode=3):
+        self.frames.append(("unsub", token_list))
+
+
+def test_feed_key_normalizes_and_rejects_unknown_exchanges():
+    assert feed_key("nfo:35001") == ("NFO:35001", (2, "35001"))
+    assert feed_key("3045") == ("NSE:3045", (1, "3045"))
+    try:
+        feed_key("XYZ:1")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown exchange accepted")
+
+
+def test_one_frame_per_exchange_type_and_linger():
+    manager, clock = FakeManager(), Clock()
+    demand = UpstreamDemand(manager, linger_s=30, batch_s=0.25, clock=clock)
+    demand.flush()
+    for sym in ("NSE:3045", "NSE:2885", "NFO:35001"):
+        demand.acquire(feed_key(sym)[1])
+    demand.flush()
+    assert manager.frames == [("sub", [{"exchangeType": 1, "tokens": ["3045", "2885"]}]),
+                              ("sub", [{"exchangeType": 2, "tokens": ["35001"]}])]
+
+    manager.frames.clear()
+    demand.release((1, "3045"))
+    clock.now = 10
+    demand.acquire((1, "3045"))  # came back within the linger window
+    demand.release((1, "2885"))
+    clock.now = 45
+    demand.flush()
+    assert manager.frames == [("unsub", [{"exchangeType": 1, "tokens": ["2885"]}])]
+    assert demand.stats() == {"subscribed": 2, "pending": 0, "lingering": 0}
+
+
+def test_batches_on_the_loop_and_wakes_for_new_demand():
+    manager = FakeManager()
+
+    async def scenario():
+        demand = UpstreamDemand(manager, linger_s=60, batch_s=0.02)
+        demand.acquire((1, "3045"))
+        demand.acquire((1, "2885"))
+        await asyncio.sleep(0.06)
+        assert manager.frames == [("sub", [{"exchangeType": 1, "tokens": ["3045", "2885"]}])]
+        demand.release((1, "3045"))  # flush loop now sleeps toward the 60 s deadline
+        await asyncio.sleep(0.03)
+        demand.acquire((1, "11536"))
+        await asyncio.sleep(0.06)
+        assert manager.frames[-1] == ("sub", [{"exchangeType": 1, "tokens": ["11536"]}])
+
+    asyncio.run(scenario())
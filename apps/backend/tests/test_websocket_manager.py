@@ -14,3 +14,207 @@ def test_watchdog_reconnects_on_disconnect():
 
     assert fake_client.connect.called
     manager.stop()
+
+
+class EventClient:
+    """Non-blocking client that reports open/close like the SDK callbacks do."""
+
+    def __init__(self):
+        self.manager = None
+        self.connects = 0
+        self.sent = []
+        self.up = False
+
+    def connect(self):
+        self.connects += 1
+        self.up = True
+        self.manager.connection_opened()
+
+    def is_connected(self):
+        return self.up
+
+    def subscribe(self, correlation_id, mode, token_list):
+        self.sent.append((mode, token_list))
+
+    def drop(self):
+        self.up = False
+        self.manager.connection_lost("server closed")
+
+    def disconnect(self):
+        self.up = False
+
+
+def _wait_for(cond, timeout=2.0):
+    import time
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return cond()
+
+
+def test_drop_is_detected_at_once_and_subscriptions_are_replayed():
+    client = EventClient()
+    manager = WebSocketManager(client)
+    client.manager = manager
+    manager.subscribe([{"exchangeType": 1, "tokens": ["3045", "2885"]}])
+    manager.start()
+    assert _wait_for(lambda: client.connects == 1 and client.sent)
+    manager.subscribe([{"exchangeType": 2, "tokens": ["35001"]}])
+    manager.unsubscribe([{"exchangeType": 1, "tokens": ["2885"]}])
+    client.sent.clear()
+
+    client.drop()
+    assert _wait_for(lambda: client.connects == 2 and client.sent, timeout=1.0)  # sub-second recovery
+    assert client.sent == [(3, [{"exchangeType": 1, "tokens": ["3045"]},
+                                {"exchangeType": 2, "tokens": ["35001"]}])]
+    manager.stop()
+
+
+def test_blocking_connect_never_stalls_the_event_loop():
+    import asyncio
+    import threading
+
+    release = threading.Event()
+
+    class BlockingClient(EventClient):
+        def connect(self):  # SmartWebSocketV2 style: returns when the socket closes
+            self.connects += 1
+            release.wait(2)
+
+    async def scenario():
+        client = BlockingClient()
+        manager = WebSocketManager(client)
+        client.manager = manager
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        manager.start()
+        await asyncio.sleep(0.05)
+        assert loop.time() - t0 < 0.5 and client.connects == 1
+        manager.stop()
+        release.set()
+
+    asyncio.run(scenario())
+
+
+def test_ping_measures_rtt_and_only_stale_tokens_are_resubscribed():
+    from src.minimalgotronifylicious.streaming.feed_health import FeedHealth
+
+    class PingClient(EventClient):
+        def __init__(self):
+            super().__init__()
+            self.pongs = True
+
+        def ping(self, payload):
+            if self.pongs:
+                self.manager.pong_received(payload.encode())
+
+    client = PingClient()
+    health = FeedHealth(min_stale_s=0.05, factor=5)
+    manager = WebSocketManager(client, heartbeat_interval=0.03, ping_timeout=0.05, health=health)
+    client.manager = manager
+    manager.subscribe([{"exchangeType": 1, "tokens": ["3045", "2885"]}])
+    manager.start()
+    assert _wait_for(lambda: client.connects == 1)
+    client.sent.clear()
+
+    def feed_3045():
+        for _ in range(20):
+            manager.stream_tick("NSE:3045", {"token": "3045", "ltp": 100.0})
+            import time
+            time.sleep(0.01)
+
+    feed_3045()
+    assert manager.rtt_ms is not None and manager.rtt_ms < 50
+    assert _wait_for(lambda: (3, [{"exchangeType": 1, "tokens": ["2885"]}]) in client.sent)
+
+    client.pongs = False  # a silent socket is dropped and reconnected
+    assert _wait_for(lambda: client.connects == 2)
+    manager.stop()
+
+
+def test_released_tokens_are_unsubscribed_on_the_live_angel_client():
+    import pytest
+    pytest.importorskip("SmartApi")
+    from src.minimalgotronifylicious.brokers.angelone_websocket_client import AngelOneWebSocketV2Client
+
+    client = AngelOneWebSocketV2Client.__new__(AngelOneWebSocketV2Client)  # no login: only the sws calls matter
+    client.sws = MagicMock()
+    manager = WebSocketManager(client, correlation_id="feed_0")
+    manager.subscribe([{"exchangeType": 1, "tokens": ["3045", "2885"]}])
+    manager.connection_opened()
+    manager.unsubscribe([{"exchangeType": 1, "tokens": ["2885"]}])
+    client.sws.unsubscribe.assert_called_once_with(
+        correlation_id="feed_0", mode=3, token_list=[{"exchangeType": 1, "tokens": ["2885"]}])
+
+
+def test_a_client_that_cannot_unsubscribe_is_reported(caplog):
+    client = EventClient()
+    manager = WebSocketManager(client)
+    client.manager = manager
+    manager.subscribe([{"exchangeType": 1, "tokens": ["3045"]}])
+    manager.connection_opened()
+    with caplog.at_level("WARNING"):
+        manager.unsubscribe([{"exchangeType": 1, "tokens": ["3045"]}])
+    assert "cannot unsubscribe" in caplog.text and manager.subscriptions() == {}
+
+
+def test_each_link_runs_on_its_own_thread_and_never_overlaps_the_last():
+    import threading
+
+    class StuckClient(EventClient):
+        """connect() reports the close but only returns once disconnect() is called."""
+
+        def __init__(self):
+            super().__init__()
+            self.inside = 0
+            self.overlapped = False
+            self.threads = []
+            self.closed = threading.Event()
+
+        def connect(self):
+            self.connects += 1
+            self.inside += 1
+            self.overlapped |= self.inside > 1
+            self.threads.append(threading.current_thread().name)
+            self.closed.clear()
+            if self.connects == 1:
+                self.manager.connection_lost("server closed")  # while still inside connect()
+            self.closed.wait(2)
+            self.inside -= 1
+
+        def disconnect(self):
+            self.closed.set()
+
+    client = StuckClient()
+    manager = WebSocketManager(client, retry_config={"delay": 0.01}, correlation_id="shard_7")
+    client.manager = manager
+    manager.start()
+    assert _wait_for(lambda: client.connects >= 2)
+    manager.stop()
+    assert not client.overlapped
+    assert client.threads[:2] == ["ws-link-shard_7", "ws-link-shard_7"]  # not the default executor
+
+
+def test_replays_and_unsubscribes_leave_the_sdk_request_dict_alone():
+    import json
+    import pytest
+    pytest.importorskip("SmartApi")
+    from SmartApi.smartWebSocketV2 import SmartWebSocketV2
+    from src.minimalgotronifylicious.brokers.angelone_websocket_client import AngelOneWebSocketV2Client
+    from src.minimalgotronifylicious.brokers.custom_angel_one_web_socket import CustomAngelOneWebSocketV2
+
+    before = json.dumps(SmartWebSocketV2.input_request_dict, sort_keys=True, default=str)
+    client = AngelOneWebSocketV2Client.__new__(AngelOneWebSocketV2Client)  # no login
+    client.sws = CustomAngelOneWebSocketV2.__new__(CustomAngelOneWebSocketV2)
+    client.sws.wsapp = MagicMock()
+    manager = WebSocketManager(client, correlation_id="feed_0")
+    manager.subscribe([{"exchangeType": 1, "tokens": ["3045", "2885"]}])
+    for _ in range(3):  # every reconnect replays the whole set
+        manager.connection_opened()
+    manager.unsubscribe([{"exchangeType": 1, "tokens": ["2885"]}])
+
+    sent = [json.loads(c.args[0]) for c in client.sws.wsapp.send.call_args_list]
+    assert [m["action"] for m in sent] == [1, 1, 1, 0]
+    assert sent[-1] == {"correlationID": "feed_0", "action": 0,
+                        "params": {"mode": 3, "tokenList": [{"exchangeType": 1, "tokens": ["2885"]}]}}
+    assert json.dumps(SmartWebSocketV2.input_request_dict, sort_keys=True, default=str) == before